@@ -1,21 +1,32 @@
+import click
 from flask import Flask
 from flask_cors import CORS
 from flasgger import Swagger
 from config import Config
-from extensions import db
+from extensions import (
+    db, catalog_cache, compression, metrics, notification_queue, query_profiler, rate_limiter,
+    recent_fingerprints, suggest_index,
+)
+from utils.apispec import export_apispec, serve_cached_apispec
+from utils.archive import archive_contacts, count_eligible
+from utils.db import configure_sqlite, engine_options
+from utils.images import backfill_renditions
+from utils.schema import upgrade_schema
+from utils.search import bulk_contact_load, ensure_contact_search
+from utils.seed import seed_demo, seed_synthetic
+from utils.stats import ensure_counters
+from utils.transfer import FORMATS, export_contacts, import_contacts
+from utils.validation import swagger_definitions
 
-# Initialisation de l'application Flask
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Configuration CORS
-CORS(app, resources={
-    r"/api/*": {
-        "origins": Config.CORS_ORIGINS,
-        "methods": ["GET", "POST", "PUT", "DELETE"],
-        "allow_headers": ["Content-Type"]
-    }
-})
+# Import des modèles et des routes (sans effet sur la base)
+from models import Service, Gallery, Contact, ArchivedContact, Notification, StatCounter
+from routes.services import services_bp
+from routes.gallery import gallery_bp
+from routes.contact import CONTACT_IMPORT_SCHEMA, contact_bp
+from routes.uploads import uploads_bp
+from routes.stats import stats_bp
+from routes.search import search_bp
+from routes.metrics import metrics_bp
 
 # Configuration Swagger
 swagger_config = {
@@ -49,35 +60,196 @@ swagger_template = {
     "tags": [
         {"name": "Services", "description": "Gestion des prestations"},
         {"name": "Gallery", "description": "Gestion de la galerie photos"},
-        {"name": "Contact", "description": "Gestion des messages de contact"}
+        {"name": "Contact", "description": "Gestion des messages de contact"},
+        {"name": "Uploads", "description": "Upload et declinaisons des images"},
+        {"name": "Stats", "description": "Statistiques de l'administration"},
+        {"name": "Search", "description": "Autocompletion du catalogue"},
+        {"name": "Metrics", "description": "Metriques de supervision (Prometheus)"}
     ]
 }
 
-swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
-# Initialisation de la base de données avec l'app
-db.init_app(app)
+def create_app(config=Config):
+    """
+    Cree et configure l'application Flask.
 
-# Import des modèles (après l'initialisation de db)
-from models import Service, Gallery, Contact
+    Aucune analyse des docstrings Swagger ici : la spec OpenAPI est
+    construite a la premiere demande (ou lue depuis SWAGGER_SPEC_FILE). Le
+    schema est cree ou mis a niveau par init_db() (commande `flask init-db`).
+    La base n'est pas lue : l'index d'autocompletion est construit a la
+    premiere recherche de chaque worker, les commandes `flask` ne le
+    construisent jamais.
 
-# Import et enregistrement des routes
-from routes.services import services_bp
-from routes.gallery import gallery_bp
-from routes.contact import contact_bp
+    Args:
+        config: Objet de configuration (classe ou instance)
+
+    Returns:
+        Flask: Application prete a servir
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config['DB_POOL_OPTIONS'],
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS'),
+    )
+
+    # Configuration CORS
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": app.config['CORS_ORIGINS'],
+            "methods": ["GET", "POST", "PUT", "DELETE"],
+            "allow_headers": ["Content-Type"],
+            "expose_headers": ["X-Next-Cursor", "Retry-After", "X-Query-Count"]
+        }
+    })
+
+    # Definitions Swagger des corps de requete, generees depuis les schemas de validation
+    template = dict(swagger_template, definitions=swagger_definitions())
+    swagger = Swagger(app, config=swagger_config, template=template)
+    serve_cached_apispec(app, swagger)
+    app.extensions['swagger'] = swagger
+
+    # Initialisation des extensions
+    db.init_app(app)
+    with app.app_context():
+        configure_sqlite(db.engine, app.config['SQLITE_PRAGMAS'])
+    metrics.init_app(app)
+    query_profiler.init_app(app)
+    compression.init_app(app)
+    catalog_cache.init_app(app)
+    suggest_index.init_app(app)
+    rate_limiter.init_app(app)
+    recent_fingerprints.init_app(app)
+
+    app.register_blueprint(services_bp, url_prefix='/api')
+    app.register_blueprint(gallery_bp, url_prefix='/api')
+    app.register_blueprint(contact_bp, url_prefix='/api')
+    app.register_blueprint(uploads_bp)
+    app.register_blueprint(stats_bp, url_prefix='/api')
+    app.register_blueprint(search_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp, url_prefix='/api')
+
+    # Route de test
+    @app.route('/')
+    def index():
+        return {'message': 'API Site Vitrine Manucure', 'status': 'running'}
+
+    # Statistiques du cache de lecture (hits, misses, versions des tables)
+    @app.route('/api/cache/stats')
+    def cache_stats():
+        return catalog_cache.stats()
+
+    register_commands(app)
 
-app.register_blueprint(services_bp, url_prefix='/api')
-app.register_blueprint(gallery_bp, url_prefix='/api')
-app.register_blueprint(contact_bp, url_prefix='/api')
+    # Demarrage de la file de notifications (les envois en attente sont repris de la table)
+    notification_queue.init_app(app)
 
-# Route de test
-@app.route('/')
-def index():
-    return {'message': 'API Site Vitrine Manucure', 'status': 'running'}
+    return app
 
-# Création des tables au démarrage
-with app.app_context():
+
+def init_db():
+    """
+    Cree les tables et ajoute les colonnes, index et triggers manquants.
+
+    Idempotent ; a lancer au deploiement (contexte d'application requis).
+    """
     db.create_all()
+    upgrade_schema(db)
+    backfill_renditions()
+    ensure_contact_search()
+    ensure_counters()
+
+
+def register_commands(app):
+    """Commandes `flask` de l'application."""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Cree ou met a niveau le schema de la base."""
+        init_db()
+        click.echo('Base initialisee')
+
+    @app.cli.command('export-spec')
+    @click.argument('path', required=False)
+    def export_spec_command(path):
+        """Precalcule la spec OpenAPI (defaut: SWAGGER_SPEC_FILE)."""
+        path = path or app.config.get('SWAGGER_SPEC_FILE')
+        if not path:
+            raise click.UsageError('Indiquez un chemin ou definissez SWAGGER_SPEC_FILE')
+        size = export_apispec(app.extensions['swagger'], path)
+        click.echo(f'Spec ecrite dans {path} ({size} octets)')
+
+    @app.cli.command('seed')
+    @click.option('--services', type=int, default=0, help='Prestations synthetiques')
+    @click.option('--gallery', type=int, default=0, help='Images synthetiques')
+    @click.option('--contacts', type=int, default=0, help='Messages synthetiques')
+    @click.option('--seed', 'seed_value', type=int, default=42, show_default=True,
+                  help='Graine (memes donnees pour une meme graine)')
+    @click.option('--batch-size', type=int, default=5000, show_default=True)
+    def seed_command(services, gallery, contacts, seed_value, batch_size):
+        """Remplit la base : demonstration, ou volumes synthetiques si indiques."""
+        init_db()
+        if services or gallery or contacts:
+            def progress(table, inserted):
+                click.echo(f'\r{table}: {inserted} lignes   ', nl=False)
+
+            counts = seed_synthetic(services, gallery, contacts, seed=seed_value,
+                                    batch_size=batch_size, progress=progress)
+            click.echo()
+        else:
+            counts = seed_demo()
+        click.echo(', '.join(f'{table}: {count}' for table, count in counts.items()))
+
+    @app.cli.command('archive-contacts')
+    @click.option('--after-days', type=int, help='Age minimum (defaut: ARCHIVE_AFTER_DAYS)')
+    @click.option('--status', 'statuses', multiple=True, type=click.Choice(Contact.STATUSES),
+                  help='Statut archivable, repetable (defaut: ARCHIVE_STATUSES)')
+    @click.option('--dry-run', is_flag=True, help='Compte les messages sans les deplacer')
+    def archive_contacts_command(after_days, statuses, dry_run):
+        """Deplace les anciens messages dans contacts_archive (a planifier)."""
+        after_days = app.config['ARCHIVE_AFTER_DAYS'] if after_days is None else after_days
+        statuses = list(statuses) or app.config['ARCHIVE_STATUSES']
+        if dry_run:
+            click.echo(f'{count_eligible(statuses, after_days)} messages a archiver')
+            return
+
+        def progress(status, moved):
+            click.echo(f'\r{status}: {moved} messages   ', nl=False)
+
+        total = archive_contacts(statuses, after_days, app.config['ARCHIVE_BATCH_SIZE'], progress)
+        if total:
+            click.echo()
+        click.echo(f'{total} messages archives')
+
+    @app.cli.command('export-contacts')
+    @click.argument('path', type=click.Path(dir_okay=False, writable=True, allow_dash=True), default='-')
+    @click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), help='Defaut: extension du fichier')
+    @click.option('--status', type=click.Choice(Contact.STATUSES))
+    def export_contacts_command(path, fmt, status):
+        """Exporte les messages en NDJSON ou CSV (defaut: sortie standard)."""
+        fmt = fmt or ('csv' if path.endswith('.csv') else 'ndjson')
+        with click.open_file(path, 'w', encoding='utf-8') as f:
+            for chunk in export_contacts(fmt, status, app.config['EXPORT_CHUNK_SIZE']):
+                f.write(chunk)
+
+    @app.cli.command('import-contacts')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+    @click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), help='Defaut: extension du fichier')
+    def import_contacts_command(path, fmt):
+        """Importe des messages depuis un fichier NDJSON ou CSV."""
+        fmt = fmt or ('csv' if path.endswith('.csv') else 'ndjson')
+        # Migration : index plein texte reconstruit une fois a la fin
+        with click.open_file(path, 'r', encoding='utf-8-sig') as f, bulk_contact_load():
+            result = import_contacts(f, fmt, CONTACT_IMPORT_SCHEMA, app.config['IMPORT_CHUNK_SIZE'])
+        for error in result['errors']:
+            click.echo(f"ligne {error['line']}: {error['error']}", err=True)
+        click.echo(f"{result['imported']} messages importes, {result['skipped']} ignores")
+        if 'error' in result:
+            raise click.ClickException(result['error'])
+
 
 if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        init_db()
     app.run(debug=True, port=5001)
@@ -0,0 +1,119 @@
+"""
+Benchmark : chaque endpoint de l'API via le client de test Flask.
+
+Mesure, sans reseau ni serveur, le cout de chaque route (vue, SQL,
+serialisation) sur un jeu de donnees synthetique reproductible
+(utils.seed) : p50/p95/p99 et requetes/seconde par scenario. Avec
+--baseline, sort en erreur si un scenario regresse par rapport a une
+reference enregistree par --save-baseline.
+
+Usage:
+    cd backend
+    python benchmarks/bench_endpoints.py --save-baseline benchmarks/baseline-endpoints.json
+    python benchmarks/bench_endpoints.py --baseline benchmarks/baseline-endpoints.json
+
+    # Sur une base deja remplie par `flask --app app seed ...`
+    python benchmarks/bench_endpoints.py --database-url sqlite:////tmp/big.db --no-seed
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report import add_baseline_arguments, finish, summarize  # noqa: E402
+
+_counter = itertools.count()
+
+
+def contact_body():
+    """Message unique a chaque appel (pas de detection de doublon)."""
+    n = next(_counter)
+    return {'name': 'Bench', 'email': f'bench{n}@example.com', 'message': f'Message de benchmark {n}'}
+
+
+# (scenario, methode, chemin, corps JSON ou fonction qui le produit)
+SCENARIOS = [
+    ('GET /api/services', 'GET', '/api/services', None),
+    ('GET /api/services/1', 'GET', '/api/services/1', None),
+    ('GET /api/gallery', 'GET', '/api/gallery', None),
+    ('GET /api/gallery?category=gel', 'GET', '/api/gallery?category=gel', None),
+    ('GET /api/gallery/featured', 'GET', '/api/gallery/featured', None),
+    ('GET /api/gallery/1', 'GET', '/api/gallery/1', None),
+    ('GET /api/contacts', 'GET', '/api/contacts', None),
+    ('GET /api/contacts?status=new', 'GET', '/api/contacts?status=new', None),
+    ('GET /api/contacts?q=mariage', 'GET', '/api/contacts?q=mariage', None),
+    ('GET /api/stats', 'GET', '/api/stats', None),
+    ('GET /api/search/suggest?prefix=ge', 'GET', '/api/search/suggest?prefix=ge', None),
+    ('GET /api/metrics', 'GET', '/api/metrics', None),
+    ('GET /apispec.json', 'GET', '/apispec.json', None),
+    ('POST /api/contact', 'POST', '/api/contact', contact_body),
+]
+
+
+def run_scenario(client, method, path, body, requests, warmup, headers=None):
+    """Execute un scenario ; retourne (latences, duree totale)."""
+    def call():
+        payload = body() if callable(body) else body
+        response = client.open(path, method=method, json=payload, headers=headers)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {path}: {response.status_code} {response.get_data(as_text=True)[:200]}')
+
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500, help='Requetes mesurees par scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--database-url', help='Base a utiliser (defaut: base temporaire)')
+    parser.add_argument('--no-seed', action='store_true', help='Ne pas remplir la base')
+    parser.add_argument('--services', type=int, default=1000)
+    parser.add_argument('--gallery', type=int, default=10000)
+    parser.add_argument('--contacts', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help='Ne garde que les scenarios contenant ce texte')
+    parser.add_argument('--accept-encoding', help="En-tete Accept-Encoding envoye (ex. 'gzip, br')")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    # Base temporaire : le benchmark ne touche jamais la base de developpement
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # Mesure des routes, pas du limiteur de debit
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from app import create_app, init_db
+    from utils.seed import seed_synthetic
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+        if not args.no_seed:
+            seed_synthetic(args.services, args.gallery, args.contacts, seed=args.seed)
+
+    client = app.test_client()
+    headers = {'Accept-Encoding': args.accept_encoding} if args.accept_encoding else None
+    results = {}
+    for name, method, path, body in SCENARIOS:
+        if args.only and args.only not in name:
+            continue
+        latencies, elapsed = run_scenario(client, method, path, body, args.requests, args.warmup, headers)
+        results[name] = summarize(latencies, elapsed)
+
+    return finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark : snapshot JSON pre-encode vs to_dict() + jsonify.
+
+Compare, pour GET /api/services :
+- l'ancien chemin (requete SQL + to_dict() + jsonify a chaque appel) ;
+- le cache de dicts seul (jsonify a chaque appel) ;
+- le snapshot pre-encode (octets servis tels quels).
+
+Usage:
+    cd backend
+    python benchmarks/bench_snapshot.py --rows 2000 --repeat 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+# Base temporaire : le benchmark ne touche jamais la base de developpement
+_db_file = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+
+from app import create_app, init_db  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Service  # noqa: E402
+from utils.snapshot import encode_json, json_response  # noqa: E402
+
+app = create_app()
+
+
+def seed(rows):
+    """Insere des services de test."""
+    db.session.bulk_insert_mappings(Service, [
+        {
+            'name': f'Service {i}',
+            'description': 'Soin complet des ongles avec vernis traditionnel ' * 3,
+            'price': 20 + i % 40,
+            'duration': 30 + i % 60,
+            'image_url': f'/uploads/services/service-{i}.jpg',
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def report(label, seconds, repeat):
+    print(f'{label:<32} {seconds / repeat * 1e6:>10.1f} us/requete')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+        seed(args.rows)
+
+    with app.test_request_context('/api/services'):
+        dicts = [service.to_dict() for service in Service.query.all()]
+        body = encode_json(dicts)
+
+        legacy = timeit.timeit(
+            lambda: jsonify([service.to_dict() for service in Service.query.all()]).get_data(),
+            number=args.repeat,
+        )
+        cached_dicts = timeit.timeit(lambda: jsonify(dicts).get_data(), number=args.repeat)
+        snapshot = timeit.timeit(lambda: json_response(body).get_data(), number=args.repeat)
+
+    client = app.test_client()
+    client.get('/api/services')
+    end_to_end = timeit.timeit(lambda: client.get('/api/services').data, number=args.repeat)
+
+    print(f'{args.rows} services, {len(body)} octets, {args.repeat} iterations')
+    report('SQL + to_dict + jsonify', legacy, args.repeat)
+    report('dicts en cache + jsonify', cached_dicts, args.repeat)
+    report('snapshot pre-encode', snapshot, args.repeat)
+    report('GET /api/services (cache chaud)', end_to_end, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
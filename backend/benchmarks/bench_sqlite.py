@@ -0,0 +1,116 @@
+"""
+Benchmark : debit SQLite en lectures/ecritures concurrentes, avant/apres profil.
+
+Des threads inserent des messages de contact pendant que d'autres lisent la
+premiere page de la boite de reception, sur deux bases temporaires :
+- profil par defaut (journal rollback, pas de busy_timeout) ;
+- profil de Config (WAL, busy_timeout, pragmas, pool) + retry_on_lock.
+
+Usage:
+    cd backend
+    python benchmarks/bench_sqlite.py --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Contact  # noqa: E402
+from utils.db import configure_sqlite, engine_options, is_lock_error  # noqa: E402
+
+contacts = Contact.__table__
+
+
+def make_engine(tuned):
+    """Cree une base temporaire avec ou sans le profil de production."""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    if tuned:
+        url = f'sqlite:///{path}'
+        engine = create_engine(url, **engine_options(url, Config.DB_POOL_OPTIONS))
+        configure_sqlite(engine, Config.SQLITE_PRAGMAS)
+    else:
+        # Reglages par defaut de pysqlite, sans attente sur verrou
+        engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+    db.metadata.create_all(engine, tables=[contacts])
+    return engine
+
+
+def run(engine, writers, readers, seconds, retries):
+    """Lance les threads et retourne (ecritures, lectures, erreurs de verrou)."""
+    stop = threading.Event()
+    counts = {'writes': 0, 'reads': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def write():
+        while not stop.is_set():
+            for attempt in range(retries + 1):
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(contacts).values(
+                            name='Bench', email='bench@example.com', message='x' * 200,
+                            status='new', created_at=datetime.utcnow(),
+                        ))
+                    count('writes')
+                    break
+                except OperationalError as e:
+                    if not is_lock_error(e):
+                        raise
+                    count('locked')
+                    time.sleep(0.01 * 2 ** attempt)
+
+    def read():
+        query = select(contacts).order_by(contacts.c.created_at.desc()).limit(50)
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(query).fetchall()
+                count('reads')
+            except OperationalError as e:
+                if not is_lock_error(e):
+                    raise
+                count('locked')
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f'{args.writers} ecrivains, {args.readers} lecteurs, {args.seconds}s par profil')
+    for label, tuned, retries in [('defaut', False, 0), ('production', True, 4)]:
+        counts = run(make_engine(tuned), args.writers, args.readers, args.seconds, retries)
+        print(
+            f"{label:<12} {counts['writes'] / args.seconds:>8.0f} ecritures/s"
+            f" {counts['reads'] / args.seconds:>8.0f} lectures/s"
+            f" {counts['locked']:>6} erreurs 'database is locked'"
+        )
+
+
+if __name__ == '__main__':
+    main()
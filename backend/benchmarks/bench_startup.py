@@ -0,0 +1,75 @@
+"""
+Benchmark : demarrage a froid d'un worker.
+
+Chaque mesure est faite dans un nouveau processus Python (comme un worker
+qui demarre), sur une base temporaire deja initialisee :
+- import du module app (bibliotheques, modeles, routes, schemas) ;
+- create_app() (aucun acces a la base, aucune analyse des docstrings) ;
+- init_db() (etape de deploiement, hors demarrage des workers) ;
+- premiere reponse de /apispec.json, generee ou lue depuis un fichier
+  precalcule par `flask export-spec`.
+
+Usage:
+    cd backend
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, time
+t0 = time.perf_counter()
+import app as module
+t1 = time.perf_counter()
+application = module.create_app()
+t2 = time.perf_counter()
+with application.app_context():
+    module.init_db()
+t3 = time.perf_counter()
+client = application.test_client()
+client.get('/apispec.json')
+t4 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'init_db': t3 - t2, 'apispec': t4 - t3}))
+'''
+
+
+def probe(env):
+    """Lance un worker neuf et retourne ses durees (secondes) par etape."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BACKEND, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # Base temporaire : le benchmark ne touche jamais la base de developpement
+    directory = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    env.pop('SWAGGER_SPEC_FILE', None)
+    spec_file = os.path.join(directory, 'apispec.json')
+
+    probe(env)  # creation de la base, hors mesure
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'export-spec', spec_file],
+                   cwd=BACKEND, env=env, check=True, capture_output=True)
+
+    for label, run_env in (('spec generee', env), ('spec precalculee', dict(env, SWAGGER_SPEC_FILE=spec_file))):
+        runs = [probe(run_env) for _ in range(args.runs)]
+        print(f'--- {label} (mediane sur {args.runs} processus)')
+        for step in ('import', 'create_app', 'init_db', 'apispec'):
+            print(f'{step:<32} {statistics.median(run[step] for run in runs) * 1e3:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark : validation compilee (utils.validation) vs controles ecrits a la main.
+
+Compare, par corps de requete :
+- les controles d'origine des vues (is_valid_email / is_valid_phone et tests
+  successifs de send_contact, service_values), recopies ici comme reference ;
+- Schema.validate, compile une fois a l'import des routes.
+
+Usage:
+    cd backend
+    python benchmarks/bench_validation.py --repeat 100000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes.contact import CONTACT_SCHEMA  # noqa: E402
+from routes.services import SERVICE_SCHEMA  # noqa: E402
+
+CONTACT = {
+    'name': 'Marie Dupont',
+    'email': 'marie@example.com',
+    'phone': '06 12 34 56 78',
+    'message': 'Bonjour, je souhaite prendre rendez-vous pour une pose de gel.',
+}
+
+SERVICE = {
+    'name': 'Pose de gel',
+    'description': 'Application de vernis gel semi-permanent',
+    'price': 35.0,
+    'duration': 60,
+    'image_url': '/uploads/services/gel.jpg',
+}
+
+
+# --- Controles d'origine (avant utils.validation) ---
+
+def is_valid_email(email):
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+def is_valid_phone(phone):
+    if not phone:
+        return True
+    pattern = r'^(\+33|0)[1-9](\d{2}){4}$'
+    return re.match(pattern, phone.replace(' ', '').replace('.', '').replace('-', '')) is not None
+
+
+def legacy_contact(data):
+    if not data:
+        raise ValueError('Donnees manquantes')
+    if not data.get('name') or not data.get('name').strip():
+        raise ValueError('Le nom est requis')
+    if not data.get('email'):
+        raise ValueError("L'email est requis")
+    if not data.get('message') or not data.get('message').strip():
+        raise ValueError('Le message est requis')
+    if not is_valid_email(data['email']):
+        raise ValueError("Format d'email invalide")
+    if data.get('phone') and not is_valid_phone(data['phone']):
+        raise ValueError('Format de telephone invalide')
+    return {
+        'name': data['name'].strip(),
+        'email': data['email'].strip(),
+        'phone': data.get('phone', '').strip() or None,
+        'message': data['message'].strip(),
+    }
+
+
+def legacy_service(data):
+    if not isinstance(data, dict) or not data.get('name') or not data.get('price'):
+        raise ValueError('Le nom et le prix sont requis')
+    return {
+        'name': data['name'],
+        'description': data.get('description'),
+        'price': data['price'],
+        'duration': data.get('duration'),
+        'image_url': data.get('image_url')
+    }
+
+
+def report(label, seconds, repeat):
+    print(f'{label:<32} {seconds / repeat * 1e6:>10.2f} us/requete')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Les deux chemins doivent accepter les memes corps
+    assert legacy_contact(CONTACT)['email'] == CONTACT_SCHEMA.validate(CONTACT)['email']
+    assert legacy_service(SERVICE)['price'] == SERVICE_SCHEMA.validate(SERVICE)['price']
+
+    cases = [
+        ('contact (a la main)', lambda: legacy_contact(CONTACT)),
+        ('contact (schema compile)', lambda: CONTACT_SCHEMA.validate(CONTACT)),
+        ('service (a la main)', lambda: legacy_service(SERVICE)),
+        ('service (schema compile)', lambda: SERVICE_SCHEMA.validate(SERVICE)),
+    ]
+    for label, func in cases:
+        report(label, timeit.timeit(func, number=args.repeat), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
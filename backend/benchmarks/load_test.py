@@ -0,0 +1,109 @@
+"""
+Test de charge HTTP : clients concurrents contre un serveur demarre.
+
+Chaque client (un thread, une connexion keep-alive) enchaine des requetes
+GET tirees au hasard parmi les chemins ponderes, pendant une duree fixe.
+Rapporte p50/p95/p99 et requetes/seconde par chemin et au total ; avec
+--baseline, sort en erreur si un chemin regresse. Ne mesure que les
+lectures : les ecritures passent par le limiteur de debit de POST /api/contact.
+
+Usage:
+    cd backend
+    flask --app app seed --services 1000 --gallery 100000 --contacts 500000
+    gunicorn -w 4 -b 127.0.0.1:5001 'app:create_app()' &
+    python benchmarks/load_test.py --url http://127.0.0.1:5001 --concurrency 32 --duration 30
+"""
+import argparse
+import http.client
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from report import add_baseline_arguments, finish, summarize
+
+# (chemin, poids) : trafic d'une vitrine, surtout des lectures du catalogue
+PATHS = [
+    ('/api/services', 30),
+    ('/api/gallery', 25),
+    ('/api/gallery/featured', 15),
+    ('/api/gallery?category=gel', 10),
+    ('/api/search/suggest?prefix=ge', 10),
+    ('/api/stats', 5),
+    ('/api/contacts', 5),
+]
+
+
+def client(url, paths, weights, deadline, seed, headers, results, errors, lock):
+    """Un client : requetes en boucle jusqu'a l'echeance."""
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    rng = random.Random(seed)
+    latencies = {path: [] for path in paths}
+    failures = 0
+
+    while time.perf_counter() < deadline:
+        path = rng.choices(paths, weights)[0]
+        t0 = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                failures += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            failures += 1
+            connection.close()
+            continue
+        latencies[path].append(time.perf_counter() - t0)
+
+    connection.close()
+    with lock:
+        for path, values in latencies.items():
+            results[path].extend(values)
+        errors[0] += failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default=os.getenv('LOAD_TEST_URL', 'http://127.0.0.1:5001'))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help='Duree en secondes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--accept-encoding', help="En-tete Accept-Encoding envoye (ex. 'gzip, br')")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    paths = [path for path, _ in PATHS]
+    weights = [weight for _, weight in PATHS]
+    results = {path: [] for path in paths}
+    errors = [0]
+    lock = threading.Lock()
+    headers = {'Accept-Encoding': args.accept_encoding} if args.accept_encoding else {}
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args.url, paths, weights, deadline, args.seed + i, headers,
+                                              results, errors, lock))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    summaries = {f'GET {path}': summarize(values, elapsed) for path, values in results.items()}
+    summaries['total'] = summarize([value for values in results.values() for value in values], elapsed)
+    print(f'{args.concurrency} clients, {args.duration:.0f} s, {errors[0]} erreurs')
+    status = finish(summaries, args)
+    return status or (1 if errors[0] else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
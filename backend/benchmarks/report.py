@@ -0,0 +1,108 @@
+"""
+Statistiques de latence et comparaison a une reference (baseline).
+
+Partage par bench_endpoints.py et load_test.py. Une reference est un fichier
+JSON {scenario: {p50, p95, p99, rps, count}} produit par --save-baseline ;
+--baseline compare une nouvelle mesure a ce fichier et le script sort en
+erreur (code 1) si un scenario regresse au-dela de la tolerance.
+
+Les references dependent de la machine : les enregistrer et les comparer
+sur le meme poste (ou le meme type de runner CI).
+"""
+import json
+import math
+import os
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Percentile au rang le plus proche d'une liste deja triee."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, elapsed):
+    """
+    Resume une serie de mesures.
+
+    Args:
+        latencies (list): Durees des requetes (secondes)
+        elapsed (float): Duree totale de la serie (secondes)
+
+    Returns:
+        dict: p50/p95/p99 (millisecondes), rps et nombre de requetes
+    """
+    values = sorted(latencies)
+    summary = {f'p{p}': percentile(values, p) * 1000 for p in PERCENTILES}
+    summary['rps'] = len(values) / elapsed if elapsed else 0.0
+    summary['count'] = len(values)
+    return summary
+
+
+def print_table(results):
+    """Affiche les resultats, un scenario par ligne."""
+    print(f"{'scenario':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>10} {'n':>7}")
+    for name, summary in results.items():
+        print(f"{name:<40} {summary['p50']:>9.2f} {summary['p95']:>9.2f} {summary['p99']:>9.2f} "
+              f"{summary['rps']:>10.1f} {summary['count']:>7}")
+
+
+def save_baseline(results, path):
+    """Enregistre les resultats comme reference."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(results, path, tolerance):
+    """
+    Compare des resultats a une reference.
+
+    Un scenario regresse si son p95 depasse celui de la reference de plus de
+    `tolerance` (0.2 = 20 %) ou si son debit baisse d'autant. Les scenarios
+    absents de la reference sont ignores.
+
+    Returns:
+        list: Descriptions des regressions (vide si aucune)
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for name, summary in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if summary['p95'] > reference['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {summary['p95']:.2f} ms (reference {reference['p95']:.2f} ms)")
+        if summary['rps'] < reference['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {summary['rps']:.1f} req/s (reference {reference['rps']:.1f} req/s)")
+    return regressions
+
+
+def add_baseline_arguments(parser):
+    """Options communes : --baseline, --save-baseline, --tolerance."""
+    parser.add_argument('--baseline', help='Reference JSON a comparer (code 1 si regression)')
+    parser.add_argument('--save-baseline', help='Enregistre les resultats comme reference')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Ecart tolere (defaut 0.2 = 20 %%)')
+
+
+def finish(results, args):
+    """Affiche, enregistre et compare les resultats ; retourne le code de sortie."""
+    print_table(results)
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f'Reference enregistree dans {args.save_baseline}')
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print('REGRESSIONS :')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'Aucune regression (tolerance {args.tolerance:.0%})')
+    return 0
@@ -13,10 +13,116 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Profil SQLite de production, applique a chaque connexion
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',        # lectures et ecriture simultanees
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),  # ms d'attente sur verrou
+        'synchronous': 'NORMAL',      # sur en mode WAL, bien moins de fsync
+        'cache_size': -20000,         # 20 MB de cache de pages par connexion
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+    # Pool de connexions (une connexion par thread de worker). Applique par
+    # create_app aux seules bases fichier : une base SQLite en memoire
+    # (sqlite://) utilise un pool a connexion unique, sans ces options
+    DB_POOL_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+    }
+
     # Configuration des uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+    # Declinaisons d'images (pool de processus, qualite de compression)
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+    JPEG_QUALITY = 85
+    WEBP_QUALITY = 80
+
+    # Service des fichiers uploades (/uploads/...)
+    # Noms derives du contenu : mise en cache navigateur d'un an
+    UPLOADS_MAX_AGE = 365 * 24 * 3600
+    # Delegation au proxy : X-Accel-Redirect (nginx, prefixe de la location interne)
+    # ou X-Sendfile (Apache/lighttpd, via l'option Flask USE_X_SENDFILE)
+    UPLOADS_ACCEL_PREFIX = os.getenv('UPLOADS_ACCEL_PREFIX')
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
+    # Pagination (parametres ?limit= et ?cursor=)
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+
+    # Operations par lot (nombre maximum d'elements par requete)
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 10000))
+
+    # Archivage des anciens messages (flask archive-contacts, a planifier)
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+    ARCHIVE_STATUSES = [s.strip() for s in os.getenv('ARCHIVE_STATUSES', 'replied').split(',') if s.strip()]
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000))
+
+    # Export / import des messages en flux (NDJSON, CSV)
+    EXPORT_CHUNK_SIZE = 1000  # lignes lues par tranche
+    IMPORT_CHUNK_SIZE = 1000  # messages inseres par lot
+    IMPORT_MAX_CONTENT_LENGTH = int(os.getenv('IMPORT_MAX_CONTENT_LENGTH', 1024 * 1024 * 1024))  # 1 Go
+
+    # Cache de lecture du catalogue (nombre maximum d'entrees, LRU)
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+
+    # Autocompletion du catalogue (nombre de suggestions par defaut et maximum)
+    SUGGEST_DEFAULT_LIMIT = int(os.getenv('SUGGEST_DEFAULT_LIMIT', 10))
+    SUGGEST_MAX_LIMIT = int(os.getenv('SUGGEST_MAX_LIMIT', 50))
+
+    # Limitation de debit (seaux a jetons par client et global, ex: '5/minute')
+    # RATELIMIT_STORAGE_URL=sqlite:///chemin.db partage les seaux entre workers
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_MAX_CLIENTS = int(os.getenv('RATELIMIT_MAX_CLIENTS', 10000))
+    RATELIMITS = {
+        'contact': {
+            'client': os.getenv('RATELIMIT_CONTACT_CLIENT', '5/minute'),
+            'global': os.getenv('RATELIMIT_CONTACT_GLOBAL', '120/minute'),
+        },
+    }
+
+    # Doublons de messages de contact (fenetre en secondes, 0 pour desactiver)
+    CONTACT_DUPLICATE_WINDOW = int(os.getenv('CONTACT_DUPLICATE_WINDOW', 600))
+
+    # Metriques Prometheus (/api/metrics). Avec plusieurs workers, METRICS_DIR
+    # est un repertoire commun ou chaque processus depose ses compteurs
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # secondes
+
+    # Profilage SQL (developpement) : requetes lentes avec leur plan, N+1
+    SQL_PROFILING = os.getenv('SQL_PROFILING', 'false').lower() == 'true'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))  # meme requete par requete HTTP
+
+    # Compression des reponses (gzip, et br si le paquet Brotli est installe)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # octets
+
+    # Spec OpenAPI precalculee (`flask export-spec`) ; sans fichier, elle est
+    # generee a la premiere demande de /apispec.json puis gardee en memoire
+    SWAGGER_SPEC_FILE = os.getenv('SWAGGER_SPEC_FILE')
+
+    # Email (SMTP) - sans MAIL_SERVER, aucune notification n'est envoyee
+    MAIL_SERVER = os.getenv('MAIL_SERVER')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'true').lower() == 'true'
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+    ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'admin@example.com')
+
+    # File de notifications (threads d'envoi, taille de la file, essais)
+    NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', 1))
+    NOTIFICATION_QUEUE_SIZE = 1000
+    NOTIFICATION_MAX_ATTEMPTS = 5
+    NOTIFICATION_RETRY_DELAY = 30  # secondes, double a chaque essai
+    NOTIFICATION_SWEEP_INTERVAL = 60  # secondes
+
     # CORS
     CORS_ORIGINS = ['http://localhost:5173']
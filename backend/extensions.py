@@ -1,4 +1,36 @@
 from flask_sqlalchemy import SQLAlchemy
+from utils.cache import VersionedCache
+from utils.compression import Compression
+from utils.fingerprint import RecentFingerprints
+from utils.metrics import Metrics
+from utils.notifications import NotificationQueue
+from utils.profiling import QueryProfiler
+from utils.ratelimit import RateLimiter
+from utils.suggest import SuggestIndex
 
 # Instance de la base de données (initialisée sans app)
 db = SQLAlchemy()
+
+# Cache de lecture du catalogue (services, galerie)
+catalog_cache = VersionedCache()
+
+# File asynchrone des notifications email
+notification_queue = NotificationQueue()
+
+# Index d'autocompletion du catalogue (services, galerie)
+suggest_index = SuggestIndex()
+
+# Limitation de debit des routes publiques
+rate_limiter = RateLimiter()
+
+# Empreintes recentes des messages de contact (doublons)
+recent_fingerprints = RecentFingerprints()
+
+# Metriques Prometheus (requetes HTTP et SQL par endpoint)
+metrics = Metrics()
+
+# Profilage SQL optionnel (requetes lentes, N+1)
+query_profiler = QueryProfiler()
+
+# Compression negociee des reponses (gzip, brotli)
+compression = Compression()
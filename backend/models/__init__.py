@@ -2,3 +2,7 @@
 from models.service import Service
 from models.gallery import Gallery
 from models.contact import Contact
+from models.archive import ArchivedContact
+from models.notification import Notification
+from models.counter import StatCounter
+from models.version import TableChange, TableVersion
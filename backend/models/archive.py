@@ -0,0 +1,38 @@
+from datetime import datetime
+from extensions import db
+
+
+class ArchivedContact(db.Model):
+    """Message de contact archivé (hors de la boîte de réception)."""
+
+    __tablename__ = 'contacts_archive'
+    __table_args__ = (
+        # Consultation des archives : plus recents d'abord, ou par expediteur
+        db.Index('ix_contacts_archive_created_at', 'created_at'),
+        db.Index('ix_contacts_archive_email_created_at', 'email', 'created_at'),
+    )
+
+    # Même id que dans contacts : un message garde son identifiant une fois archivé
+    # (contacts est en AUTOINCREMENT, un id archivé n'est jamais réattribué)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(20), nullable=True)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    fingerprint = db.Column(db.String(64), nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convertit le modèle en dictionnaire."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'phone': self.phone,
+            'message': self.message,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
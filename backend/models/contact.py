@@ -6,6 +6,16 @@ class Contact(db.Model):
     """Modèle pour les messages de contact."""
 
     __tablename__ = 'contacts'
+    __table_args__ = (
+        # Pagination keyset de la boite de reception, avec ou sans filtre de statut
+        # (SQLite ajoute implicitement l'id (rowid) en fin d'index)
+        db.Index('ix_contacts_created_at', 'created_at'),
+        db.Index('ix_contacts_status_created_at', 'status', 'created_at'),
+        # Detection des doublons : empreinte vue depuis une date donnee
+        db.Index('ix_contacts_fingerprint_created_at', 'fingerprint', 'created_at'),
+        # Ids jamais reutilises : un message archive garde le sien (contacts_archive)
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -14,6 +24,7 @@ class Contact(db.Model):
     message = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='new')  # new, read, replied
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    fingerprint = db.Column(db.String(64), nullable=True)  # SHA-256 email + message normalises
 
     # Statuts valides
     STATUSES = ['new', 'read', 'replied']
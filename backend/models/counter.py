@@ -0,0 +1,11 @@
+from extensions import db
+
+
+class StatCounter(db.Model):
+    """Compteurs maintenus a chaque ecriture (statistiques de l'admin)."""
+
+    __tablename__ = 'stat_counters'
+
+    # ex: 'contacts.total', 'contacts.status.new', 'gallery.is_featured.true'
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
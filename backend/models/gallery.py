@@ -1,5 +1,6 @@
 from datetime import datetime
 from extensions import db
+from utils.images import rendition_urls
 
 
 class Gallery(db.Model):
@@ -10,9 +11,12 @@ class Gallery(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     image_url = db.Column(db.String(255), nullable=False)
-    category = db.Column(db.String(50), nullable=True)  # nail-art, french, gel, extension, soin
-    is_featured = db.Column(db.Boolean, default=False)
+    category = db.Column(db.String(50), nullable=True, index=True)  # nail-art, french, gel, extension, soin
+    is_featured = db.Column(db.Boolean, default=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Déclinaisons de image_url générées (voir utils.images), NULL avant vérification
+    renditions_ready = db.Column(db.Boolean, default=False)
 
     # Catégories valides
     CATEGORIES = ['nail-art', 'french', 'gel', 'extension', 'soin']
@@ -23,7 +27,9 @@ class Gallery(db.Model):
             'id': self.id,
             'title': self.title,
             'image_url': self.image_url,
+            'renditions': rendition_urls(self.image_url, self.renditions_ready),
             'category': self.category,
             'is_featured': self.is_featured,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
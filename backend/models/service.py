@@ -1,5 +1,6 @@
 from datetime import datetime
 from extensions import db
+from utils.images import rendition_urls
 
 
 class Service(db.Model):
@@ -15,6 +16,8 @@ class Service(db.Model):
     image_url = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Déclinaisons de image_url générées (voir utils.images), NULL avant vérification
+    renditions_ready = db.Column(db.Boolean, default=False)
 
     def to_dict(self):
         """Convertit le modèle en dictionnaire."""
@@ -25,6 +28,7 @@ class Service(db.Model):
             'price': self.price,
             'duration': self.duration,
             'image_url': self.image_url,
+            'renditions': rendition_urls(self.image_url, self.renditions_ready),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
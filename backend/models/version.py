@@ -0,0 +1,24 @@
+from datetime import datetime
+from extensions import db
+
+
+class TableVersion(db.Model):
+    """Version des tables du catalogue, partagée par tous les processus."""
+
+    __tablename__ = 'table_versions'
+
+    # ex: 'services', 'gallery'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    modified_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class TableChange(db.Model):
+    """Lignes modifiées par chaque version d'une table (journal borné)."""
+
+    __tablename__ = 'table_changes'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, primary_key=True)
+    # Liste JSON des ids modifiés, NULL si inconnus (chargement en masse)
+    ids = db.Column(db.Text)
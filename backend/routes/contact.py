@@ -1,26 +1,140 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+import io
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from extensions import db, notification_queue, rate_limiter, recent_fingerprints
+from models.archive import ArchivedContact
 from models.contact import Contact
-import re
+from models.notification import Notification
+from utils.batch import is_id
+from utils.db import retry_on_lock
+from utils.email_sender import build_contact_notification
+from utils.fields import Fieldset
+from utils.fingerprint import contact_fingerprint
+from utils.pagination import get_page_args, paginate, paginated_response
+from utils.search import search_contacts
+from utils.stats import increment, record_change
+from utils.transfer import FORMATS, check_format, export_contacts, import_contacts
+from utils.validation import Field, Schema
+from datetime import datetime, timedelta
+from sqlalchemy import delete, update
 
 contact_bp = Blueprint('contact', __name__)
 
 
-def is_valid_email(email):
-    """Verifie si l'email est valide."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+CONTACT_SCHEMA = Schema('Contact', {
+    'name': Field('string', required=True, strip=True, max_length=100,
+                  messages={'required': 'Le nom est requis'}, example='Marie Dupont'),
+    'email': Field('string', required=True, strip=True, max_length=100,
+                   pattern=r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+                   messages={'required': "L'email est requis", 'pattern': "Format d'email invalide"},
+                   example='marie@example.com'),
+    'phone': Field('string', strip=True, blank_as_none=True, max_length=20,
+                   pattern=r'^(\+33|0)[1-9](\d{2}){4}$',
+                   normalize=lambda phone: phone.replace(' ', '').replace('.', '').replace('-', ''),
+                   messages={'pattern': 'Format de telephone invalide'},
+                   description='Format francais', example='0612345678'),
+    'message': Field('string', required=True, strip=True,
+                     messages={'required': 'Le message est requis'},
+                     example='Bonjour, je souhaite prendre rendez-vous...'),
+})
+
+# Message importe depuis un autre systeme : statut et date de reception repris
+CONTACT_IMPORT_SCHEMA = Schema('ContactImport', dict(CONTACT_SCHEMA.fields, **{
+    'status': Field('string', default='new', enum=Contact.STATUSES,
+                    messages={'enum': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'},
+                    example='replied'),
+    'created_at': Field('string', description='Date de reception (ISO 8601, defaut: maintenant)',
+                        example='2025-06-01T14:30:00'),
+}))
+
+CONTACT_FIELDS = Fieldset(Contact, ['id', 'name', 'email', 'phone', 'message', 'status', 'created_at'])
+
+CONTACT_STATUS_SCHEMA = Schema('ContactStatus', {
+    'status': Field('string', required=True, enum=Contact.STATUSES,
+                    messages={'required': 'Le statut est requis',
+                              'enum': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'},
+                    example='read'),
+})
+
+
+def bulk_conditions(data):
+    """
+    Construit les conditions SQL d'une operation groupee.
+
+    Args:
+        data (dict): Corps de la requete, avec 'ids' ou 'filter'
+            ({'status': ..., 'before': date ISO})
+
+    Returns:
+        list: Conditions SQLAlchemy
+
+    Raises:
+        ValueError: Si la selection est absente ou invalide
+    """
+    ids = data.get('ids')
+    criteria = data.get('filter')
+
+    if (ids is None) == (criteria is None):
+        raise ValueError("Indiquez soit 'ids', soit 'filter'")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(is_id(id) for id in ids):
+            raise ValueError("'ids' doit etre une liste d'entiers non vide")
+        if len(ids) > current_app.config['BATCH_MAX_ITEMS']:
+            raise ValueError(f"'ids' depasse {current_app.config['BATCH_MAX_ITEMS']} elements")
+        return [Contact.id.in_(ids)]
 
+    if not isinstance(criteria, dict) or not (criteria.get('status') or criteria.get('before')):
+        raise ValueError("'filter' doit contenir 'status' et/ou 'before'")
 
-def is_valid_phone(phone):
-    """Verifie si le numero de telephone est valide (format francais)."""
-    if not phone:
-        return True
-    pattern = r'^(\+33|0)[1-9](\d{2}){4}$'
-    return re.match(pattern, phone.replace(' ', '').replace('.', '').replace('-', '')) is not None
+    conditions = []
+    if criteria.get('status'):
+        if criteria['status'] not in Contact.STATUSES:
+            raise ValueError(f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}')
+        conditions.append(Contact.status == criteria['status'])
+    if criteria.get('before'):
+        try:
+            before = datetime.fromisoformat(str(criteria['before']))
+        except ValueError:
+            raise ValueError("Date 'before' invalide (format ISO 8601 attendu)")
+        conditions.append(Contact.created_at < before)
+    return conditions
+
+
+def find_duplicate(fingerprint):
+    """
+    Cherche un message de meme empreinte recu dans la fenetre de detection.
+
+    La memoire du processus est consultee d'abord, puis l'index
+    (fingerprint, created_at) : jamais de parcours de la table.
+
+    Returns:
+        dict: Message d'origine, ou None
+    """
+    window = recent_fingerprints.window
+    if not window:
+        return None
+
+    original = recent_fingerprints.get(fingerprint)
+    if original is not None:
+        return original
+
+    since = datetime.utcnow() - timedelta(seconds=window)
+    contact = Contact.query.filter(
+        Contact.fingerprint == fingerprint, Contact.created_at >= since
+    ).order_by(Contact.created_at.desc()).first()
+    if contact is None:
+        return None
+
+    original = contact.to_dict()
+    # Expire avec la fenetre de l'original, pas a partir de maintenant
+    recent_fingerprints.add(fingerprint, original, contact.created_at)
+    return original
 
 
 @contact_bp.route('/contact', methods=['POST'])
+@rate_limiter.limit('contact')
+@retry_on_lock
 def send_contact():
     """
     Envoie un message de contact
@@ -32,24 +146,7 @@ def send_contact():
         in: body
         required: true
         schema:
-          type: object
-          required:
-            - name
-            - email
-            - message
-          properties:
-            name:
-              type: string
-              example: "Marie Dupont"
-            email:
-              type: string
-              example: "marie@example.com"
-            phone:
-              type: string
-              example: "0612345678"
-            message:
-              type: string
-              example: "Bonjour, je souhaite prendre rendez-vous..."
+          $ref: '#/definitions/Contact'
     responses:
       201:
         description: Message envoye avec succes
@@ -61,37 +158,63 @@ def send_contact():
               example: "Message envoye avec succes"
             contact:
               type: object
+      200:
+        description: Message identique deja recu recemment (doublon ignore, message d'origine renvoye)
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: "Message deja recu"
+            contact:
+              type: object
+            duplicate:
+              type: boolean
+              example: true
       400:
         description: Donnees invalides
+      429:
+        description: Trop de messages envoyes (par client ou au total), reessayer apres Retry-After secondes
+        headers:
+          Retry-After:
+            type: integer
     """
-    data = request.get_json()
+    try:
+        values = CONTACT_SCHEMA.validate(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not data:
-        return jsonify({'error': 'Donnees manquantes'}), 400
+    fingerprint = contact_fingerprint(values['email'], values['message'])
+    original = find_duplicate(fingerprint)
+    if original is not None:
+        return jsonify({
+            'message': 'Message deja recu',
+            'contact': original,
+            'duplicate': True
+        }), 200
 
-    if not data.get('name') or not data.get('name').strip():
-        return jsonify({'error': 'Le nom est requis'}), 400
-    if not data.get('email'):
-        return jsonify({'error': "L'email est requis"}), 400
-    if not data.get('message') or not data.get('message').strip():
-        return jsonify({'error': 'Le message est requis'}), 400
+    contact = Contact(**values, fingerprint=fingerprint)
 
-    if not is_valid_email(data['email']):
-        return jsonify({'error': "Format d'email invalide"}), 400
-
-    if data.get('phone') and not is_valid_phone(data['phone']):
-        return jsonify({'error': 'Format de telephone invalide'}), 400
+    db.session.add(contact)
 
-    contact = Contact(
-        name=data['name'].strip(),
-        email=data['email'].strip(),
-        phone=data.get('phone', '').strip() or None,
-        message=data['message'].strip()
-    )
+    # Notification enregistree dans la meme transaction, envoyee en arriere-plan
+    notification = None
+    if notification_queue.enabled:
+        recipient, subject, body = build_contact_notification(
+            contact.to_dict(), admin_email=current_app.config['ADMIN_EMAIL']
+        )
+        notification = Notification(recipient=recipient, subject=subject, body=body)
+        db.session.add(notification)
 
-    db.session.add(contact)
+    db.session.flush()
+    record_change('contacts', new={'status': contact.status})
     db.session.commit()
 
+    if notification is not None:
+        notification_queue.submit(notification.id)
+    if recent_fingerprints.window:
+        recent_fingerprints.add(fingerprint, contact.to_dict(), contact.created_at)
+
     return jsonify({
         'message': 'Message envoye avec succes',
         'contact': contact.to_dict()
@@ -101,20 +224,44 @@ def send_contact():
 @contact_bp.route('/contacts', methods=['GET'])
 def get_contacts():
     """
-    Liste tous les messages de contact (admin)
+    Liste les messages de contact, du plus recent au plus ancien (admin)
     ---
     tags:
       - Contact
     parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Recherche plein texte (nom, email, message) ; resultats tries par pertinence
       - name: status
         in: query
         type: string
         required: false
         enum: [new, read, replied]
         description: Filtrer par statut
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Nombre de messages par page (defaut 50, max 200)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Curseur de la page suivante (en-tete X-Next-Cursor de la page precedente)
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Champs a renvoyer, separes par des virgules (ex. id,name,status,created_at), defaut tous
     responses:
       200:
-        description: Liste des messages
+        description: Page de messages
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Curseur de la page suivante (absent sur la derniere page)
         schema:
           type: array
           items:
@@ -136,21 +283,36 @@ def get_contacts():
               created_at:
                 type: string
       400:
-        description: Statut invalide
+        description: Statut, recherche, limite, curseur ou champ invalide
     """
     status = request.args.get('status')
+    q = request.args.get('q', '').strip()
 
+    query = Contact.query
     if status:
         if status not in Contact.STATUSES:
             return jsonify({'error': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'}), 400
-        contacts = Contact.query.filter_by(status=status).order_by(Contact.created_at.desc()).all()
-    else:
-        contacts = Contact.query.order_by(Contact.created_at.desc()).all()
+        query = query.filter_by(status=status)
+
+    try:
+        fields = CONTACT_FIELDS.parse(request.args.get('fields'))
+        # created_at : cle de tri du curseur, lue meme si elle n'est pas demandee
+        query = query.options(*CONTACT_FIELDS.options(fields, extra=[Contact.created_at]))
+        limit, cursor = get_page_args(request.args)
+        if q:
+            contacts, next_cursor = search_contacts(query, q, limit, cursor)
+        else:
+            contacts, next_cursor = paginate(
+                query, [Contact.created_at, Contact.id], limit, cursor, descending=True
+            )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify([contact.to_dict() for contact in contacts])
+    return paginated_response(CONTACT_FIELDS.dump(contacts, fields), next_cursor)
 
 
 @contact_bp.route('/contacts/<int:id>', methods=['PUT'])
+@retry_on_lock
 def update_contact_status(id):
     """
     Met a jour le statut d'un message (admin)
@@ -167,14 +329,7 @@ def update_contact_status(id):
         in: body
         required: true
         schema:
-          type: object
-          required:
-            - status
-          properties:
-            status:
-              type: string
-              enum: [new, read, replied]
-              example: "read"
+          $ref: '#/definitions/ContactStatus'
     responses:
       200:
         description: Statut mis a jour
@@ -184,21 +339,33 @@ def update_contact_status(id):
         description: Message non trouve
     """
     contact = Contact.query.get_or_404(id)
-    data = request.get_json()
 
-    if not data or not data.get('status'):
-        return jsonify({'error': 'Le statut est requis'}), 400
+    try:
+        status = CONTACT_STATUS_SCHEMA.validate(request.get_json())['status']
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if data['status'] not in Contact.STATUSES:
-        return jsonify({'error': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'}), 400
+    # UPDATE conditionnel : les compteurs partent du statut reellement
+    # remplace, meme si une autre requete l'a change depuis la lecture
+    while True:
+        old = contact.status
+        changed = db.session.execute(
+            update(Contact).where(Contact.id == id, Contact.status == old)
+            .values(status=status).execution_options(synchronize_session=False)
+        ).rowcount
+        if changed:
+            break
+        db.session.rollback()
+        contact = Contact.query.get_or_404(id)
 
-    contact.status = data['status']
+    record_change('contacts', {'status': old}, {'status': status})
     db.session.commit()
 
     return jsonify(contact.to_dict())
 
 
 @contact_bp.route('/contacts/<int:id>', methods=['DELETE'])
+@retry_on_lock
 def delete_contact(id):
     """
     Supprime un message de contact (admin)
@@ -225,7 +392,308 @@ def delete_contact(id):
     """
     contact = Contact.query.get_or_404(id)
 
-    db.session.delete(contact)
+    # Meme principe que pour le statut : seul le statut supprime est decompte
+    while True:
+        old = contact.status
+        deleted = db.session.execute(
+            delete(Contact).where(Contact.id == id, Contact.status == old)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if deleted:
+            break
+        db.session.rollback()
+        contact = Contact.query.get_or_404(id)
+
+    fingerprint = contact.fingerprint
+    record_change('contacts', old={'status': old})
     db.session.commit()
+    recent_fingerprints.discard(fingerprint)
 
     return jsonify({'message': 'Message supprime avec succes'})
+
+
+@contact_bp.route('/contacts/bulk', methods=['POST'])
+@retry_on_lock
+def bulk_contacts():
+    """
+    Change le statut ou supprime des messages en une seule requete SQL (admin)
+    ---
+    tags:
+      - Contact
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - action
+          properties:
+            action:
+              type: string
+              enum: [update, delete]
+              example: "update"
+            status:
+              type: string
+              enum: [new, read, replied]
+              description: Nouveau statut (action update)
+              example: "read"
+            ids:
+              type: array
+              description: Messages cibles (exclusif avec filter)
+              items:
+                type: integer
+              example: [1, 2, 3]
+            filter:
+              type: object
+              description: Selection par critere (exclusif avec ids)
+              properties:
+                status:
+                  type: string
+                  enum: [new, read, replied]
+                before:
+                  type: string
+                  description: Messages recus avant cette date (ISO 8601)
+                  example: "2026-01-01T00:00:00"
+    responses:
+      200:
+        description: Operation appliquee
+        schema:
+          type: object
+          properties:
+            action:
+              type: string
+            count:
+              type: integer
+              description: Nombre de messages concernes
+      400:
+        description: Donnees invalides
+    """
+    data = request.get_json()
+
+    if not isinstance(data, dict) or data.get('action') not in ('update', 'delete'):
+        return jsonify({'error': "L'action est requise (update ou delete)"}), 400
+
+    if data['action'] == 'update' and data.get('status') not in Contact.STATUSES:
+        return jsonify({'error': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'}), 400
+
+    try:
+        conditions = bulk_conditions(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Une instruction par statut d'origine, sans charger les messages en memoire :
+    # le nombre de lignes touchees donne exactement l'ajustement des compteurs
+    count = 0
+    deltas = {}
+    for status in Contact.STATUSES:
+        if data['action'] == 'update':
+            if status == data['status']:
+                continue
+            statement = update(Contact).values(status=data['status'])
+        else:
+            statement = delete(Contact)
+        affected = db.session.execute(
+            statement.where(*conditions, Contact.status == status)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        count += affected
+        deltas[f'contacts.status.{status}'] = -affected
+
+    if data['action'] == 'update':
+        deltas[f"contacts.status.{data['status']}"] = count
+    else:
+        deltas['contacts.total'] = -count
+    increment(deltas)
+    db.session.commit()
+    if data['action'] == 'delete' and count:
+        # Empreintes supprimees inconnues : l'index fait foi
+        recent_fingerprints.clear()
+
+    return jsonify({'action': data['action'], 'count': count})
+
+
+@contact_bp.route('/contacts/export', methods=['GET'])
+def export_contacts_file():
+    """
+    Exporte tous les messages en flux NDJSON ou CSV (admin)
+    ---
+    tags:
+      - Contact
+    produces:
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [ndjson, csv]
+        description: Format du fichier (defaut ndjson)
+      - name: status
+        in: query
+        type: string
+        required: false
+        enum: [new, read, replied]
+        description: Filtrer par statut
+    responses:
+      200:
+        description: Fichier produit au fil de la lecture (id, name, email, phone, message, status, created_at)
+      400:
+        description: Format ou statut invalide
+    """
+    fmt = request.args.get('format', 'ndjson')
+    status = request.args.get('status')
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if status and status not in Contact.STATUSES:
+        return jsonify({'error': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'}), 400
+
+    chunks = export_contacts(fmt, status, current_app.config['EXPORT_CHUNK_SIZE'])
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename=contacts.{fmt}',
+    })
+
+
+@contact_bp.route('/contacts/import', methods=['POST'])
+def import_contacts_file():
+    """
+    Importe des messages depuis un fichier NDJSON ou CSV envoye tel quel (admin)
+    ---
+    tags:
+      - Contact
+    consumes:
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [ndjson, csv]
+        description: Format du corps (defaut ndjson) ; en CSV, la premiere ligne donne les colonnes
+      - name: body
+        in: body
+        required: true
+        description: Un message par ligne, champs du schema ContactImport
+        schema:
+          $ref: '#/definitions/ContactImport'
+    responses:
+      200:
+        description: Import termine
+        schema:
+          type: object
+          properties:
+            imported:
+              type: integer
+            skipped:
+              type: integer
+            errors:
+              type: array
+              description: Lignes rejetees (100 premieres)
+              items:
+                type: object
+                properties:
+                  line:
+                    type: integer
+                  error:
+                    type: string
+      400:
+        description: Format invalide ou fichier illisible (les lots precedents restent importes)
+    """
+    # Pas de retry_on_lock : le corps est lu en flux et ne peut pas etre relu
+    fmt = request.args.get('format', 'ndjson')
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    request.max_content_length = current_app.config['IMPORT_MAX_CONTENT_LENGTH']
+    text = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    result = import_contacts(text, fmt, CONTACT_IMPORT_SCHEMA, current_app.config['IMPORT_CHUNK_SIZE'])
+    return jsonify(result), 400 if 'error' in result else 200
+
+
+@contact_bp.route('/contacts/archive', methods=['GET'])
+def get_archived_contacts():
+    """
+    Liste les messages archives, du plus recent au plus ancien (admin)
+    ---
+    tags:
+      - Contact
+    parameters:
+      - name: email
+        in: query
+        type: string
+        required: false
+        description: Messages d'un expediteur (email exact)
+      - name: status
+        in: query
+        type: string
+        required: false
+        enum: [new, read, replied]
+        description: Filtrer par statut
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Nombre de messages par page (defaut 50, max 200)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Curseur de la page suivante (en-tete X-Next-Cursor de la page precedente)
+    responses:
+      200:
+        description: Page de messages archives (champs d'un message, plus archived_at)
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Curseur de la page suivante (absent sur la derniere page)
+      400:
+        description: Statut, limite ou curseur invalide
+    """
+    query = ArchivedContact.query
+    email = request.args.get('email', '').strip()
+    status = request.args.get('status')
+    if email:
+        query = query.filter(ArchivedContact.email == email)
+    if status:
+        if status not in Contact.STATUSES:
+            return jsonify({'error': f'Statut invalide. Valeurs acceptees: {Contact.STATUSES}'}), 400
+        query = query.filter(ArchivedContact.status == status)
+
+    try:
+        limit, cursor = get_page_args(request.args)
+        contacts, next_cursor = paginate(
+            query, [ArchivedContact.created_at, ArchivedContact.id], limit, cursor, descending=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return paginated_response([contact.to_dict() for contact in contacts], next_cursor)
+
+
+@contact_bp.route('/contacts/archive/<int:id>', methods=['GET'])
+def get_archived_contact(id):
+    """
+    Recupere un message archive par son id d'origine (admin)
+    ---
+    tags:
+      - Contact
+    parameters:
+      - name: id
+        in: path
+        type: integer
+        required: true
+        description: ID du message
+    responses:
+      200:
+        description: Message archive
+      404:
+        description: Message non archive
+    """
+    contact = ArchivedContact.query.get_or_404(id)
+    return jsonify(contact.to_dict())
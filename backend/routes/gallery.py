@@ -1,14 +1,42 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+from flask import Blueprint, current_app, request, jsonify
+from extensions import db, catalog_cache, suggest_index
 from models.gallery import Gallery
+from utils.batch import BatchError, apply_batch, validate_batch
+from utils.db import retry_on_lock
+from utils.fields import Fieldset
+from utils.images import rendition_urls, sync_renditions
+from utils.conditional import conditional
+from utils.snapshot import encode_json, json_response
+from utils.stats import record_batch, record_change, row_values
+from utils.pagination import get_page_args, paginate, paginated_response
+from utils.validation import Field, Schema
 
 gallery_bp = Blueprint('gallery', __name__)
 
 
+GALLERY_SCHEMA = Schema('Gallery', {
+    'title': Field('string', required=True, strip=True, max_length=100,
+                   messages={'required': "Le titre et l'URL de l'image sont requis"},
+                   example='French manucure elegante'),
+    'image_url': Field('string', required=True, max_length=255,
+                       messages={'required': "Le titre et l'URL de l'image sont requis"},
+                       example='/uploads/gallery/french-1.jpg'),
+    'category': Field('string', blank_as_none=True, enum=Gallery.CATEGORIES,
+                      messages={'enum': f'Categorie invalide. Valeurs acceptees: {Gallery.CATEGORIES}'},
+                      example='french'),
+    'is_featured': Field('boolean', default=False, example=False),
+})
+
+GALLERY_FIELDS = Fieldset(Gallery, [
+    'id', 'title', 'image_url', 'renditions', 'category', 'is_featured', 'created_at', 'updated_at',
+], derived={'renditions': (('image_url', 'renditions_ready'), rendition_urls)})
+
+
 @gallery_bp.route('/gallery', methods=['GET'])
+@conditional('gallery')
 def get_gallery():
     """
-    Liste toutes les images de la galerie
+    Liste les images de la galerie, par ordre d'ajout
     ---
     tags:
       - Gallery
@@ -18,9 +46,28 @@ def get_gallery():
         type: string
         required: false
         description: Filtrer par categorie (nail-art, french, gel, extension, soin)
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Champs a renvoyer, separes par des virgules (ex. id,title,image_url), defaut tous
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Nombre d'images par page (defaut 50, max 200)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Curseur de la page suivante (en-tete X-Next-Cursor de la page precedente)
     responses:
       200:
-        description: Liste des images
+        description: Page d'images
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Curseur de la page suivante (absent sur la derniere page)
         schema:
           type: array
           items:
@@ -41,18 +88,30 @@ def get_gallery():
               is_featured:
                 type: boolean
                 example: true
+      400:
+        description: Limite, curseur ou champ invalide
     """
     category = request.args.get('category')
 
-    if category:
-        images = Gallery.query.filter_by(category=category).all()
-    else:
-        images = Gallery.query.all()
+    def load():
+        fields = GALLERY_FIELDS.parse(request.args.get('fields'))
+        query = Gallery.query.options(*GALLERY_FIELDS.options(fields))
+        if category:
+            query = query.filter_by(category=category)
+        limit, cursor = get_page_args(request.args)
+        images, next_cursor = paginate(query, [Gallery.id], limit, cursor)
+        return encode_json(GALLERY_FIELDS.dump(images, fields)), next_cursor
 
-    return jsonify([image.to_dict() for image in images])
+    try:
+        body, next_cursor = catalog_cache.get_or_load('gallery', load)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return paginated_response(body, next_cursor)
 
 
 @gallery_bp.route('/gallery/<int:id>', methods=['GET'])
+@conditional('gallery')
 def get_gallery_item(id):
     """
     Recupere une image par son ID
@@ -71,20 +130,43 @@ def get_gallery_item(id):
       404:
         description: Image non trouvee
     """
-    image = Gallery.query.get_or_404(id)
-    return jsonify(image.to_dict())
+    body = catalog_cache.get_or_load(
+        'gallery', lambda: encode_json(Gallery.query.get_or_404(id).to_dict())
+    )
+    return json_response(body)
 
 
 @gallery_bp.route('/gallery/featured', methods=['GET'])
+@conditional('gallery')
 def get_featured():
     """
-    Recupere les images mises en avant
+    Recupere les images mises en avant, par ordre d'ajout
     ---
     tags:
       - Gallery
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Champs a renvoyer, separes par des virgules (ex. id,title,image_url), defaut tous
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Nombre d'images par page (defaut 50, max 200)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Curseur de la page suivante (en-tete X-Next-Cursor de la page precedente)
     responses:
       200:
-        description: Liste des images mises en avant
+        description: Page d'images mises en avant
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Curseur de la page suivante (absent sur la derniere page)
         schema:
           type: array
           items:
@@ -100,12 +182,28 @@ def get_featured():
                 type: string
               is_featured:
                 type: boolean
+      400:
+        description: Limite, curseur ou champ invalide
     """
-    images = Gallery.query.filter_by(is_featured=True).all()
-    return jsonify([image.to_dict() for image in images])
+    def load():
+        fields = GALLERY_FIELDS.parse(request.args.get('fields'))
+        limit, cursor = get_page_args(request.args)
+        images, next_cursor = paginate(
+            Gallery.query.options(*GALLERY_FIELDS.options(fields)).filter_by(is_featured=True),
+            [Gallery.id], limit, cursor
+        )
+        return encode_json(GALLERY_FIELDS.dump(images, fields)), next_cursor
+
+    try:
+        body, next_cursor = catalog_cache.get_or_load('gallery', load)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return paginated_response(body, next_cursor)
 
 
 @gallery_bp.route('/gallery', methods=['POST'])
+@retry_on_lock
 def create_gallery_item():
     """
     Ajoute une nouvelle image a la galerie
@@ -117,53 +215,31 @@ def create_gallery_item():
         in: body
         required: true
         schema:
-          type: object
-          required:
-            - title
-            - image_url
-          properties:
-            title:
-              type: string
-              example: "French manucure elegante"
-            image_url:
-              type: string
-              example: "/uploads/gallery/french-1.jpg"
-            category:
-              type: string
-              enum: [nail-art, french, gel, extension, soin]
-              example: "french"
-            is_featured:
-              type: boolean
-              example: false
+          $ref: '#/definitions/Gallery'
     responses:
       201:
         description: Image ajoutee avec succes
       400:
         description: Donnees invalides
     """
-    data = request.get_json()
-
-    if not data or not data.get('title') or not data.get('image_url'):
-        return jsonify({'error': "Le titre et l'URL de l'image sont requis"}), 400
-
-    category = data.get('category')
-    if category and category not in Gallery.CATEGORIES:
-        return jsonify({'error': f'Categorie invalide. Valeurs acceptees: {Gallery.CATEGORIES}'}), 400
-
-    image = Gallery(
-        title=data['title'],
-        image_url=data['image_url'],
-        category=category,
-        is_featured=data.get('is_featured', False)
-    )
+    try:
+        image = Gallery(**GALLERY_SCHEMA.validate(request.get_json()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     db.session.add(image)
+    db.session.flush()
+    sync_renditions(Gallery, [image.image_url])
+    record_change('gallery', new=row_values('gallery', image))
+    version = catalog_cache.bump('gallery', [image.id])
     db.session.commit()
+    suggest_index.put('gallery', image.to_dict(), version)
 
     return jsonify(image.to_dict()), 201
 
 
 @gallery_bp.route('/gallery/<int:id>', methods=['PUT'])
+@retry_on_lock
 def update_gallery_item(id):
     """
     Met a jour une image de la galerie
@@ -180,45 +256,38 @@ def update_gallery_item(id):
         in: body
         required: true
         schema:
-          type: object
-          properties:
-            title:
-              type: string
-            image_url:
-              type: string
-            category:
-              type: string
-              enum: [nail-art, french, gel, extension, soin]
-            is_featured:
-              type: boolean
+          $ref: '#/definitions/GalleryUpdate'
     responses:
       200:
         description: Image mise a jour
       400:
-        description: Categorie invalide
+        description: Donnees ou categorie invalides
       404:
         description: Image non trouvee
     """
     image = Gallery.query.get_or_404(id)
-    data = request.get_json()
-
-    if data.get('title'):
-        image.title = data['title']
-    if data.get('image_url'):
-        image.image_url = data['image_url']
-    if data.get('category') is not None:
-        if data['category'] and data['category'] not in Gallery.CATEGORIES:
-            return jsonify({'error': f'Categorie invalide. Valeurs acceptees: {Gallery.CATEGORIES}'}), 400
-        image.category = data['category']
-    if data.get('is_featured') is not None:
-        image.is_featured = data['is_featured']
 
+    try:
+        values = GALLERY_SCHEMA.validate(request.get_json(), partial=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    old = row_values('gallery', image)
+    for column, value in values.items():
+        setattr(image, column, value)
+    if 'image_url' in values:
+        sync_renditions(Gallery, [image.image_url])
+    record_change('gallery', old, row_values('gallery', image))
+
+    version = catalog_cache.bump('gallery', [image.id])
     db.session.commit()
+    suggest_index.put('gallery', image.to_dict(), version)
 
     return jsonify(image.to_dict())
 
 
 @gallery_bp.route('/gallery/<int:id>', methods=['DELETE'])
+@retry_on_lock
 def delete_gallery_item(id):
     """
     Supprime une image de la galerie
@@ -246,6 +315,108 @@ def delete_gallery_item(id):
     image = Gallery.query.get_or_404(id)
 
     db.session.delete(image)
+    record_change('gallery', old=row_values('gallery', image))
+    version = catalog_cache.bump('gallery', [id])
     db.session.commit()
+    suggest_index.remove('gallery', id, version)
 
     return jsonify({'message': 'Image supprimee avec succes'})
+
+
+@gallery_bp.route('/gallery/batch', methods=['POST'])
+@retry_on_lock
+def batch_gallery():
+    """
+    Ajoute, modifie et supprime des images par lot, en une seule transaction
+    ---
+    tags:
+      - Gallery
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            create:
+              type: array
+              description: Images a ajouter (memes champs que POST /gallery)
+              items:
+                $ref: '#/definitions/Gallery'
+            update:
+              type: array
+              description: Modifications (champs de PUT /gallery/{id} + id)
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+            delete:
+              type: array
+              description: Ids des images a supprimer
+              items:
+                type: integer
+          example:
+            create: [{"title": "French elegante", "image_url": "/uploads/gallery/french-1.jpg", "category": "french"}]
+            update: [{"id": 3, "is_featured": true}]
+            delete: [7]
+    responses:
+      200:
+        description: Lot applique
+        schema:
+          type: object
+          properties:
+            created:
+              type: array
+              items:
+                type: object
+            updated:
+              type: array
+              items:
+                type: object
+            deleted:
+              type: array
+              items:
+                type: integer
+      400:
+        description: Lot invalide (rien n'est applique), detail dans errors. Un id ne peut etre cible qu'une fois
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+            errors:
+              type: array
+              items:
+                type: object
+                properties:
+                  operation:
+                    type: string
+                  index:
+                    type: integer
+                  error:
+                    type: string
+    """
+    try:
+        creates, updates, deletes = validate_batch(
+            Gallery, request.get_json(), GALLERY_SCHEMA.validate, current_app.config['BATCH_MAX_ITEMS']
+        )
+    except BatchError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+
+    record_batch('gallery', creates, updates, deletes)
+
+    # Etat des declinaisons des image_url ecrites, dans la transaction du lot
+    def sync_images(rows):
+        sync_renditions(Gallery, [values.get('image_url') for values in rows])
+
+    result = apply_batch(Gallery, creates, updates, deletes, after_write=sync_images)
+    ids = [item['id'] for item in result['created']] + [values['id'] for values in updates] + deletes
+    version = catalog_cache.bump('gallery', ids)
+    db.session.commit()
+    for item in result['created'] + result['updated']:
+        suggest_index.put('gallery', item, version)
+    for id in deletes:
+        suggest_index.remove('gallery', id, version)
+
+    return jsonify(result)
@@ -0,0 +1,24 @@
+from flask import Blueprint, Response
+from extensions import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Metriques au format texte Prometheus (requetes HTTP et SQL par endpoint)
+    ---
+    tags:
+      - Metrics
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Compteurs et histogrammes de tous les workers (voir METRICS_DIR)
+      404:
+        description: Metriques desactivees (METRICS_ENABLED=false)
+    """
+    if not metrics.enabled:
+        return Response('Metriques desactivees\n', status=404, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,57 @@
+from flask import Blueprint, current_app, request, jsonify
+from extensions import suggest_index
+
+search_bp = Blueprint('search', __name__)
+
+
+@search_bp.route('/search/suggest', methods=['GET'])
+def suggest():
+    """
+    Suggestions de services et d'images pour un debut de saisie
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: prefix
+        in: query
+        type: string
+        required: true
+        description: Debut de saisie (casse et accents ignores)
+        example: "mani"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Nombre de suggestions (defaut 10, max 50)
+    responses:
+      200:
+        description: Suggestions, les plus pertinentes d'abord
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              type:
+                type: string
+                enum: [services, gallery]
+              id:
+                type: integer
+              label:
+                type: string
+                example: "Manucure classique"
+      400:
+        description: Prefixe manquant ou limite invalide
+    """
+    prefix = request.args.get('prefix', '').strip()
+    if not prefix:
+        return jsonify({'error': 'Le prefixe est requis'}), 400
+
+    limit = request.args.get('limit', current_app.config['SUGGEST_DEFAULT_LIMIT'])
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Le parametre limit doit etre un entier'}), 400
+    if limit < 1:
+        return jsonify({'error': 'Le parametre limit doit etre positif'}), 400
+
+    return jsonify(suggest_index.suggest(prefix, min(limit, current_app.config['SUGGEST_MAX_LIMIT'])))
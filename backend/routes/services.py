@@ -1,17 +1,48 @@
-from flask import Blueprint, request, jsonify
-from extensions import db
+from flask import Blueprint, current_app, request, jsonify
+from extensions import db, catalog_cache, suggest_index
 from models.service import Service
+from utils.batch import BatchError, apply_batch, validate_batch
+from utils.db import retry_on_lock
+from utils.fields import Fieldset
+from utils.images import rendition_urls, sync_renditions
+from utils.conditional import conditional
+from utils.snapshot import encode_json, json_response
+from utils.stats import record_batch, record_change
+from utils.validation import Field, Schema
 
 services_bp = Blueprint('services', __name__)
 
+SERVICE_FIELDS = Fieldset(Service, [
+    'id', 'name', 'description', 'price', 'duration', 'image_url', 'renditions', 'created_at', 'updated_at',
+], derived={'renditions': (('image_url', 'renditions_ready'), rendition_urls)})
+
+
+SERVICE_SCHEMA = Schema('Service', {
+    'name': Field('string', required=True, strip=True, max_length=100,
+                  messages={'required': 'Le nom et le prix sont requis'},
+                  example='Pose de gel'),
+    'description': Field('string', example='Application de vernis gel semi-permanent'),
+    'price': Field('number', required=True, minimum=0,
+                   messages={'required': 'Le nom et le prix sont requis'}, example=35.0),
+    'duration': Field('integer', minimum=0, description='Duree en minutes', example=60),
+    'image_url': Field('string', max_length=255, example='/uploads/services/gel.jpg'),
+})
+
 
 @services_bp.route('/services', methods=['GET'])
+@conditional('services')
 def get_services():
     """
     Liste tous les services
     ---
     tags:
       - Services
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Champs a renvoyer, separes par des virgules (ex. id,name,price), defaut tous
     responses:
       200:
         description: Liste des services
@@ -38,12 +69,23 @@ def get_services():
               image_url:
                 type: string
                 example: "/uploads/services/manucure.jpg"
+      400:
+        description: Champ inconnu dans fields
     """
-    services = Service.query.all()
-    return jsonify([service.to_dict() for service in services])
+    def load():
+        fields = SERVICE_FIELDS.parse(request.args.get('fields'))
+        services = Service.query.options(*SERVICE_FIELDS.options(fields)).all()
+        return encode_json(SERVICE_FIELDS.dump(services, fields))
+
+    try:
+        body = catalog_cache.get_or_load('services', load)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return json_response(body)
 
 
 @services_bp.route('/services/<int:id>', methods=['GET'])
+@conditional('services')
 def get_service(id):
     """
     Recupere un service par son ID
@@ -77,11 +119,14 @@ def get_service(id):
       404:
         description: Service non trouve
     """
-    service = Service.query.get_or_404(id)
-    return jsonify(service.to_dict())
+    body = catalog_cache.get_or_load(
+        'services', lambda: encode_json(Service.query.get_or_404(id).to_dict())
+    )
+    return json_response(body)
 
 
 @services_bp.route('/services', methods=['POST'])
+@retry_on_lock
 def create_service():
     """
     Cree un nouveau service
@@ -93,52 +138,31 @@ def create_service():
         in: body
         required: true
         schema:
-          type: object
-          required:
-            - name
-            - price
-          properties:
-            name:
-              type: string
-              example: "Pose de gel"
-            description:
-              type: string
-              example: "Application de vernis gel semi-permanent"
-            price:
-              type: number
-              example: 35.00
-            duration:
-              type: integer
-              example: 60
-            image_url:
-              type: string
-              example: "/uploads/services/gel.jpg"
+          $ref: '#/definitions/Service'
     responses:
       201:
         description: Service cree avec succes
       400:
         description: Donnees invalides
     """
-    data = request.get_json()
-
-    if not data or not data.get('name') or not data.get('price'):
-        return jsonify({'error': 'Le nom et le prix sont requis'}), 400
-
-    service = Service(
-        name=data['name'],
-        description=data.get('description'),
-        price=data['price'],
-        duration=data.get('duration'),
-        image_url=data.get('image_url')
-    )
+    try:
+        service = Service(**SERVICE_SCHEMA.validate(request.get_json()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     db.session.add(service)
+    db.session.flush()
+    sync_renditions(Service, [service.image_url])
+    record_change('services', new={})
+    version = catalog_cache.bump('services', [service.id])
     db.session.commit()
+    suggest_index.put('services', service.to_dict(), version)
 
     return jsonify(service.to_dict()), 201
 
 
 @services_bp.route('/services/<int:id>', methods=['PUT'])
+@retry_on_lock
 def update_service(id):
     """
     Met a jour un service existant
@@ -155,44 +179,36 @@ def update_service(id):
         in: body
         required: true
         schema:
-          type: object
-          properties:
-            name:
-              type: string
-            description:
-              type: string
-            price:
-              type: number
-            duration:
-              type: integer
-            image_url:
-              type: string
+          $ref: '#/definitions/ServiceUpdate'
     responses:
       200:
         description: Service mis a jour
+      400:
+        description: Donnees invalides
       404:
         description: Service non trouve
     """
     service = Service.query.get_or_404(id)
-    data = request.get_json()
-
-    if data.get('name'):
-        service.name = data['name']
-    if data.get('description') is not None:
-        service.description = data['description']
-    if data.get('price'):
-        service.price = data['price']
-    if data.get('duration') is not None:
-        service.duration = data['duration']
-    if data.get('image_url') is not None:
-        service.image_url = data['image_url']
 
+    try:
+        values = SERVICE_SCHEMA.validate(request.get_json(), partial=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    for column, value in values.items():
+        setattr(service, column, value)
+    if 'image_url' in values:
+        sync_renditions(Service, [service.image_url])
+
+    version = catalog_cache.bump('services', [service.id])
     db.session.commit()
+    suggest_index.put('services', service.to_dict(), version)
 
     return jsonify(service.to_dict())
 
 
 @services_bp.route('/services/<int:id>', methods=['DELETE'])
+@retry_on_lock
 def delete_service(id):
     """
     Supprime un service
@@ -220,6 +236,108 @@ def delete_service(id):
     service = Service.query.get_or_404(id)
 
     db.session.delete(service)
+    record_change('services', old={})
+    version = catalog_cache.bump('services', [id])
     db.session.commit()
+    suggest_index.remove('services', id, version)
 
     return jsonify({'message': 'Service supprime avec succes'})
+
+
+@services_bp.route('/services/batch', methods=['POST'])
+@retry_on_lock
+def batch_services():
+    """
+    Cree, modifie et supprime des services par lot, en une seule transaction
+    ---
+    tags:
+      - Services
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            create:
+              type: array
+              description: Services a creer (memes champs que POST /services)
+              items:
+                $ref: '#/definitions/Service'
+            update:
+              type: array
+              description: Modifications (champs de PUT /services/{id} + id)
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+            delete:
+              type: array
+              description: Ids des services a supprimer
+              items:
+                type: integer
+          example:
+            create: [{"name": "Pose de gel", "price": 35.0, "duration": 60}]
+            update: [{"id": 1, "price": 27.5}]
+            delete: [4, 5]
+    responses:
+      200:
+        description: Lot applique
+        schema:
+          type: object
+          properties:
+            created:
+              type: array
+              items:
+                type: object
+            updated:
+              type: array
+              items:
+                type: object
+            deleted:
+              type: array
+              items:
+                type: integer
+      400:
+        description: Lot invalide (rien n'est applique), detail dans errors. Un id ne peut etre cible qu'une fois
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+            errors:
+              type: array
+              items:
+                type: object
+                properties:
+                  operation:
+                    type: string
+                  index:
+                    type: integer
+                  error:
+                    type: string
+    """
+    try:
+        creates, updates, deletes = validate_batch(
+            Service, request.get_json(), SERVICE_SCHEMA.validate, current_app.config['BATCH_MAX_ITEMS']
+        )
+    except BatchError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+
+    record_batch('services', creates, updates, deletes)
+
+    # Etat des declinaisons des image_url ecrites, dans la transaction du lot
+    def sync_images(rows):
+        sync_renditions(Service, [values.get('image_url') for values in rows])
+
+    result = apply_batch(Service, creates, updates, deletes, after_write=sync_images)
+    ids = [item['id'] for item in result['created']] + [values['id'] for values in updates] + deletes
+    version = catalog_cache.bump('services', ids)
+    db.session.commit()
+    for item in result['created'] + result['updated']:
+        suggest_index.put('services', item, version)
+    for id in deletes:
+        suggest_index.remove('services', id, version)
+
+    return jsonify(result)
@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify
+from utils.stats import get_stats
+
+stats_bp = Blueprint('stats', __name__)
+
+
+@stats_bp.route('/stats', methods=['GET'])
+def get_statistics():
+    """
+    Statistiques du site : messages par statut, images par categorie (admin)
+    ---
+    tags:
+      - Stats
+    responses:
+      200:
+        description: Compteurs maintenus a chaque ecriture
+        schema:
+          type: object
+          properties:
+            contacts:
+              type: object
+              example: {"total": 12, "status": {"new": 3, "read": 5, "replied": 4}}
+            contacts_archive:
+              type: object
+              description: Messages deplaces dans l'archive
+              example: {"total": 40, "status": {"new": 0, "read": 0, "replied": 40}}
+            gallery:
+              type: object
+              example: {"total": 8, "category": {"nail-art": 3, "french": 2, "gel": 2, "extension": 1, "soin": 0, "none": 0}, "is_featured": {"true": 4, "false": 4}}
+            services:
+              type: object
+              example: {"total": 5}
+    """
+    return jsonify(get_stats())
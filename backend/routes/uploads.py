@@ -0,0 +1,169 @@
+import hashlib
+import os
+import re
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, send_from_directory
+from PIL import Image, UnidentifiedImageError
+from werkzeug.security import safe_join
+
+from utils.images import (
+    HASH_LENGTH, LAST_RENDITION, RENDITIONS, UPLOAD_KINDS, rendition_name, rendition_urls,
+    schedule_renditions,
+)
+
+uploads_bp = Blueprint('uploads', __name__)
+
+# Noms produits par l'upload : '<hash>.<ext>' ou '<hash>-<declinaison>.<ext>'
+HASHED_NAME = re.compile(
+    r'^[0-9a-f]{%d}(-(%s))?\.[a-z0-9]+$' % (HASH_LENGTH, '|'.join(RENDITIONS))
+)
+
+
+def content_hash(stream):
+    """Calcule le hash SHA-256 du contenu par blocs, puis rembobine le flux."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def allowed_file(filename):
+    """Verifie si l'extension du fichier est autorisee."""
+    return '.' in filename and \
+        filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+
+@uploads_bp.route('/api/uploads/<kind>', methods=['POST'])
+def upload_image(kind):
+    """
+    Upload une image (galerie ou service) et lance la generation des declinaisons
+    ---
+    tags:
+      - Uploads
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: kind
+        in: path
+        type: string
+        required: true
+        enum: [gallery, services]
+        description: Dossier de destination
+      - name: file
+        in: formData
+        type: file
+        required: true
+        description: Image (png, jpg, jpeg, gif, webp - 5MB max)
+    responses:
+      202:
+        description: Image enregistree, declinaisons en cours de generation
+        schema:
+          type: object
+          properties:
+            image_url:
+              type: string
+              example: "/uploads/gallery/3f2a9c0b7d1e4a5f6c8b.jpg"
+            renditions:
+              type: object
+              example: {"thumbnail": {"jpeg": "/uploads/gallery/3f2a9c0b7d1e4a5f6c8b-thumbnail.jpg", "webp": "/uploads/gallery/3f2a9c0b7d1e4a5f6c8b-thumbnail.webp"}}
+      400:
+        description: Fichier manquant ou invalide
+      404:
+        description: Dossier inconnu
+      413:
+        description: Fichier trop volumineux
+    """
+    if kind not in UPLOAD_KINDS:
+        return jsonify({'error': f'Dossier invalide. Valeurs acceptees: {list(UPLOAD_KINDS)}'}), 404
+
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({'error': 'Le fichier est requis'}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({'error': f"Extension non autorisee. Valeurs acceptees: {sorted(current_app.config['ALLOWED_EXTENSIONS'])}"}), 400
+
+    # Lecture de l'en-tete uniquement : le decodage complet se fait dans le pool
+    try:
+        with Image.open(file.stream) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        return jsonify({'error': 'Image invalide'}), 400
+    file.stream.seek(0)
+
+    # Nom derive du contenu : l'URL change des que l'image change,
+    # ce qui permet de la mettre en cache indefiniment
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    stem = content_hash(file.stream)
+    filename = f'{stem}.{extension}'
+    directory = os.path.join(current_app.config['UPLOAD_FOLDER'], kind)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+
+    # Image deja connue : ni reecriture, ni nouvelle generation
+    last_rendition = os.path.join(directory, rendition_name(stem, *LAST_RENDITION))
+    if not os.path.exists(path):
+        file.save(path)
+    image_url = f'/uploads/{kind}/{filename}'
+    if not os.path.exists(last_rendition):
+        schedule_renditions(path, image_url, current_app._get_current_object())
+
+    return jsonify({
+        'image_url': image_url,
+        # URLs a venir : les fichiers sont en cours de generation
+        'renditions': rendition_urls(image_url, ready=True)
+    }), 202
+
+
+@uploads_bp.route('/uploads/<path:filename>', methods=['GET'])
+def serve_upload(filename):
+    """
+    Sert un fichier uploade (original ou declinaison)
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - name: filename
+        in: path
+        type: string
+        required: true
+        description: Chemin sous le dossier uploads, ex. gallery/3f2a9c0b7d1e4a5f6c8b-medium.webp
+      - name: Range
+        in: header
+        type: string
+        required: false
+        description: Plage d'octets (ex. bytes=0-1023)
+    responses:
+      200:
+        description: Contenu du fichier
+      206:
+        description: Plage d'octets demandee
+      304:
+        description: Non modifie
+      404:
+        description: Fichier non trouve
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    path = safe_join(upload_folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    accel_prefix = current_app.config.get('UPLOADS_ACCEL_PREFIX')
+    if accel_prefix:
+        # Le proxy (nginx) lit le fichier lui-meme : Python ne transfere aucun octet
+        response = Response()
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + filename
+        response.headers.pop('Content-Type', None)
+    else:
+        # send_file gere Range/If-None-Match et delegue la copie a
+        # wsgi.file_wrapper (sendfile sous gunicorn), ou a X-Sendfile
+        # si USE_X_SENDFILE est active
+        response = send_from_directory(upload_folder, filename, conditional=True)
+
+    if HASHED_NAME.match(os.path.basename(filename)):
+        max_age = current_app.config['UPLOADS_MAX_AGE']
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, no-cache'
+    return response
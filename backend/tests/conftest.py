@@ -0,0 +1,35 @@
+"""
+Fixtures communes : une application par test, sur une base SQLite en memoire.
+"""
+import pytest
+
+from app import create_app, init_db
+from config import Config
+from extensions import catalog_cache, db
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = 'memory://'
+    CONTACT_DUPLICATE_WINDOW = 0
+    METRICS_DIR = None
+    SWAGGER_SPEC_FILE = None
+    # Pas de threads d'envoi : les tests appellent deliver() directement
+    MAIL_SERVER = None
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        init_db()
+        catalog_cache.clear()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,65 @@
+"""Archivage : un id archive n'est jamais reattribue a un nouveau message."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app import init_db
+from extensions import db
+from models.contact import Contact
+from utils.archive import archive_contacts
+
+
+def create_replied_contact(client, name):
+    id = client.post('/api/contact', json={
+        'name': name, 'email': f'{name.lower()}@example.com', 'message': f'Message de {name}',
+    }).json['contact']['id']
+    client.put(f'/api/contacts/{id}', json={'status': 'replied'})
+    db.session.get(Contact, id).created_at = datetime.utcnow() - timedelta(days=1)
+    db.session.commit()
+    return id
+
+
+def test_archive_reinsert_archive_again(client):
+    first = create_replied_contact(client, 'Marie')
+    assert archive_contacts(['replied'], after_days=0) == 1
+
+    # Le dernier id vient d'etre archive : sans AUTOINCREMENT, SQLite le reattribuerait
+    second = create_replied_contact(client, 'Julie')
+    assert second != first
+    assert archive_contacts(['replied'], after_days=0) == 1
+
+    assert client.get(f'/api/contacts/archive/{first}').json['name'] == 'Marie'
+    assert client.get(f'/api/contacts/archive/{second}').json['name'] == 'Julie'
+
+
+def test_upgrade_adds_autoincrement_to_existing_table(app):
+    # Table contacts creee avant AUTOINCREMENT, dernier message deja archive
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP TABLE contacts'))
+        conn.execute(text(
+            'CREATE TABLE contacts (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, '
+            'email VARCHAR(100) NOT NULL, phone VARCHAR(20), message TEXT NOT NULL, '
+            'status VARCHAR(20), created_at DATETIME, fingerprint VARCHAR(64))'
+        ))
+        conn.execute(text(
+            "INSERT INTO contacts (id, name, email, message, status, created_at) "
+            "VALUES (1, 'Marie', 'marie@example.com', 'Bonjour', 'new', CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text(
+            "INSERT INTO contacts_archive (id, name, email, message, status) "
+            "VALUES (7, 'Julie', 'julie@example.com', 'Merci', 'replied')"
+        ))
+
+    init_db()
+
+    sql = db.session.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'contacts'"))
+    assert 'AUTOINCREMENT' in sql.upper()
+    assert db.session.get(Contact, 1).name == 'Marie'
+
+    contact = Contact(name='Lea', email='lea@example.com', message='Nouveau rendez-vous')
+    db.session.add(contact)
+    db.session.commit()
+    assert contact.id == 8
+
+    # Index plein texte toujours alimente (triggers recrees)
+    assert [c['name'] for c in app.test_client().get('/api/contacts?q=rendez').json] == ['Lea']
@@ -0,0 +1,55 @@
+"""Operations par lot : validation complete avant toute ecriture."""
+
+
+def create(client, name):
+    return client.post('/api/services', json={'name': name, 'price': 30, 'duration': 30}).json['id']
+
+
+def test_duplicate_update_ids_are_rejected(client):
+    id = create(client, 'Pose gel')
+    response = client.post('/api/services/batch', json={
+        'update': [{'id': id, 'price': 35}, {'id': id, 'price': 40}],
+    })
+    assert response.status_code == 400
+    assert [(e['operation'], e['index']) for e in response.json['errors']] == [('update', 1)]
+    assert client.get(f'/api/services/{id}').json['price'] == 30
+
+
+def test_id_both_updated_and_deleted_is_rejected(client):
+    id = create(client, 'Pose gel')
+    response = client.post('/api/services/batch', json={'update': [{'id': id, 'price': 35}], 'delete': [id, id]})
+    assert response.status_code == 400
+    assert [(e['operation'], e['index']) for e in response.json['errors']] == [('delete', 0), ('delete', 1)]
+
+
+def test_valid_batch_is_applied(client):
+    first, second = create(client, 'Pose gel'), create(client, 'Manucure')
+    response = client.post('/api/services/batch', json={
+        'create': [{'name': 'Soin', 'price': 20, 'duration': 20}],
+        'update': [{'id': first, 'price': 35}],
+        'delete': [second],
+    })
+    assert response.status_code == 200
+    assert [s['name'] for s in response.json['created']] == ['Soin']
+    assert response.json['updated'][0]['price'] == 35
+    assert response.json['deleted'] == [second]
+    assert client.get('/api/stats').json['services']['total'] == 2
+
+
+def test_boolean_ids_are_rejected(client):
+    id = create(client, 'Pose gel')
+    assert id == 1
+    response = client.post('/api/services/batch', json={'update': [{'id': True, 'price': 35}], 'delete': [True]})
+    assert response.status_code == 400
+    assert [(e['operation'], e['index']) for e in response.json['errors']] == [('update', 0), ('delete', 0)]
+    assert client.get(f'/api/services/{id}').json['price'] == 30
+
+
+def test_contact_bulk_rejects_boolean_ids(client):
+    id = client.post('/api/contact', json={
+        'name': 'Marie', 'email': 'marie@example.com', 'message': 'Bonjour, un rendez-vous ?',
+    }).json['contact']['id']
+    assert id == 1
+    response = client.post('/api/contacts/bulk', json={'action': 'delete', 'ids': [True]})
+    assert response.status_code == 400
+    assert [c['id'] for c in client.get('/api/contacts').json] == [id]
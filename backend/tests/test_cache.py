@@ -0,0 +1,39 @@
+"""Cache du catalogue : versions partagees entre processus."""
+from sqlalchemy import text
+
+from extensions import catalog_cache, db
+from utils.seed import seed_demo
+
+
+def other_worker_write(sql):
+    """Ecriture faite hors de ce processus : donnees et version, sans passer par le cache."""
+    with db.engine.begin() as conn:
+        conn.execute(text(sql))
+        conn.execute(text("UPDATE table_versions SET version = version + 1 WHERE name = 'services'"))
+
+
+def test_write_from_another_worker_invalidates_cache(client):
+    client.post('/api/services', json={'name': 'Pose gel', 'price': 40, 'duration': 60})
+    assert [s['name'] for s in client.get('/api/services').json] == ['Pose gel']
+    misses = catalog_cache.misses
+    client.get('/api/services')
+    assert catalog_cache.misses == misses
+
+    other_worker_write("INSERT INTO services (name, price, duration) VALUES ('Manucure', 25, 45)")
+    assert [s['name'] for s in client.get('/api/services').json] == ['Pose gel', 'Manucure']
+
+
+def test_rollback_cancels_bump(app):
+    catalog_cache.bump('services')
+    db.session.commit()
+    version = catalog_cache.version('services')
+
+    catalog_cache.bump('services')
+    db.session.rollback()
+    assert catalog_cache.version('services') == version
+
+
+def test_seed_bumps_catalog_versions(app):
+    seed_demo()
+    assert catalog_cache.version('services') == 1
+    assert catalog_cache.version('gallery') == 1
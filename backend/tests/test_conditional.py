@@ -0,0 +1,42 @@
+"""ETag / Last-Modified derives de l'etat partage des tables."""
+from sqlalchemy import text
+
+from extensions import db
+from utils.profiling import count_queries
+
+
+def create_service(client, name='Pose gel'):
+    return client.post('/api/services', json={'name': name, 'price': 40, 'duration': 60}).json['id']
+
+
+def test_revalidation_answers_304(client):
+    create_service(client)
+    response = client.get('/api/services')
+    assert client.get('/api/services', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    since = {'If-Modified-Since': response.headers['Last-Modified']}
+    assert client.get('/api/services', headers=since).status_code == 304
+
+
+def test_write_from_another_worker_changes_validators(client):
+    id = create_service(client)
+    create_service(client, 'Manucure')
+    etag = client.get('/api/services').headers['ETag']
+
+    # Suppression traitee par un autre processus : meme updated_at maximum
+    with db.engine.begin() as conn:
+        conn.execute(text('DELETE FROM services WHERE id = :id'), {'id': id})
+        conn.execute(text("UPDATE table_versions SET version = version + 1 WHERE name = 'services'"))
+
+    response = client.get('/api/services', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [s['name'] for s in response.json] == ['Manucure']
+    assert response.headers['ETag'] != etag
+
+
+def test_revalidation_reads_only_table_versions(client):
+    create_service(client)
+    etag = client.get('/api/services').headers['ETag']
+
+    with count_queries(db.engine) as queries:
+        assert client.get('/api/services', headers={'If-None-Match': etag}).status_code == 304
+    assert len(queries) == 1 and 'table_versions' in queries[0], queries
@@ -0,0 +1,20 @@
+from utils.db import engine_options, is_memory_sqlite
+
+POOL = {'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 30}
+
+
+def test_memory_sqlite_urls():
+    assert is_memory_sqlite('sqlite://')
+    assert is_memory_sqlite('sqlite:///:memory:')
+    assert is_memory_sqlite('sqlite:///file:test?mode=memory&cache=shared&uri=true')
+    assert not is_memory_sqlite('sqlite:////tmp/database.db')
+
+
+def test_pool_options_only_for_file_databases():
+    assert engine_options('sqlite://', POOL) == {}
+    assert engine_options('sqlite:////tmp/database.db', POOL) == POOL
+    assert engine_options('sqlite://', POOL, {'echo': True}) == {'echo': True}
+
+
+def test_app_starts_on_memory_database(client):
+    assert client.get('/api/services').status_code == 200
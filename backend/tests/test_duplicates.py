@@ -0,0 +1,64 @@
+"""Doublons de messages de contact : fenetre comptee depuis l'original."""
+import time
+from datetime import timedelta
+
+import pytest
+
+from extensions import db, recent_fingerprints
+from models.contact import Contact
+
+MESSAGE = {'name': 'Marie', 'email': 'marie@example.com', 'message': 'Bonjour, un rendez-vous samedi ?'}
+
+
+@pytest.fixture
+def window():
+    """Active la detection (desactivee par TestingConfig)."""
+    def set_window(seconds):
+        recent_fingerprints.window = seconds
+        recent_fingerprints.clear()
+    yield set_window
+    recent_fingerprints.window = 0
+    recent_fingerprints.clear()
+
+
+def send(client, **changes):
+    return client.post('/api/contact', json=dict(MESSAGE, **changes))
+
+
+def test_duplicate_within_window_returns_original(client, window):
+    window(600)
+    id = send(client).json['contact']['id']
+
+    response = send(client, message='  bonjour, UN rendez-vous samedi ?')
+    assert response.status_code == 200
+    assert response.json['duplicate'] is True
+    assert response.json['contact']['id'] == id
+
+    # Original recu par un autre worker : trouve dans l'index
+    recent_fingerprints.clear()
+    assert send(client).json['duplicate'] is True
+
+
+def test_message_after_window_is_created(client, window):
+    window(3)
+    id = send(client).json['contact']['id']
+    # Original recu 2 s plus tot par un autre worker
+    contact = db.session.get(Contact, id)
+    contact.created_at -= timedelta(seconds=2)
+    db.session.commit()
+    recent_fingerprints.clear()
+    assert send(client).status_code == 200
+
+    # L'entree memorisee par ce doublon expire avec l'original
+    time.sleep(1.2)
+    assert send(client).status_code == 201
+
+
+def test_deleted_message_is_not_a_duplicate(client, window):
+    window(600)
+    id = send(client).json['contact']['id']
+    client.delete(f'/api/contacts/{id}')
+
+    response = send(client)
+    assert response.status_code == 201
+    assert response.json['contact']['id'] != id
@@ -0,0 +1,83 @@
+"""Declinaisons : etat enregistre en base a la fin de la generation, jamais lu sur le disque."""
+import os
+from concurrent.futures import Future
+
+from sqlalchemy import text
+
+from app import init_db
+from extensions import db
+from utils.images import _record_result, rendition_name, rendition_urls
+
+STEM = '3f2a9c0b7d1e4a5f6c8b'
+URL = f'/uploads/gallery/{STEM}.png'
+
+
+def generated(tmp_path):
+    """Ecrit la derniere declinaison, comme le pool de generation."""
+    (tmp_path / 'gallery').mkdir(exist_ok=True)
+    (tmp_path / 'gallery' / rendition_name(STEM, 'thumbnail', 'jpeg')).write_bytes(b'')
+
+
+def add_image(client, url=URL):
+    return client.post('/api/gallery', json={'title': 'Gel rose', 'image_url': url, 'category': 'gel'}).json
+
+
+def test_legacy_and_external_images_have_no_renditions():
+    assert rendition_urls(None, True) is None
+    assert rendition_urls('/uploads/gallery/nail-art-floral.jpg', True) is None
+    assert rendition_urls('https://cdn.example.com/uploads/gallery/a.jpg', True) is None
+    assert rendition_urls(f'/uploads/other/{STEM}.jpg', True) is None
+    assert rendition_urls(URL, False) is None
+    assert rendition_urls(URL, True)['medium']['webp'] == f'/uploads/gallery/{STEM}-medium.webp'
+
+
+def test_generation_end_invalidates_cached_lists(app, client, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    add_image(client)
+    before = client.get('/api/gallery')
+    assert before.json[0]['renditions'] is None
+
+    # Fin de la generation : rappel du pool dans le processus qui l'a lancee
+    generated(tmp_path)
+    future = Future()
+    future.set_result([])
+    _record_result(app, URL, future)
+
+    after = client.get('/api/gallery')
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.json[0]['renditions']['medium']['jpeg'] == f'/uploads/gallery/{STEM}-medium.jpg'
+    assert client.get('/api/gallery?fields=id,renditions').json[0]['renditions'] is not None
+
+
+def test_image_generated_before_write_is_ready(app, client, tmp_path, monkeypatch):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    generated(tmp_path)
+    assert add_image(client)['renditions'] is not None
+
+    # Lectures servies depuis la base, sans acces disque
+    def no_disk(path):
+        raise AssertionError(f'acces disque pendant une lecture: {path}')
+    monkeypatch.setattr(os.path, 'exists', no_disk)
+    assert client.get('/api/gallery').json[0]['renditions'] is not None
+
+
+def test_init_db_backfills_existing_rows(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    generated(tmp_path)
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            'INSERT INTO gallery (title, image_url, category) VALUES '
+            "('Ancien upload', :url, 'gel'), ('Demo', '/uploads/gallery/demo.jpg', 'gel')"
+        ), {'url': URL})
+
+    init_db()
+    assert dict(db.session.execute(text('SELECT title, renditions_ready FROM gallery')).all()) == {
+        'Ancien upload': 1, 'Demo': 0,
+    }
+
+
+def test_seeded_gallery_lists_without_renditions(client):
+    from utils.seed import seed_demo
+
+    seed_demo()
+    assert all(image['renditions'] is None for image in client.get('/api/gallery').json)
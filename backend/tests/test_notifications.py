@@ -0,0 +1,129 @@
+"""File de notifications : envoi, reprise avec backoff, connexion reutilisee."""
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db, notification_queue
+from models.notification import Notification
+from utils import email_sender
+from utils.email_sender import SMTPClient, build_contact_notification
+
+
+class FakeSMTP:
+    """Serveur SMTP local : enregistre les connexions et les messages recus."""
+
+    connections = []
+    failures = []  # exceptions a lever, une par envoi, avant de reussir
+
+    def __init__(self, host, port, timeout=None):
+        self.messages = []
+        self.closed = False
+        FakeSMTP.connections.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def send_message(self, message):
+        if FakeSMTP.failures:
+            raise FakeSMTP.failures.pop(0)
+        self.messages.append(message)
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def smtp(app, monkeypatch):
+    FakeSMTP.connections = []
+    FakeSMTP.failures = []
+    monkeypatch.setattr(email_sender.smtplib, 'SMTP', FakeSMTP)
+    settings = dict(notification_queue.settings, server='localhost', port=2525)
+    return SMTPClient(settings)
+
+
+def add_notification(subject='Nouveau message', **values):
+    notification = Notification(recipient='admin@example.com', subject=subject, body='Bonjour', **values)
+    db.session.add(notification)
+    db.session.commit()
+    return notification.id
+
+
+def test_connection_is_reused_between_messages(smtp):
+    ids = [add_notification(f'Message {i}') for i in range(3)]
+    for id in ids:
+        notification_queue.deliver(id, smtp)
+
+    assert len(FakeSMTP.connections) == 1
+    assert [m['Subject'] for m in FakeSMTP.connections[0].messages] == ['Message 0', 'Message 1', 'Message 2']
+    assert {db.session.get(Notification, id).status for id in ids} == {'sent'}
+
+
+def test_reconnects_once_when_server_disconnected(smtp):
+    FakeSMTP.failures = [smtplib.SMTPServerDisconnected('idle timeout')]
+    id = add_notification()
+    notification_queue.deliver(id, smtp)
+
+    assert len(FakeSMTP.connections) == 2
+    assert db.session.get(Notification, id).status == 'sent'
+
+
+def test_failed_send_is_retried_with_backoff(smtp):
+    id = add_notification()
+    delay = notification_queue.retry_delay
+
+    for attempt in range(1, notification_queue.max_attempts + 1):
+        error = smtplib.SMTPDataError(451, 'try again') if attempt % 2 else OSError('refused')
+        FakeSMTP.failures = [error]
+        before = datetime.utcnow()
+        notification_queue.deliver(id, smtp)
+        notification = db.session.get(Notification, id)
+        assert notification.attempts == attempt
+        if attempt < notification_queue.max_attempts:
+            assert notification.status == 'pending'
+            expected = before + timedelta(seconds=delay * 2 ** (attempt - 1))
+            assert abs(notification.next_attempt_at - expected) < timedelta(seconds=5)
+            # Essai suivant du immediatement
+            notification.next_attempt_at = datetime.utcnow()
+            db.session.commit()
+
+    assert notification.status == 'failed'
+    assert notification.last_error == str(error)
+
+
+def test_not_due_notification_is_not_sent(smtp):
+    id = add_notification(next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+    notification_queue.deliver(id, smtp)
+    assert db.session.get(Notification, id).attempts == 0
+    assert FakeSMTP.connections == []
+
+
+def test_unexpected_error_marks_failed_instead_of_poisoning(smtp):
+    FakeSMTP.failures = [ValueError('invalid message')]
+    id = add_notification()
+    notification_queue.deliver(id, smtp)
+
+    db.session.expire_all()
+    notification = db.session.get(Notification, id)
+    assert notification.status == 'failed'
+    assert notification.attempts == 1
+    assert notification_queue.due_ids(10) == []
+
+
+def test_name_with_newline_does_not_break_headers(smtp):
+    recipient, subject, body = build_contact_notification(
+        {'name': 'Marie\r\nBcc: victim@example.com', 'email': 'marie@example.com', 'message': 'Bonjour'},
+        admin_email='admin@example.com',
+    )
+    assert '\n' not in subject and '\r' not in subject
+
+    # Ligne deja en base avant la correction : l'envoi nettoie aussi les en-tetes
+    id = add_notification('Nouveau message - Marie\nBcc: victim@example.com')
+    notification_queue.deliver(id, smtp)
+
+    message = FakeSMTP.connections[0].messages[0]
+    assert message['Bcc'] is None
+    assert db.session.get(Notification, id).status == 'sent'
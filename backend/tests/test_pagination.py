@@ -0,0 +1,48 @@
+"""Pagination par curseur : continuation et curseurs alteres."""
+import pytest
+
+from utils.pagination import encode_cursor
+
+
+def add_images(client, count):
+    client.post('/api/gallery/batch', json={'create': [
+        {'title': f'Image {i}', 'image_url': f'/uploads/gallery/{i}.jpg', 'category': 'gel'}
+        for i in range(count)
+    ]})
+
+
+def test_cursor_continues_after_last_row(client):
+    add_images(client, 5)
+    first = client.get('/api/gallery?limit=3')
+    rest = client.get(f"/api/gallery?limit=3&cursor={first.headers['X-Next-Cursor']}")
+
+    assert [i['title'] for i in first.json + rest.json] == [f'Image {i}' for i in range(5)]
+    assert 'X-Next-Cursor' not in rest.headers
+
+
+@pytest.mark.parametrize('values', [
+    [{'id': 1}], [[1, 2]], [True], ['1'], [None], [1, 2], [],
+])
+def test_tampered_gallery_cursor_is_rejected(client, values):
+    add_images(client, 2)
+    response = client.get(f'/api/gallery?cursor={encode_cursor(values)}')
+    assert response.status_code == 400
+    assert response.json == {'error': 'Curseur invalide'}
+
+
+@pytest.mark.parametrize('cursor', [
+    encode_cursor([{'a': 1}, 1]),
+    encode_cursor(['2024-01-01T00:00:00', [1]]),
+    encode_cursor(['2024-01-01T00:00:00', 1.5]),
+    encode_cursor(['pas une date', 1]),
+    'pas-du-base64!',
+])
+def test_tampered_contacts_cursor_is_rejected(client, cursor):
+    response = client.get(f'/api/contacts?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.json == {'error': 'Curseur invalide'}
+
+
+def test_tampered_search_cursor_is_rejected(client):
+    response = client.get(f"/api/contacts?q=gel&cursor={encode_cursor(['rang', 1])}")
+    assert response.json == {'error': 'Curseur invalide'}
@@ -0,0 +1,46 @@
+"""Nombre de requetes SQL des listes : constant quel que soit le nombre de lignes (pas de N+1)."""
+import pytest
+
+from extensions import catalog_cache, db
+from models.contact import Contact
+from models.gallery import Gallery
+from models.service import Service
+from utils.profiling import count_queries
+
+LISTS = [
+    '/api/services',
+    '/api/gallery',
+    '/api/gallery/featured',
+    '/api/contacts',
+    '/api/contacts?status=new',
+    '/api/stats',
+]
+
+
+def add_rows(count):
+    for i in range(count):
+        db.session.add(Service(name=f'Prestation {i}', price=30, duration=45))
+        db.session.add(Gallery(title=f'Image {i}', image_url=f'/uploads/gallery/{i}.jpg',
+                               category='gel', is_featured=True))
+        db.session.add(Contact(name=f'Client {i}', email=f'client{i}@example.com', message='Bonjour'))
+    db.session.commit()
+
+
+def queries_for(client, url):
+    # Cache vide : la liste est relue en base
+    catalog_cache.clear()
+    with count_queries(db.engine) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return queries
+
+
+@pytest.mark.parametrize('url', LISTS)
+def test_list_query_count_does_not_grow_with_rows(client, url):
+    add_rows(3)
+    few = queries_for(client, url)
+    add_rows(40)
+    many = queries_for(client, url)
+
+    assert len(many) == len(few), many
+    assert len(many) <= 4, many
@@ -0,0 +1,107 @@
+"""Limitation de debit : 429 avec Retry-After, remplissage des seaux, bornes."""
+import sqlite3
+
+import pytest
+
+from app import create_app, init_db
+from conftest import TestingConfig
+from extensions import db
+from utils import ratelimit
+from utils.ratelimit import MemoryStorage, SQLiteStorage
+
+
+class Clock:
+    """Remplace time.monotonic et time.time dans utils.ratelimit."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limited_client(request, tmp_path, clock):
+    class LimitedConfig(TestingConfig):
+        RATELIMIT_ENABLED = True
+        RATELIMIT_STORAGE_URL = f'sqlite:///{tmp_path}/buckets.db' if request.param == 'sqlite' else 'memory://'
+        RATELIMITS = {'contact': {'client': '2/minute', 'global': '100/minute'}}
+
+    app = create_app(LimitedConfig)
+    with app.app_context():
+        init_db()
+        yield app.test_client()
+        db.session.remove()
+
+
+def send(client, i):
+    return client.post('/api/contact', json={
+        'name': 'Marie', 'email': 'marie@example.com', 'message': f'Bonjour, message numero {i}',
+    })
+
+
+def test_client_over_limit_gets_429_with_retry_after(limited_client):
+    assert [send(limited_client, i).status_code for i in range(2)] == [201, 201]
+
+    response = send(limited_client, 2)
+    assert response.status_code == 429
+    # 2 jetons par minute : un jeton toutes les 30 secondes
+    assert response.headers['Retry-After'] == '30'
+    assert len(limited_client.get('/api/contacts').json) == 2
+
+
+def test_bucket_refills_over_time(limited_client, clock):
+    for i in range(2):
+        send(limited_client, i)
+    clock.now += 20
+    # Un tiers de jeton manquant : 10 secondes, arrondies a l'entier superieur
+    assert int(send(limited_client, 2).headers['Retry-After']) in (10, 11)
+
+    clock.now += 10
+    assert send(limited_client, 3).status_code == 201
+    assert send(limited_client, 4).status_code == 429
+
+
+@pytest.mark.parametrize('storage', ['memory', 'sqlite'])
+def test_buckets_are_per_key(storage, tmp_path, clock):
+    storage = MemoryStorage() if storage == 'memory' else SQLiteStorage(str(tmp_path / 'buckets.db'))
+    assert storage.take('contact:a', 1, 1 / 60) == (True, 0)
+    assert storage.take('contact:a', 1, 1 / 60) == (False, 60)
+    assert storage.take('contact:b', 1, 1 / 60) == (True, 0)
+
+
+def test_memory_storage_forgets_least_recent_clients(clock):
+    storage = MemoryStorage(max_entries=3)
+    storage.take('a', 1, 1 / 60)
+    for key in ('b', 'c', 'd'):
+        storage.take(key, 1, 1 / 60)
+
+    assert len(storage) == 3
+    # Seau oublie : de nouveau plein
+    assert storage.take('a', 1, 1 / 60)[0] is True
+    assert storage.take('b', 1, 1 / 60)[0] is True
+    assert storage.take('d', 1, 1 / 60)[0] is False
+
+
+def test_sqlite_storage_purges_full_buckets(tmp_path, clock):
+    path = str(tmp_path / 'buckets.db')
+    storage = SQLiteStorage(path)
+    storage.PURGE_EVERY = 10
+    for i in range(9):
+        storage.take(f'client-{i}', 5, 5 / 60)
+
+    # Seaux redevenus pleins apres une minute : purges au 10e appel
+    clock.now += 61
+    storage.take('client-9', 5, 5 / 60)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute('SELECT key FROM buckets').fetchall() == [('client-9',)]
@@ -0,0 +1,86 @@
+"""Recherche plein texte des messages : classement, curseur, saisie, triggers."""
+import pytest
+
+from extensions import db
+from models.contact import Contact
+from utils.search import match_expression
+
+
+def send(client, message, name='Marie Dupont', email='marie@example.com'):
+    return client.post('/api/contact', json={'name': name, 'email': email, 'message': message}).json['contact']['id']
+
+
+def search(client, q, **params):
+    response = client.get('/api/contacts', query_string=dict(params, q=q))
+    assert response.status_code == 200, response.json
+    return response
+
+
+def ids(client, q):
+    return [c['id'] for c in search(client, q).json]
+
+
+def test_results_are_ranked_by_relevance(client):
+    long = send(client, 'Bonjour, je voudrais un rendez-vous samedi matin pour une pose, peut-etre en gel')
+    short = send(client, 'Pose gel : gel rose ou gel nude ?')
+    send(client, 'Quels sont vos tarifs pour une manucure classique ?')
+
+    assert ids(client, 'gel') == [short, long]
+    # Prefixe, sans accents ni casse
+    assert ids(client, 'Pôs') == [short, long]
+    # Tous les mots sont requis
+    assert ids(client, 'gel samedi') == [long]
+
+
+def test_cursor_continues_in_rank_order(client):
+    for i in range(5):
+        send(client, 'vernis ' * (i + 1) + f'message {i}')
+    expected = ids(client, 'vernis')
+    assert len(expected) == 5
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2, 'cursor': cursor} if cursor else {'limit': 2}
+        response = search(client, 'vernis', **params)
+        seen += [c['id'] for c in response.json]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == expected
+
+
+@pytest.mark.parametrize('q, expression', [
+    ('gel', '"gel"*'),
+    ('gel"rose', '"gel"* "rose"*'),
+    ('gel* OR', '"gel"* "OR"*'),
+    ('NEAR(gel pose)', '"NEAR"* "gel"* "pose"*'),
+    ('-gel', '"gel"*'),
+])
+def test_fts_syntax_is_quoted(q, expression):
+    assert match_expression(q) == expression
+
+
+@pytest.mark.parametrize('q', ['"', '*', '-', 'NEAR(', 'gel"', 'a OR NOT b'])
+def test_special_input_never_fails(client, q):
+    send(client, 'Pose gel rose')
+    response = client.get('/api/contacts', query_string={'q': q})
+    if q in ('"', '*', '-'):
+        assert response.status_code == 400
+        assert response.json == {'error': 'La recherche doit contenir au moins un mot'}
+    else:
+        assert response.status_code == 200
+
+
+def test_triggers_keep_index_in_sync(client):
+    id = send(client, 'Pose gel rose')
+    assert ids(client, 'rose') == [id]
+
+    contact = db.session.get(Contact, id)
+    contact.message = 'Pose gel nude'
+    db.session.commit()
+    assert ids(client, 'rose') == []
+    assert ids(client, 'nude') == [id]
+
+    client.delete(f'/api/contacts/{id}')
+    assert ids(client, 'nude') == []
+    assert ids(client, 'gel') == []
@@ -0,0 +1,82 @@
+"""Compteurs de statistiques : toujours egaux a un recalcul complet."""
+from sqlalchemy import event
+
+from extensions import db
+from utils.stats import get_stats, rebuild_counters
+
+
+def recomputed():
+    """Statistiques recalculees depuis les tables (sans toucher aux compteurs)."""
+    stats = get_stats()
+    rebuild_counters()
+    expected = get_stats()
+    db.session.rollback()
+    return stats, expected
+
+
+def create_image(client, category):
+    image = {'title': 'Image', 'image_url': '/uploads/gallery/a.jpg', 'category': category}
+    return client.post('/api/gallery', json=image).json['id']
+
+
+def create_contact(client):
+    body = {'name': 'Marie', 'email': 'marie@example.com', 'message': 'Bonjour'}
+    return client.post('/api/contact', json=body).json['contact']['id']
+
+
+def test_batch_updates_follow_running_state(app):
+    from utils.stats import record_batch
+    from models.gallery import Gallery
+
+    image = Gallery(title='Image', image_url='/uploads/gallery/a.jpg', category='gel')
+    db.session.add(image)
+    db.session.flush()
+    rebuild_counters()
+
+    # Meme ligne modifiee deux fois puis supprimee dans un lot
+    record_batch('gallery', [], [{'id': image.id, 'category': 'french'},
+                                 {'id': image.id, 'category': 'soin'}], [image.id])
+    db.session.delete(image)
+    stats, expected = recomputed()
+    assert stats['gallery'] == expected['gallery']
+
+
+def test_status_change_counts_the_status_actually_replaced(client):
+    id = create_contact(client)
+
+    # Un autre worker passe le message en 'read' entre la lecture et l'UPDATE
+    def concurrent_write(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE contacts SET status') and not concurrent_write.done:
+            concurrent_write.done = True
+            dbapi = cursor.connection
+            dbapi.execute("UPDATE contacts SET status = 'read' WHERE id = ?", (id,))
+            for name, delta in (('contacts.status.new', -1), ('contacts.status.read', 1)):
+                dbapi.execute('INSERT INTO stat_counters (name, value) VALUES (?, ?) '
+                              'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value', (name, delta))
+            dbapi.commit()
+    concurrent_write.done = False
+
+    event.listen(db.engine, 'before_cursor_execute', concurrent_write)
+    try:
+        response = client.put(f'/api/contacts/{id}', json={'status': 'replied'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', concurrent_write)
+
+    assert concurrent_write.done
+    assert response.status_code == 200
+    stats, expected = recomputed()
+    assert stats['contacts'] == expected['contacts']
+    assert stats['contacts']['status']['replied'] == 1
+
+
+def test_single_writes_keep_counters_exact(client):
+    ids = [create_contact(client) for _ in range(3)]
+    client.put(f'/api/contacts/{ids[0]}', json={'status': 'read'})
+    client.put(f'/api/contacts/{ids[0]}', json={'status': 'read'})
+    client.delete(f'/api/contacts/{ids[1]}')
+    assert client.delete(f'/api/contacts/{ids[1]}').status_code == 404
+    create_image(client, 'gel')
+
+    stats, expected = recomputed()
+    assert stats == expected
+    assert stats['contacts']['total'] == 2
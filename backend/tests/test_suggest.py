@@ -0,0 +1,124 @@
+"""Autocompletion : index construit a la premiere recherche, rattrape ligne par ligne entre processus."""
+import json
+import logging
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from conftest import TestingConfig
+from extensions import db, suggest_index
+from utils.seed import seed_synthetic
+from utils.suggest import SuggestIndex
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Compte les constructions completes de l'index."""
+    calls = []
+    build = SuggestIndex._build
+
+    def counting_build(self):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.05)  # laisse aux autres threads le temps d'arriver
+        build(self)
+
+    monkeypatch.setattr(SuggestIndex, '_build', counting_build)
+    return calls
+
+
+def other_worker(statement, **params):
+    """Ecriture d'un autre processus : donnees, version partagee et journal des lignes."""
+    with db.engine.begin() as conn:
+        id = conn.execute(text(statement + ' RETURNING id'), params).scalar()
+        version = conn.execute(text(
+            "INSERT INTO table_versions (name, version, modified_at) VALUES ('services', 1, CURRENT_TIMESTAMP) "
+            'ON CONFLICT (name) DO UPDATE SET version = version + 1 RETURNING version'
+        )).scalar()
+        conn.execute(text("INSERT INTO table_changes (name, version, ids) VALUES ('services', :version, :ids)"),
+                     {'version': version, 'ids': json.dumps([id])})
+    return id
+
+
+def other_worker_insert(name):
+    return other_worker('INSERT INTO services (name, price, duration) VALUES (:name, 40, 60)', name=name)
+
+
+def labels(client, prefix):
+    return [s['label'] for s in client.get(f'/api/search/suggest?prefix={prefix}').json]
+
+
+def test_startup_and_commands_do_not_read_catalog(tmp_path, caplog):
+    class EmptyDatabase(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/empty.db'
+
+    with caplog.at_level(logging.WARNING):
+        app = create_app(EmptyDatabase)
+    assert caplog.records == []
+    assert app.test_cli_runner().invoke(args=['--help']).exit_code == 0
+    assert len(suggest_index) == 0
+
+
+def test_index_is_built_on_first_search(client, builds):
+    client.post('/api/services', json={'name': 'Pose gel', 'price': 40, 'duration': 60})
+    assert builds == []
+
+    assert labels(client, 'ge') == ['Pose gel']
+    client.post('/api/gallery/batch', json={'create': [
+        {'title': 'Gel rose', 'image_url': '/uploads/gallery/a.jpg', 'category': 'gel'},
+    ]})
+
+    assert labels(client, 'ge') == ['Gel rose', 'Pose gel']
+    # Ecritures du processus appliquees element par element
+    assert len(builds) == 1
+
+
+def test_writes_from_another_worker_are_caught_up_without_rebuild(client, builds):
+    client.post('/api/services', json={'name': 'Pose gel', 'price': 40, 'duration': 60})
+    assert labels(client, 'gel') == ['Pose gel']
+
+    id = other_worker_insert('Gel X')
+    assert labels(client, 'gel') == ['Gel X', 'Pose gel']
+
+    other_worker("UPDATE services SET name = 'Vernis gel' WHERE id = :id", id=id)
+    assert labels(client, 'gel') == ['Pose gel', 'Vernis gel']
+
+    other_worker('DELETE FROM services WHERE id = :id', id=id)
+    assert labels(client, 'gel') == ['Pose gel']
+    assert len(builds) == 1
+
+
+def test_bulk_load_rebuilds_in_background(app, client, builds):
+    assert labels(client, 'gel') == []
+    seed_synthetic(services=3, seed=1)
+
+    # Le chargement en masse ne journalise pas ses ids : reconstruction en
+    # arriere-plan, la recherche est servie par l'index courant
+    assert labels(client, 'gel') == []
+    suggest_index._rebuilder.join()
+
+    assert len(suggest_index) == 3
+    assert len(builds) == 2
+    assert builds[1] == 'suggest-rebuild'
+
+
+def test_concurrent_searches_catch_up_once(app, builds):
+    suggest_index.suggest('gel')
+    other_worker_insert('Pose gel')
+
+    results = []
+
+    def search():
+        with app.app_context():
+            results.append(suggest_index.suggest('gel'))
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all([s['label'] for s in r] == ['Pose gel'] for r in results)
@@ -0,0 +1,15 @@
+"""Export des messages : type de contenu de chaque format."""
+import pytest
+
+
+@pytest.mark.parametrize('fmt, content_type', [
+    ('csv', 'text/csv; charset=utf-8'),
+    ('ndjson', 'application/x-ndjson'),
+])
+def test_export_content_type(client, fmt, content_type):
+    client.post('/api/contact', json={'name': 'Marie', 'email': 'marie@example.com', 'message': 'Bonjour'})
+    response = client.get(f'/api/contacts/export?format={fmt}')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == content_type
+    assert 'Marie' in response.get_data(as_text=True)
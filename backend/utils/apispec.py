@@ -0,0 +1,58 @@
+"""
+Spec OpenAPI servie depuis un cache.
+
+flasgger construit la spec en analysant le YAML de toutes les docstrings des
+routes. Ce travail n'est jamais fait au demarrage : la spec est lue depuis un
+fichier precalcule (SWAGGER_SPEC_FILE, produit par `flask export-spec`) ou
+generee a la premiere demande. Dans les deux cas, les octets encodes restent
+en memoire et sont servis tels quels ensuite.
+"""
+import os
+
+from utils.snapshot import Snapshot, encode_json, json_response
+
+
+def serve_cached_apispec(app, swagger, endpoint='apispec'):
+    """
+    Remplace la vue flasgger de la spec par une version mise en cache.
+
+    Args:
+        app: Application Flask
+        swagger: Instance flasgger.Swagger de l'application
+        endpoint (str): Endpoint de la spec dans la configuration flasgger
+    """
+    path = app.config.get('SWAGGER_SPEC_FILE')
+    cache = {}
+
+    def apispec():
+        body = cache.get('body')
+        if body is None:
+            if path and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    body = Snapshot(f.read())
+            else:
+                body = encode_json(swagger.get_apispecs(endpoint))
+            cache['body'] = body
+        return json_response(body)
+
+    app.view_functions[f'flasgger.{endpoint}'] = apispec
+
+
+def export_apispec(swagger, path, endpoint='apispec'):
+    """
+    Genere la spec et l'ecrit dans un fichier (contexte d'application requis).
+
+    L'ecriture passe par un fichier temporaire renomme, pour qu'un worker ne
+    lise jamais une spec a moitie ecrite.
+
+    Returns:
+        int: Taille de la spec en octets
+    """
+    body = encode_json(swagger.get_apispecs(endpoint))
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return len(body)
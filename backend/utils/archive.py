@@ -0,0 +1,101 @@
+"""
+Archivage des anciens messages de contact.
+
+La table contacts porte la boite de reception et l'insertion du formulaire
+public : elle ne doit contenir que les messages vivants. Les messages d'un
+statut donne (par defaut 'replied') plus anciens que ARCHIVE_AFTER_DAYS sont
+deplaces par lots dans contacts_archive (INSERT ... SELECT puis DELETE, un
+commit par lot), avec leur id d'origine.
+
+Une fois le regime etabli, chaque passage supprime autant de lignes qu'il en
+est arrive depuis le precedent : SQLite reutilise les pages liberees, la
+table et ses index gardent une taille stable. A lancer regulierement
+(cron : `flask --app app archive-contacts`).
+"""
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, literal, select
+
+from extensions import db, recent_fingerprints
+from models.archive import ArchivedContact
+from models.contact import Contact
+from utils.db import retry_on_lock
+from utils.stats import increment
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = ('id', 'name', 'email', 'phone', 'message', 'status', 'created_at', 'fingerprint')
+
+
+def eligible(status, before):
+    """Conditions des messages a archiver (index (status, created_at))."""
+    return (Contact.status == status, Contact.created_at < before)
+
+
+@retry_on_lock
+def archive_batch(status, before, batch_size):
+    """
+    Deplace un lot de messages vers l'archive.
+
+    Rejouable : le lot est reselectionne a chaque essai.
+
+    Returns:
+        int: Nombre de messages deplaces (0 quand il n'en reste plus)
+    """
+    ids = db.session.scalars(select(Contact.id).where(*eligible(status, before)).limit(batch_size)).all()
+    if not ids:
+        return 0
+
+    columns = [getattr(Contact, column) for column in ARCHIVED_COLUMNS]
+    rows = select(*columns, literal(datetime.utcnow())).where(Contact.id.in_(ids))
+    db.session.execute(insert(ArchivedContact).from_select(ARCHIVED_COLUMNS + ('archived_at',), rows))
+    db.session.execute(delete(Contact).where(Contact.id.in_(ids)).execution_options(synchronize_session=False))
+    increment({
+        'contacts.total': -len(ids),
+        f'contacts.status.{status}': -len(ids),
+        'contacts_archive.total': len(ids),
+        f'contacts_archive.status.{status}': len(ids),
+    })
+    db.session.commit()
+    # Les doublons d'un message archive ne renvoient plus l'original
+    recent_fingerprints.clear()
+    return len(ids)
+
+
+def count_eligible(statuses, after_days):
+    """Nombre de messages que archive_contacts deplacerait."""
+    before = datetime.utcnow() - timedelta(days=after_days)
+    return sum(
+        db.session.scalar(select(db.func.count()).select_from(Contact).where(*eligible(status, before)))
+        for status in statuses
+    )
+
+
+def archive_contacts(statuses, after_days, batch_size=1000, progress=None):
+    """
+    Archive les messages des statuts donnes plus anciens que after_days.
+
+    Args:
+        statuses (list): Statuts archivables, ex. ['replied']
+        after_days (int): Age minimum en jours
+        batch_size (int): Messages par lot (une transaction courte par lot)
+        progress (callable): Appele avec (statut, messages deplaces) apres chaque lot
+
+    Returns:
+        int: Nombre total de messages archives
+    """
+    before = datetime.utcnow() - timedelta(days=after_days)
+    total = 0
+    for status in statuses:
+        moved = 0
+        while True:
+            count = archive_batch(status, before, batch_size)
+            if not count:
+                break
+            moved += count
+            if progress:
+                progress(status, moved)
+        total += moved
+    logger.info('%s messages archives (statuts %s, plus de %s jours)', total, statuses, after_days)
+    return total
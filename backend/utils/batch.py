@@ -0,0 +1,162 @@
+"""
+Operations par lot (creation, mise a jour, suppression) sur une table.
+
+Tout le lot est valide avant d'ecrire quoi que ce soit : la moindre erreur
+rejette le lot entier, avec le detail par element. Un id ne peut etre cible
+qu'une fois par lot (une seule mise a jour ou une seule suppression). Un lot valide est
+applique en trois instructions groupees (INSERT, UPDATE par cle primaire,
+DELETE ... IN) dans une seule transaction.
+"""
+from sqlalchemy import delete, insert, update
+
+from extensions import db
+
+
+class BatchError(ValueError):
+    """Lot invalide ; errors contient le detail par element."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def is_id(value):
+    """Vrai pour un id entier JSON (true/false sont des int en Python)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_batch(model, data, validate, max_items):
+    """
+    Valide un lot {"create": [...], "update": [...], "delete": [...]}.
+
+    Args:
+        model: Modele SQLAlchemy cible
+        data (dict): Corps de la requete
+        validate (callable): validate(item, partial) -> dict des colonnes,
+            leve ValueError si l'element est invalide
+        max_items (int): Nombre maximum d'elements dans le lot
+
+    Returns:
+        tuple: (lignes a creer, lignes a mettre a jour avec leur id, ids a supprimer)
+
+    Raises:
+        BatchError: Si le lot ou l'un de ses elements est invalide
+    """
+    if not isinstance(data, dict):
+        raise BatchError('Donnees manquantes')
+
+    operations = {}
+    for operation in ('create', 'update', 'delete'):
+        items = data.get(operation) or []
+        if not isinstance(items, list):
+            raise BatchError(f'Le champ {operation} doit etre une liste')
+        operations[operation] = items
+
+    total = sum(len(items) for items in operations.values())
+    if total == 0:
+        raise BatchError('Le lot est vide')
+    if total > max_items:
+        raise BatchError(f'Le lot depasse {max_items} elements')
+
+    errors = []
+    creates, updates, deletes = [], [], []
+
+    for index, item in enumerate(operations['create']):
+        try:
+            creates.append(validate(item, partial=False))
+        except ValueError as e:
+            errors.append({'operation': 'create', 'index': index, 'error': str(e)})
+
+    # id -> operation qui le cible deja dans ce lot
+    targeted = {}
+
+    def claim(operation, index, id):
+        """Reserve un id pour une operation ; False (et erreur) s'il est deja cible."""
+        if id in targeted:
+            errors.append({'operation': operation, 'index': index,
+                           'error': f'Element {id} deja cible par {targeted[id]} dans ce lot'})
+            return False
+        targeted[id] = operation
+        return True
+
+    for index, item in enumerate(operations['update']):
+        if not isinstance(item, dict) or not is_id(item.get('id')):
+            errors.append({'operation': 'update', 'index': index, 'error': "L'id est requis"})
+            continue
+        try:
+            values = validate(item, partial=True)
+        except ValueError as e:
+            errors.append({'operation': 'update', 'index': index, 'error': str(e)})
+            continue
+        if claim('update', index, item['id']):
+            updates.append((index, dict(values, id=item['id'])))
+
+    for index, item in enumerate(operations['delete']):
+        if not is_id(item):
+            errors.append({'operation': 'delete', 'index': index, 'error': "L'id doit etre un entier"})
+            continue
+        if claim('delete', index, item):
+            deletes.append((index, item))
+
+    # Une seule requete pour verifier l'existence de tous les ids cibles
+    target_ids = {values['id'] for _, values in updates} | {id for _, id in deletes}
+    if target_ids:
+        existing = set(db.session.scalars(
+            db.select(model.id).where(model.id.in_(target_ids))
+        ))
+        for operation, items in (('update', updates), ('delete', deletes)):
+            for index, item in items:
+                id = item['id'] if operation == 'update' else item
+                if id not in existing:
+                    errors.append({'operation': operation, 'index': index,
+                                   'error': f'Element {id} non trouve'})
+
+    if errors:
+        raise BatchError('Lot invalide', errors)
+
+    return creates, [values for _, values in updates], [id for _, id in deletes]
+
+
+def apply_batch(model, creates, updates, deletes, after_write=None):
+    """
+    Applique un lot valide dans la transaction courante (sans commit).
+
+    Args:
+        model: Modele SQLAlchemy cible
+        creates (list): Colonnes des lignes a creer
+        updates (list): Colonnes a modifier, avec la cle 'id'
+        deletes (list): Ids a supprimer
+        after_write (callable): Appele avec creates + updates apres les
+            ecritures, avant la serialisation (ex. etat des declinaisons)
+
+    Returns:
+        dict: {'created': [...], 'updated': [...], 'deleted': [...]}
+    """
+    created = []
+    if creates:
+        created = db.session.scalars(insert(model).returning(model), creates).all()
+
+    updated = []
+    if updates:
+        # UPDATE par cle primaire : une instruction executee pour toutes les lignes
+        changes = [values for values in updates if len(values) > 1]
+        if changes:
+            db.session.execute(update(model), changes)
+    if after_write and (creates or updates):
+        after_write(creates + updates)
+
+    if updates:
+        ids = [values['id'] for values in updates]
+        rows = {row.id: row for row in model.query.filter(model.id.in_(ids))}
+        updated = [rows[id] for id in ids]
+
+    if deletes:
+        db.session.execute(
+            delete(model).where(model.id.in_(deletes)).execution_options(synchronize_session=False)
+        )
+
+    return {
+        'created': [row.to_dict() for row in created],
+        'updated': [row.to_dict() for row in updated],
+        'deleted': deletes,
+    }
@@ -0,0 +1,139 @@
+"""
+Cache de lecture en memoire pour les endpoints du catalogue.
+
+Chaque table possede un compteur de version. Les entrees sont indexees par
+(endpoint, parametres de la requete, version de la table) : incrementer la
+version suffit a invalider toutes les entrees de la table, les anciennes
+sortant naturellement du cache par eviction LRU.
+
+Les entrees sont propres a chaque processus, mais les versions sont
+partagees (utils.versions) : une ecriture traitee par un worker (ou par une
+commande `flask`) invalide le cache de tous les workers des la requete
+suivante.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+
+def request_key():
+    """
+    Identifie la representation demandee par la requete courante.
+
+    Returns:
+        tuple: (endpoint, parametres d'URL, query string triee)
+    """
+    return (
+        request.endpoint,
+        tuple(sorted((request.view_args or {}).items())),
+        tuple(sorted(request.args.items(multi=True))),
+    )
+
+
+class VersionedCache:
+    """Cache LRU borne, invalide par compteur de version par table."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Lit la taille maximale du cache dans la configuration."""
+        self.max_entries = app.config.get('CACHE_MAX_ENTRIES', self.max_entries)
+        app.extensions['catalog_cache'] = self
+
+    def versions(self):
+        """Retourne les versions partagees des tables ({table: (version, date)})."""
+        from utils.versions import table_versions
+
+        return table_versions()
+
+    def version(self, table):
+        """Retourne la version courante d'une table."""
+        from utils.versions import table_version
+
+        return table_version(table)[0]
+
+    def bump(self, table, ids=None):
+        """
+        Invalide toutes les entrees d'une table, dans tous les processus.
+
+        A appeler avant le commit de chaque ecriture sur la table (voir
+        utils.versions.bump_version).
+
+        Args:
+            table (str): Nom de la table (ex: 'services')
+            ids (iterable): Ids des lignes modifiees, None si inconnus
+
+        Returns:
+            int: Nouvelle version de la table
+        """
+        from utils.versions import bump_version
+
+        return bump_version(table, ids)
+
+    def get_or_load(self, table, loader, key=None):
+        """
+        Retourne la valeur en cache pour la requete courante, ou la calcule.
+
+        Par defaut, la cle est construite a partir de l'endpoint, des
+        parametres d'URL et de la query string de la requete en cours.
+
+        Args:
+            table (str): Table dont depend le resultat
+            loader (callable): Fonction sans argument qui interroge la base
+            key (tuple): Cle explicite, a la place de celle de la requete
+
+        Returns:
+            La valeur retournee par loader (partagee entre requetes,
+            a ne pas modifier)
+        """
+        key = (key or request_key(), table, self.version(table))
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Le chargement se fait hors verrou pour ne pas bloquer les autres lectures
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        """Vide le cache et remet les compteurs a zero."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            dict: Entrees, capacite, hits, misses et versions par table
+        """
+        versions = self.versions()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'versions': {table: version for table, (version, _) in versions.items()},
+            }
@@ -0,0 +1,128 @@
+"""
+Compression des reponses (gzip, brotli) negociee sur Accept-Encoding.
+
+Un hook after_request compresse les reponses textuelles (JSON, texte) d'au
+moins COMPRESS_MIN_SIZE octets, dans l'encodage prefere du client parmi ceux
+disponibles : br si le paquet Brotli est installe, sinon gzip. Les reponses
+en flux (export) et les fichiers envoyes tels quels ne sont pas touches.
+
+Les corps pre-encodes du cache de lecture (utils.snapshot) gardent leurs
+variantes compressees avec eux : chaque variante est calculee une seule fois
+par version de table, au niveau de compression maximal, puis servie telle
+quelle a chaque hit. Les autres reponses sont compressees a la volee, a un
+niveau plus rapide.
+
+Une representation compressee n'est pas identique octet pour octet a
+l'originale : son ETag devient faible (W/"...").
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optionnel : sans Brotli, seul gzip est propose
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'image/svg+xml')
+
+# Niveaux a la volee (rapides) et pour les corps mis en cache (compresses une fois)
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+CACHED_LEVELS = {'br': 11, 'gzip': 9}
+
+
+def compress(data, encoding, level):
+    """
+    Compresse un corps de reponse.
+
+    Args:
+        data (bytes): Corps a compresser
+        encoding (str): 'br' ou 'gzip'
+        level (int): Niveau (qualite 0-11 pour br, 1-9 pour gzip)
+
+    Returns:
+        bytes: Corps compresse
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime=0 : memes octets a chaque compression d'un meme corps
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate(accept, encodings):
+    """
+    Choisit l'encodage d'apres l'en-tete Accept-Encoding.
+
+    Args:
+        accept: request.accept_encodings
+        encodings (tuple): Encodages disponibles, par ordre de preference
+
+    Returns:
+        str: Encodage retenu, ou None pour une reponse non compressee
+    """
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(response):
+    """Vrai si le type de la reponse gagne a etre compresse."""
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+class Compression:
+    """Compression negociee des reponses, avec variantes en cache."""
+
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 1024
+        self.encodings = ('br', 'gzip') if brotli else ('gzip',)
+
+    def init_app(self, app):
+        """Branche le hook de compression si COMPRESSION_ENABLED est vrai."""
+        app.extensions['compression'] = self
+        self.enabled = app.config['COMPRESSION_ENABLED']
+        if not self.enabled:
+            return
+
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        app.after_request(self._after_request)
+
+    def _after_request(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or not compressible(response)):
+            return response
+
+        # Le corps depend d'Accept-Encoding : les caches partages doivent le savoir
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings, self.encodings)
+        if encoding is None or response.status_code not in (200, 304):
+            return response
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        if response.status_code != 200:
+            return response
+
+        snapshot = getattr(response, 'snapshot', None)
+        data = snapshot if snapshot is not None else response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if snapshot is not None:
+            body = snapshot.variants.get(encoding)
+            if body is None:
+                body = snapshot.variants[encoding] = compress(snapshot, encoding, CACHED_LEVELS[encoding])
+        else:
+            body = compress(data, encoding, DYNAMIC_LEVELS[encoding])
+        if len(body) >= len(data):
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
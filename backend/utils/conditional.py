@@ -0,0 +1,75 @@
+"""
+Requetes GET conditionnelles (ETag / Last-Modified) pour le catalogue.
+
+Les validateurs sont derives de la ligne de la table dans table_versions
+(utils.versions) : sa version, incrementee dans la transaction de chaque
+ecriture (suppressions comprises), et la date de cette ecriture. Apres une
+ecriture, aucun worker ne repond donc 304 a un validateur perime, et une
+requete revalidee ne coute que la lecture des versions, sans parcourir la
+table.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from utils.cache import request_key
+from utils.versions import table_version
+
+# Last-Modified d'une table jamais modifiee depuis la creation de table_versions
+EPOCH = datetime(1970, 1, 1)
+
+
+def _validators(table):
+    """Calcule l'ETag fort et la date Last-Modified de la requete courante."""
+    version, modified_at = table_version(table)
+    last_modified = (modified_at or EPOCH).replace(microsecond=0, tzinfo=timezone.utc)
+
+    # L'ETag depend de la representation demandee (endpoint + parametres)
+    # et de la version partagee de la table, pas du processus qui repond
+    seed = repr((request_key(), version)).encode('utf-8')
+    etag = hashlib.sha1(seed).hexdigest()
+    return etag, last_modified
+
+
+def conditional(table):
+    """
+    Decorateur ajoutant ETag et Last-Modified a une vue GET du catalogue.
+
+    Repond 304 Not Modified si If-None-Match (prioritaire) ou
+    If-Modified-Since correspondent, avant toute lecture des lignes.
+
+    Args:
+        table (str): Nom de la table (ex: 'services')
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = _validators(table)
+
+            if request.if_none_match:
+                # Comparaison faible : la version compressee porte W/"<etag>"
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            else:
+                not_modified = False
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = view(*args, **kwargs)
+                response = make_response(response)
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            # Le navigateur conserve la reponse mais la revalide a chaque visite
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
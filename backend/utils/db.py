@@ -0,0 +1,109 @@
+"""
+Profil SQLite de production : pragmas par connexion et reprise sur verrou.
+
+SQLite n'autorise qu'un ecrivain a la fois. En mode WAL, les lectures ne
+bloquent plus les ecritures (et inversement) ; busy_timeout fait patienter
+une connexion au lieu d'echouer immediatement. Il reste des cas ou SQLite
+abandonne sans attendre (transaction de lecture promue en ecriture) : les
+vues d'ecriture sont alors rejouees par retry_on_lock.
+"""
+import logging
+import random
+import time
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+def configure_sqlite(engine, pragmas):
+    """
+    Applique les pragmas a chaque nouvelle connexion SQLite du moteur.
+
+    Args:
+        engine: Moteur SQLAlchemy (ignore si ce n'est pas SQLite)
+        pragmas (dict): Pragmas a appliquer, ex: {'journal_mode': 'WAL'}
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def is_memory_sqlite(url):
+    """True pour une base SQLite en memoire (sqlite:// ou :memory:)."""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+    )
+
+
+def engine_options(url, pool_options, options=None):
+    """
+    Options du moteur SQLAlchemy adaptees a l'URL de la base.
+
+    Les options de taille du pool (pool_size, max_overflow, pool_timeout)
+    n'existent que pour un QueuePool : elles sont ignorees pour une base
+    SQLite en memoire, servie par un StaticPool.
+
+    Args:
+        url (str): URL de la base
+        pool_options (dict): Options du pool de connexions
+        options (dict): Autres options du moteur, prioritaires
+
+    Returns:
+        dict: Options a placer dans SQLALCHEMY_ENGINE_OPTIONS
+    """
+    merged = {} if is_memory_sqlite(url) else dict(pool_options)
+    merged.update(options or {})
+    return merged
+
+
+def is_lock_error(error):
+    """True si l'erreur correspond a une base SQLite verrouillee."""
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_lock(view=None, attempts=5, base_delay=0.05):
+    """
+    Decorateur rejouant une vue d'ecriture quand la base est verrouillee.
+
+    La session est annulee avant chaque nouvel essai. La vue ne doit pas
+    avoir d'effet de bord avant son commit (cas des handlers de l'API).
+
+    Args:
+        attempts (int): Nombre maximum d'essais
+        base_delay (float): Delai initial en secondes, double a chaque essai
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            from extensions import db
+
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as e:
+                    db.session.rollback()
+                    if attempt == attempts or not is_lock_error(e):
+                        raise
+                    delay = base_delay * 2 ** (attempt - 1)
+                    logger.warning('Base verrouillee, nouvel essai dans %.2fs (%s/%s)',
+                                   delay, attempt, attempts)
+                    # Alea pour eviter que les ecrivains ne se reveillent ensemble
+                    time.sleep(delay * (0.5 + random.random()))
+
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
@@ -1,16 +1,119 @@
 """
-Module d'envoi d'emails (optionnel).
-Nécessite Flask-Mail et une configuration SMTP.
+Module d'envoi d'emails.
+
+Nécessite une configuration SMTP (variables MAIL_* dans .env).
+Les notifications de contact passent par la file asynchrone de
+utils/notifications.py ; ce module fournit le client SMTP réutilisable.
 """
+import logging
 import os
+import smtplib
+from email.message import EmailMessage
 
+logger = logging.getLogger(__name__)
 
-def send_email(to, subject, body):
+
+def header_value(value):
+    """
+    Valeur utilisable dans un en-tete d'email.
+
+    Les retours a la ligne (CR/LF) sont remplaces par des espaces : un nom
+    saisi sur plusieurs lignes ne doit ni injecter d'en-tete ni faire
+    echouer la construction du message.
+    """
+    return ' '.join(str(value or '').splitlines()).strip()
+
+
+def smtp_settings(config=None):
+    """
+    Lit la configuration SMTP.
+
+    Args:
+        config (dict): Configuration Flask (par défaut: variables d'environnement)
+
+    Returns:
+        dict: server, port, username, password, use_tls, sender, timeout
+    """
+    config = config or {}
+
+    def get(name, default=None):
+        return config.get(name) or os.getenv(name, default)
+
+    return {
+        'server': get('MAIL_SERVER'),
+        'port': int(get('MAIL_PORT', 587)),
+        'username': get('MAIL_USERNAME'),
+        'password': get('MAIL_PASSWORD'),
+        'use_tls': str(get('MAIL_USE_TLS', 'true')).lower() == 'true',
+        'sender': get('MAIL_DEFAULT_SENDER') or get('MAIL_USERNAME'),
+        'timeout': float(get('MAIL_TIMEOUT', 10)),
+    }
+
+
+class SMTPClient:
+    """
+    Connexion SMTP persistante, réutilisée d'un envoi à l'autre.
+
+    Non thread-safe : chaque thread d'envoi possède son propre client.
     """
-    Envoie un email.
 
-    Note: Cette fonction est un placeholder.
-    Pour l'activer, installez Flask-Mail et configurez les variables SMTP dans .env
+    def __init__(self, settings):
+        self.settings = settings
+        self._connection = None
+
+    @property
+    def configured(self):
+        """True si un serveur SMTP est configuré."""
+        return bool(self.settings.get('server'))
+
+    def _connect(self):
+        """Ouvre (ou rouvre) la connexion SMTP."""
+        self.close()
+        connection = smtplib.SMTP(
+            self.settings['server'], self.settings['port'], timeout=self.settings['timeout']
+        )
+        if self.settings['use_tls']:
+            connection.starttls()
+        if self.settings['username'] and self.settings['password']:
+            connection.login(self.settings['username'], self.settings['password'])
+        self._connection = connection
+
+    def send(self, to, subject, body):
+        """
+        Envoie un email en réutilisant la connexion ouverte.
+
+        Une connexion fermée par le serveur (inactivité) est rouverte une fois.
+
+        Raises:
+            smtplib.SMTPException, OSError: Si l'envoi échoue
+        """
+        message = EmailMessage()
+        message['From'] = header_value(self.settings['sender'])
+        message['To'] = header_value(to)
+        message['Subject'] = header_value(subject)
+        message.set_content(body)
+
+        if self._connection is None:
+            self._connect()
+        try:
+            self._connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self._connection.send_message(message)
+
+    def close(self):
+        """Ferme la connexion si elle est ouverte."""
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+def send_email(to, subject, body):
+    """
+    Envoie un email de façon synchrone (connexion ouverte pour l'occasion).
 
     Args:
         to (str): Adresse email du destinataire
@@ -20,50 +123,60 @@ def send_email(to, subject, body):
     Returns:
         bool: True si l'envoi a réussi, False sinon
     """
-    # Configuration requise dans .env:
-    # MAIL_SERVER=smtp.gmail.com
-    # MAIL_PORT=587
-    # MAIL_USERNAME=votre_email@gmail.com
-    # MAIL_PASSWORD=votre_mot_de_passe
-
-    mail_server = os.getenv('MAIL_SERVER')
-    mail_username = os.getenv('MAIL_USERNAME')
+    client = SMTPClient(smtp_settings())
 
-    if not mail_server or not mail_username:
+    if not client.configured:
         print(f"[Email non configuré] To: {to}, Subject: {subject}")
         return False
 
-    # TODO: Implémenter l'envoi réel avec Flask-Mail
-    # from flask_mail import Message
-    # msg = Message(subject, recipients=[to], body=body)
-    # mail.send(msg)
+    try:
+        client.send(to, subject, body)
+    except (smtplib.SMTPException, OSError) as e:
+        logger.error("Echec de l'envoi de l'email à %s: %s", to, e)
+        return False
+    finally:
+        client.close()
 
     print(f"[Email envoyé] To: {to}, Subject: {subject}")
     return True
 
 
-def send_contact_notification(contact_data):
+def build_contact_notification(contact_data, admin_email=None):
     """
-    Envoie une notification pour un nouveau message de contact.
+    Construit la notification d'un nouveau message de contact.
 
     Args:
-        contact_data (dict): Données du contact (name, email, message)
+        contact_data (dict): Données du contact (name, email, phone, message)
+        admin_email (str): Destinataire (par défaut: ADMIN_EMAIL)
 
     Returns:
-        bool: True si l'envoi a réussi
+        tuple: (destinataire, sujet, corps)
     """
-    admin_email = os.getenv('ADMIN_EMAIL', 'admin@example.com')
+    admin_email = admin_email or os.getenv('ADMIN_EMAIL', 'admin@example.com')
 
-    subject = f"Nouveau message de contact - {contact_data.get('name')}"
+    subject = header_value(f"Nouveau message de contact - {contact_data.get('name')}")
     body = f"""
     Nouveau message reçu via le formulaire de contact:
 
     Nom: {contact_data.get('name')}
     Email: {contact_data.get('email')}
-    Téléphone: {contact_data.get('phone', 'Non renseigné')}
+    Téléphone: {contact_data.get('phone') or 'Non renseigné'}
 
     Message:
     {contact_data.get('message')}
     """
 
-    return send_email(admin_email, subject, body)
+    return admin_email, subject, body
+
+
+def send_contact_notification(contact_data):
+    """
+    Envoie une notification pour un nouveau message de contact (synchrone).
+
+    Args:
+        contact_data (dict): Données du contact (name, email, message)
+
+    Returns:
+        bool: True si l'envoi a réussi
+    """
+    return send_email(*build_contact_notification(contact_data))
@@ -0,0 +1,85 @@
+"""
+Detection des messages de contact envoyes en double.
+
+Un double clic ou un client qui rejoue sa requete envoie le meme message
+plusieurs fois. Chaque message recoit une empreinte (email et message
+normalises, SHA-256) stockee dans une colonne indexee ; un message dont
+l'empreinte a deja ete vue pendant la fenetre configuree est un doublon.
+
+Les empreintes recentes sont aussi gardees en memoire (LRU borne) : les
+rafales de doublons sont reconnues sans requete. Une empreinte absente de la
+memoire est cherchee dans l'index (un autre worker a pu recevoir l'original).
+Une entree expire a la meme date que la fenetre en base (date de reception
+de l'original + fenetre), quel que soit le moment ou elle a ete memorisee, et
+les suppressions du processus la retirent.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def contact_fingerprint(email, message):
+    """
+    Empreinte d'un message : insensible a la casse et aux espaces.
+
+    Args:
+        email (str): Email de l'expediteur
+        message (str): Texte du message
+
+    Returns:
+        str: Empreinte hexadecimale (64 caracteres)
+    """
+    normalized = email.strip().casefold() + '\n' + ' '.join(message.casefold().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class RecentFingerprints:
+    """Empreintes vues recemment par ce processus, avec le message cree."""
+
+    def __init__(self, window=600, max_entries=4096):
+        self.window = window
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Lit la fenetre de detection (secondes, 0 pour desactiver)."""
+        self.window = app.config['CONTACT_DUPLICATE_WINDOW']
+        app.extensions['recent_fingerprints'] = self
+
+    def get(self, fingerprint):
+        """Retourne le message (dict) d'une empreinte vue dans la fenetre, ou None."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if datetime.utcnow() - entry[0] > timedelta(seconds=self.window):
+                del self._entries[fingerprint]
+                return None
+            return entry[1]
+
+    def add(self, fingerprint, contact, created_at):
+        """
+        Memorise l'empreinte d'un message enregistre.
+
+        Args:
+            fingerprint (str): Empreinte du message
+            contact (dict): Message serialise, renvoye aux doublons
+            created_at (datetime): Date de reception (UTC), debut de la fenetre
+        """
+        with self._lock:
+            self._entries[fingerprint] = (created_at, contact)
+            self._entries.move_to_end(fingerprint)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, fingerprint):
+        """Oublie l'empreinte d'un message supprime."""
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+
+    def clear(self):
+        """Oublie toutes les empreintes (suppression ou archivage en masse)."""
+        with self._lock:
+            self._entries.clear()
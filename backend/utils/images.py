@@ -0,0 +1,274 @@
+"""
+Generation des declinaisons d'images (miniature, moyenne, grande + WebP).
+
+Le redimensionnement est couteux en CPU : il est execute dans un pool de
+processus, hors du thread de la requete. Les noms des declinaisons sont
+derives du nom de l'original (hash du contenu). Leurs URLs ne sont exposees
+qu'une fois la generation terminee : les images anterieures a l'upload
+(donnees de demonstration, URLs externes) et les generations en cours ou en
+echec gardent leur seule image_url.
+
+L'etat est enregistre en base (colonne renditions_ready de gallery et
+services) : a la fin de la generation, par le processus qui l'a lancee, et a
+chaque ecriture d'une image_url. Une fin de generation incremente la version
+de la table : listes en cache et ETag sont invalides comme pour une ecriture.
+La serialisation ne lit jamais le disque.
+"""
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from flask import current_app
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Declinaisons generees : nom -> plus grand cote en pixels
+RENDITIONS = {
+    'thumbnail': 320,
+    'medium': 800,
+    'large': 1600,
+}
+
+# Formats de sortie : nom -> (extension, format Pillow)
+FORMATS = {
+    'jpeg': ('jpg', 'JPEG'),
+    'webp': ('webp', 'WEBP'),
+}
+
+# Dossiers d'upload autorises (sous UPLOAD_FOLDER)
+UPLOAD_KINDS = ('gallery', 'services')
+
+# Longueur du hash de contenu dans les noms de fichiers
+HASH_LENGTH = 20
+
+# Nom d'un original produit par l'upload : '<hash>.<ext>'
+HASHED_ORIGINAL = re.compile(r'^([0-9a-f]{%d})\.[a-z0-9]+$' % HASH_LENGTH)
+
+# Generee en dernier (voir generate_renditions) : sa presence signale une generation complete
+LAST_RENDITION = ('thumbnail', 'jpeg')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_name(stem, size, fmt):
+    """Nom de fichier d'une declinaison, ex: 'abc123-medium.webp'."""
+    return f'{stem}-{size}.{FORMATS[fmt][0]}'
+
+
+def _hashed_upload(image_url):
+    """(dossier, hash) d'un upload hache, ou None pour toute autre URL."""
+    if not image_url:
+        return None
+    parts = image_url.split('/')
+    if len(parts) != 4 or parts[0] or parts[1] != 'uploads' or parts[2] not in UPLOAD_KINDS:
+        return None
+    match = HASHED_ORIGINAL.match(parts[3])
+    if not match:
+        return None
+    return parts[2], match.group(1)
+
+
+def rendition_urls(image_url, ready):
+    """
+    Calcule les URLs des declinaisons d'une image uploadee.
+
+    Args:
+        image_url (str): URL de l'original, ex: '/uploads/gallery/3f2a9c0b7d1e4a5f6c8b.png'
+        ready (bool): Declinaisons generees (colonne renditions_ready)
+
+    Returns:
+        dict: {taille: {format: url}}, ou None si l'image n'est pas un upload
+        hache ou si ses declinaisons ne sont pas (encore) generees
+    """
+    upload = _hashed_upload(image_url)
+    if not upload or not ready:
+        return None
+
+    kind, stem = upload
+    base = f'/uploads/{kind}/'
+    return {
+        size: {fmt: base + rendition_name(stem, size, fmt) for fmt in FORMATS}
+        for size in RENDITIONS
+    }
+
+
+def renditions_exist(image_url):
+    """
+    Verifie sur le disque que les declinaisons d'une image ont ete generees.
+
+    Reserve aux ecritures (contexte d'application requis) : les lectures
+    utilisent la colonne renditions_ready.
+    """
+    upload = _hashed_upload(image_url)
+    if not upload:
+        return False
+    kind, stem = upload
+    last = os.path.join(current_app.config['UPLOAD_FOLDER'], kind, rendition_name(stem, *LAST_RENDITION))
+    return os.path.exists(last)
+
+
+def sync_renditions(model, image_urls):
+    """
+    Enregistre l'etat des declinaisons des lignes portant ces image_url (sans commit).
+
+    A appeler apres l'ecriture des lignes, dans sa transaction : l'ecrivain
+    SQLite tient alors le verrou, une fin de generation concurrente attend
+    le commit et voit les nouvelles lignes.
+
+    Args:
+        model: Gallery ou Service
+        image_urls (list): image_url ecrites
+    """
+    from extensions import db
+    from sqlalchemy import update
+
+    urls = {url for url in image_urls if url}
+    ready = {url for url in urls if renditions_exist(url)}
+    for value, selected in ((True, ready), (False, urls - ready)):
+        if selected:
+            db.session.execute(
+                update(model).where(model.image_url.in_(selected))
+                .values(renditions_ready=value, updated_at=model.updated_at)
+            )
+
+
+def mark_renditions_ready(image_url):
+    """
+    Marque pretes les declinaisons d'une image et invalide les tables concernees.
+
+    Appele a la fin de la generation (contexte d'application requis).
+    """
+    from extensions import db
+    from models.gallery import Gallery
+    from models.service import Service
+    from sqlalchemy import update
+    from utils.versions import bump_version
+
+    for table, model in (('gallery', Gallery), ('services', Service)):
+        changed = db.session.scalars(
+            update(model)
+            .where(model.image_url == image_url, model.renditions_ready.is_not(True))
+            .values(renditions_ready=True, updated_at=model.updated_at)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if changed:
+            bump_version(table, changed)
+    db.session.commit()
+
+
+def backfill_renditions():
+    """
+    Renseigne renditions_ready pour les lignes anterieures a la colonne.
+
+    Une verification sur le disque par image, une seule fois (init_db).
+    """
+    from extensions import db
+    from models.gallery import Gallery
+    from models.service import Service
+
+    for model in (Gallery, Service):
+        urls = db.session.scalars(
+            db.select(model.image_url).where(model.renditions_ready.is_(None)).distinct()
+        ).all()
+        sync_renditions(model, urls)
+        db.session.execute(
+            db.update(model).where(model.renditions_ready.is_(None))
+            .values(renditions_ready=False, updated_at=model.updated_at)
+        )
+    db.session.commit()
+
+
+def generate_renditions(source_path, quality=85, webp_quality=80):
+    """
+    Genere toutes les declinaisons d'une image, a cote de l'original.
+
+    Execute dans un processus du pool : ne depend ni de Flask ni de la base.
+
+    Args:
+        source_path (str): Chemin de l'image originale
+        quality (int): Qualite JPEG
+        webp_quality (int): Qualite WebP
+
+    Returns:
+        list: Chemins des fichiers generes
+    """
+    directory = os.path.dirname(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    generated = []
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        # Du plus grand au plus petit : chaque reduction repart de la precedente
+        for size, max_side in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            webp_path = os.path.join(directory, rendition_name(stem, size, 'webp'))
+            image.save(webp_path, 'WEBP', quality=webp_quality, method=4)
+            generated.append(webp_path)
+
+            # Le JPEG ne gere pas la transparence : fond blanc
+            flat = image
+            if has_alpha:
+                flat = Image.new('RGB', image.size, (255, 255, 255))
+                flat.paste(image, mask=image.getchannel('A'))
+            jpeg_path = os.path.join(directory, rendition_name(stem, size, 'jpeg'))
+            flat.save(jpeg_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            generated.append(jpeg_path)
+
+    return generated
+
+
+def get_executor(max_workers=None):
+    """Retourne le pool de processus partage, cree au premier appel."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+        return _executor
+
+
+def _record_result(app, image_url, future):
+    """Enregistre la fin d'une generation, ou journalise son echec."""
+    error = future.exception()
+    if error is not None:
+        logger.error('Echec de la generation des declinaisons: %s', error)
+        return
+    try:
+        with app.app_context():
+            mark_renditions_ready(image_url)
+    except Exception:
+        logger.exception("Impossible d'enregistrer les declinaisons de %s", image_url)
+
+
+def schedule_renditions(source_path, image_url, app):
+    """
+    Planifie la generation des declinaisons dans le pool de processus.
+
+    Args:
+        source_path (str): Chemin de l'image originale
+        image_url (str): URL de l'original (lignes a marquer une fois pretes)
+        app: Application Flask (configuration IMAGE_WORKERS, JPEG_QUALITY,
+            WEBP_QUALITY ; contexte pour l'enregistrement du resultat)
+
+    Returns:
+        Future: Resultat de generate_renditions
+    """
+    config = app.config
+    executor = get_executor(config.get('IMAGE_WORKERS'))
+    future = executor.submit(
+        generate_renditions,
+        source_path,
+        config.get('JPEG_QUALITY', 85),
+        config.get('WEBP_QUALITY', 80),
+    )
+    future.add_done_callback(partial(_record_result, app, image_url))
+    return future
@@ -0,0 +1,212 @@
+"""
+Metriques des requetes HTTP et SQL au format texte Prometheus.
+
+Pour chaque endpoint (ex: services.get_services) sont mesures :
+- le nombre de requetes par methode et statut (compteur) ;
+- la duree des requetes (histogramme) ;
+- le nombre de requetes SQL et leur duree cumulee par requete HTTP
+  (histogrammes), via les evenements du moteur SQLAlchemy.
+
+Un enregistrement ne coute que quelques operations sous verrou (recherche
+dichotomique du seau, increments). Les valeurs sont propres a chaque
+processus ; avec plusieurs workers, METRICS_DIR donne un repertoire commun
+ou chaque processus depose regulierement un instantane de ses compteurs, et
+/api/metrics additionne tous les instantanes.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUERY_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+COUNTERS = {
+    'http_requests_total': 'Requetes HTTP par endpoint, methode et statut',
+}
+
+# Nom -> (seaux, description)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (LATENCY_BUCKETS, 'Duree des requetes HTTP'),
+    'db_queries_per_request': (QUERY_COUNT_BUCKETS, 'Requetes SQL par requete HTTP'),
+    'db_query_seconds_per_request': (QUERY_TIME_BUCKETS, 'Temps SQL cumule par requete HTTP'),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Compteurs et histogrammes par endpoint, alimentes par les hooks Flask."""
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 5
+        self._counters = {}  # (nom, labels) -> valeur
+        self._histograms = {}  # (nom, labels) -> [comptes par seau..., +Inf], somme
+        self._flushed_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Branche les hooks de requete et les evenements du moteur SQLAlchemy.
+
+        Sans effet si METRICS_ENABLED est faux.
+        """
+        from extensions import db
+
+        app.extensions['metrics'] = self
+        self.enabled = app.config['METRICS_ENABLED']
+        if not self.enabled:
+            return
+
+        self.directory = app.config.get('METRICS_DIR')
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL']
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        with app.app_context():
+            self.instrument(db.engine)
+
+    def instrument(self, engine):
+        """Compte et chronometre les requetes SQL executees pendant une requete HTTP."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+            if has_app_context():
+                queries = g.get('metrics_queries')
+                if queries is not None:
+                    queries[0] += 1
+                    queries[1] += elapsed
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = [0, 0.0]
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        queries = g.pop('metrics_queries', None)
+        if started is None:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self._increment('http_requests_total', (
+                ('endpoint', endpoint), ('method', request.method), ('status', response.status_code)
+            ))
+            self._observe('http_request_duration_seconds', (('endpoint', endpoint), ('method', request.method)),
+                          time.perf_counter() - started)
+            self._observe('db_queries_per_request', (('endpoint', endpoint),), queries[0])
+            self._observe('db_query_seconds_per_request', (('endpoint', endpoint),), queries[1])
+
+        if self.directory and time.monotonic() - self._flushed_at > self.flush_interval:
+            self.flush()
+        return response
+
+    def _increment(self, name, labels, value=1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(self, name, labels, value):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [[0] * (len(HISTOGRAMS[name][0]) + 1), 0]
+        histogram[0][bisect_left(HISTOGRAMS[name][0], value)] += 1
+        histogram[1] += value
+
+    def snapshot(self):
+        """Etat des metriques de ce processus, serialisable en JSON."""
+        with self._lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, labels, list(counts), total]
+                               for (name, labels), (counts, total) in self._histograms.items()],
+            }
+
+    def flush(self):
+        """Ecrit l'instantane de ce processus dans METRICS_DIR (ecriture atomique)."""
+        self._flushed_at = time.monotonic()
+        path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _snapshots(self):
+        """Instantanes a additionner : ce processus, puis les autres workers."""
+        yield self.snapshot()
+        if not self.directory:
+            return
+        own = f'metrics-{os.getpid()}.json'
+        for filename in os.listdir(self.directory):
+            if filename.startswith('metrics-') and filename.endswith('.json') and filename != own:
+                try:
+                    with open(os.path.join(self.directory, filename)) as f:
+                        yield json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    def render(self):
+        """
+        Metriques de tous les processus au format texte Prometheus 0.0.4.
+
+        Returns:
+            str: Exposition Prometheus
+        """
+        counters, histograms = {}, {}
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total in snapshot['histograms']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.setdefault(key, [[0] * len(counts), 0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+
+        lines = []
+        for name, help_text in COUNTERS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+
+        for name, (buckets, help_text) in HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for (metric, labels), (counts, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _number(bound)
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,201 @@
+"""
+File asynchrone d'envoi des notifications email.
+
+Le handler de contact enregistre la notification dans la table
+`notifications` (dans la meme transaction que le message), puis publie son
+id dans une file bornee. Des threads d'envoi, chacun avec sa connexion SMTP
+persistante, la consomment. Un balayage periodique de la table reprend les
+notifications en attente : apres un redemarrage, quand la file est pleine
+ou quand un nouvel essai est du (backoff exponentiel).
+
+Plusieurs processus peuvent partager la table : chaque envoi est d'abord
+reserve par un UPDATE conditionnel, une notification n'est donc envoyee
+qu'une fois.
+"""
+import logging
+import queue
+import smtplib
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from utils.email_sender import SMTPClient, smtp_settings
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationQueue:
+    """File bornee + threads d'envoi + reprise depuis la table notifications."""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._queue = None
+        self._threads = []
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        """
+        Configure la file et demarre les threads si un serveur SMTP est defini.
+
+        Sans MAIL_SERVER, la file reste desactivee : rien n'est mis en attente.
+        """
+        self.app = app
+        self.settings = smtp_settings(app.config)
+        self.enabled = bool(self.settings['server']) and app.config['NOTIFICATION_WORKERS'] > 0
+        self.max_attempts = app.config['NOTIFICATION_MAX_ATTEMPTS']
+        self.retry_delay = app.config['NOTIFICATION_RETRY_DELAY']
+        self.sweep_interval = app.config['NOTIFICATION_SWEEP_INTERVAL']
+        # Duree de reservation d'un envoi (au-dela, un autre worker peut le reprendre)
+        self.lease = timedelta(seconds=max(self.settings['timeout'] * 3, 60))
+        self._queue = queue.Queue(maxsize=app.config['NOTIFICATION_QUEUE_SIZE'])
+        app.extensions['notification_queue'] = self
+
+        if self.enabled:
+            self.start(app.config['NOTIFICATION_WORKERS'])
+
+    def start(self, workers):
+        """Demarre les threads d'envoi et le thread de balayage."""
+        self._stop.clear()
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f'notification-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        sweeper = threading.Thread(target=self._sweep, name='notification-sweep', daemon=True)
+        sweeper.start()
+        self._threads.append(sweeper)
+
+    def stop(self, timeout=5):
+        """Arrete les threads (les notifications restantes restent en table)."""
+        self._stop.set()
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, notification_id):
+        """
+        Publie une notification deja enregistree en base.
+
+        Ne bloque jamais : si la file est pleine, la notification sera reprise
+        par le prochain balayage de la table.
+
+        Returns:
+            bool: True si la notification a ete mise en file
+        """
+        if not self.enabled:
+            return False
+        try:
+            self._queue.put_nowait(notification_id)
+            return True
+        except queue.Full:
+            logger.warning('File de notifications pleine, envoi differe (id=%s)', notification_id)
+            return False
+
+    def _work(self):
+        """Boucle d'un thread d'envoi."""
+        client = SMTPClient(self.settings)
+        while not self._stop.is_set():
+            try:
+                # Connexion fermee apres une periode d'inactivite
+                notification_id = self._queue.get(timeout=self.sweep_interval)
+            except queue.Empty:
+                client.close()
+                continue
+
+            try:
+                if notification_id is not None:
+                    with self.app.app_context():
+                        self.deliver(notification_id, client)
+            except Exception:
+                logger.exception("Erreur lors de l'envoi de la notification %s", notification_id)
+            finally:
+                self._queue.task_done()
+        client.close()
+
+    def _sweep(self):
+        """Remet en file les notifications dues, a intervalle regulier."""
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    for notification_id in self.due_ids(self._queue.maxsize - self._queue.qsize()):
+                        if not self.submit(notification_id):
+                            break
+            except Exception:
+                logger.exception('Erreur lors du balayage des notifications')
+            self._stop.wait(self.sweep_interval)
+
+    def due_ids(self, limit):
+        """Retourne les ids des notifications a (re)envoyer maintenant."""
+        from extensions import db
+        from models.notification import Notification
+
+        if limit <= 0:
+            return []
+        rows = db.session.query(Notification.id).filter(
+            Notification.status.in_(['pending', 'sending']),
+            Notification.next_attempt_at <= datetime.utcnow(),
+        ).order_by(Notification.next_attempt_at).limit(limit).all()
+        return [row.id for row in rows]
+
+    def deliver(self, notification_id, client):
+        """
+        Reserve puis envoie une notification, et enregistre le resultat.
+
+        Args:
+            notification_id (int): Id de la notification
+            client (SMTPClient): Connexion SMTP du thread courant
+        """
+        from extensions import db
+        from models.notification import Notification
+
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(Notification)
+            .where(
+                Notification.id == notification_id,
+                Notification.status.in_(['pending', 'sending']),
+                Notification.next_attempt_at <= now,
+            )
+            .values(status='sending', next_attempt_at=now + self.lease)
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return
+
+        notification = db.session.get(Notification, notification_id)
+        notification.attempts = (notification.attempts or 0) + 1
+        try:
+            client.send(notification.recipient, notification.subject, notification.body)
+        except (smtplib.SMTPException, OSError) as e:
+            client.close()
+            self._record_failure(notification, e, retry=True)
+        except Exception as e:
+            # Message inconstructible ou erreur inattendue : un nouvel essai
+            # echouerait de meme, la notification est abandonnee (et l'essai
+            # enregistre) au lieu de rester reservee indefiniment
+            client.close()
+            logger.exception("Erreur lors de l'envoi de la notification %s", notification_id)
+            self._record_failure(notification, e, retry=False)
+        else:
+            notification.status = 'sent'
+            notification.sent_at = datetime.utcnow()
+            notification.last_error = None
+        db.session.commit()
+
+    def _record_failure(self, notification, error, retry):
+        """Planifie un nouvel essai (backoff exponentiel) ou abandonne la notification."""
+        notification.last_error = (str(error) or type(error).__name__)[:255]
+        if not retry or notification.attempts >= self.max_attempts:
+            notification.status = 'failed'
+            logger.error('Notification %s abandonnee apres %s essais: %s',
+                         notification.id, notification.attempts, error)
+        else:
+            notification.status = 'pending'
+            delay = self.retry_delay * 2 ** (notification.attempts - 1)
+            notification.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
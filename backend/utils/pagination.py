@@ -0,0 +1,161 @@
+"""
+Pagination par curseur (keyset) pour les listes de l'API.
+
+Contrairement a OFFSET, le curseur reprend la lecture juste apres la derniere
+ligne renvoyee : la page N coute autant que la page 1, quelle que soit la
+taille de la table, a condition qu'un index couvre les colonnes de tri.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, jsonify
+from sqlalchemy import DateTime, tuple_
+
+from utils.snapshot import json_response
+
+# En-tete HTTP portant le curseur de la page suivante
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(values):
+    """
+    Encode les valeurs de tri de la derniere ligne en jeton opaque.
+
+    Args:
+        values (list): Valeurs des colonnes de tri (datetime, int, str...)
+
+    Returns:
+        str: Jeton base64 utilisable dans l'URL
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """
+    Decode un jeton produit par encode_cursor.
+
+    Args:
+        token (str): Jeton recu dans ?cursor=
+        columns (list): Colonnes de tri, pour retrouver le type des valeurs
+
+    Returns:
+        list: Valeurs typees dans l'ordre des colonnes
+
+    Raises:
+        ValueError: Si le jeton est illisible ou ne correspond pas aux colonnes
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Curseur invalide')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Curseur invalide')
+
+    return [_decode_value(column, value) for column, value in zip(columns, values)]
+
+
+def _decode_value(column, value):
+    """Verifie une valeur du curseur contre le type Python de sa colonne."""
+    if isinstance(column.type, DateTime):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError('Curseur invalide')
+
+    python_type = column.type.python_type
+    # Un float JSON entier (ex. 2.0) est relu comme int
+    accepted = (int, float) if python_type is float else (python_type,)
+    # bool est une sous-classe d'int
+    if isinstance(value, bool) or not isinstance(value, accepted):
+        raise ValueError('Curseur invalide')
+    return value
+
+
+def get_page_args(args):
+    """
+    Lit les parametres ?limit= et ?cursor= de la requete.
+
+    Args:
+        args: request.args
+
+    Returns:
+        tuple: (limit, cursor) ou cursor vaut None pour la premiere page
+
+    Raises:
+        ValueError: Si limit n'est pas un entier positif
+    """
+    default_size = current_app.config['DEFAULT_PAGE_SIZE']
+    max_size = current_app.config['MAX_PAGE_SIZE']
+
+    limit = args.get('limit', default_size)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('Le parametre limit doit etre un entier')
+    if limit < 1:
+        raise ValueError('Le parametre limit doit etre positif')
+
+    return min(limit, max_size), args.get('cursor') or None
+
+
+def paginate(query, columns, limit, cursor=None, descending=False):
+    """
+    Applique une pagination keyset a une requete SQLAlchemy.
+
+    Les colonnes de tri doivent former une cle unique (terminer par l'id)
+    pour que l'ordre soit stable entre deux pages.
+
+    Args:
+        query: Requete de base (filtres deja appliques)
+        columns (list): Colonnes de tri, ex. [Contact.created_at, Contact.id]
+        limit (int): Nombre maximum de lignes a renvoyer
+        cursor (str): Jeton de la page precedente, ou None
+        descending (bool): Tri decroissant (plus recent d'abord)
+
+    Returns:
+        tuple: (lignes, curseur suivant ou None si derniere page)
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple(decode_cursor(cursor, columns))
+        query = query.filter(key < values if descending else key > values)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    # Une ligne de plus que demande pour savoir s'il existe une page suivante
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+    return rows, next_cursor
+
+
+def paginated_response(items, next_cursor):
+    """
+    Construit la reponse JSON d'une page.
+
+    Le corps reste une liste (compatible avec les clients existants) ;
+    le curseur de la page suivante est transmis dans l'en-tete X-Next-Cursor.
+
+    Args:
+        items (list|bytes): Elements serialises de la page, ou corps JSON
+            deja encode (voir utils.snapshot)
+        next_cursor (str): Curseur suivant, ou None
+
+    Returns:
+        Response: Reponse Flask
+    """
+    response = json_response(items) if isinstance(items, bytes) else jsonify(items)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
@@ -0,0 +1,140 @@
+"""
+Profilage SQL : journal des requetes lentes et detection des N+1.
+
+Mode optionnel (SQL_PROFILING=true), branche sur les evenements du moteur
+SQLAlchemy de l'application :
+- une requete SQL plus longue que SLOW_QUERY_MS est journalisee avec son
+  plan d'execution (EXPLAIN QUERY PLAN sous SQLite) ;
+- pendant une requete HTTP, chaque forme de requete SQL (texte avec ses
+  parametres ?, listes IN (...) ramenees a une seule forme) est comptee ;
+  une forme repetee au moins N_PLUS_ONE_THRESHOLD fois est signalee comme
+  N+1 probable (une requete par ligne au lieu d'une requete groupee).
+
+count_queries() est utilisable hors de ce mode, par exemple dans un test
+qui borne le nombre de requetes d'un endpoint.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# IN (?, ?, ?) -> IN (?...) : meme forme quelle que soit la taille de la liste
+IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')
+
+
+def statement_shape(statement):
+    """Forme normalisee d'une requete SQL (espaces et listes IN reduits)."""
+    return IN_LIST.sub('(?...)', ' '.join(statement.split()))
+
+
+def explain(cursor, statement, parameters):
+    """
+    Plan d'execution SQLite d'une requete, sur la connexion DBAPI d'origine.
+
+    Returns:
+        str: Une ligne par etape du plan, ou None si indisponible
+    """
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    try:
+        rows = cursor.connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ()).fetchall()
+    except Exception as e:  # le plan est un bonus : ne jamais casser la requete
+        return f'(plan indisponible: {e})'
+    return '\n'.join(f'  {row[-1]}' for row in rows)
+
+
+class QueryProfiler:
+    """Journal des requetes lentes et detection des N+1 par requete HTTP."""
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = 100
+        self.n_plus_one_threshold = 5
+
+    def init_app(self, app):
+        """Branche le profilage si SQL_PROFILING est vrai."""
+        from extensions import db
+
+        app.extensions['query_profiler'] = self
+        self.enabled = app.config['SQL_PROFILING']
+        if not self.enabled:
+            return
+
+        self.slow_query_ms = app.config['SLOW_QUERY_MS']
+        self.n_plus_one_threshold = app.config['N_PLUS_ONE_THRESHOLD']
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        with app.app_context():
+            self.instrument(db.engine, explain_plans=db.engine.dialect.name == 'sqlite')
+
+    def instrument(self, engine, explain_plans=True):
+        """Chronometre chaque requete SQL et compte les formes par requete HTTP."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('profiling_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - conn.info['profiling_started'].pop()) * 1000
+
+            if has_app_context():
+                shapes = g.get('profiling_shapes')
+                if shapes is not None:
+                    shapes[statement_shape(statement)] += 1
+
+            if elapsed_ms >= self.slow_query_ms:
+                plan = None
+                if explain_plans and not executemany:
+                    plan = explain(cursor, statement, parameters)
+                logger.warning('Requete SQL lente (%.1f ms): %s\nParametres: %.200r%s',
+                               elapsed_ms, ' '.join(statement.split()), parameters,
+                               f'\nPlan:\n{plan}' if plan else '')
+
+    def _before_request(self):
+        g.profiling_shapes = Counter()
+
+    def _after_request(self, response):
+        shapes = g.pop('profiling_shapes', None)
+        if shapes is None:
+            return response
+
+        response.headers['X-Query-Count'] = str(sum(shapes.values()))
+        for shape, count in shapes.items():
+            if count >= self.n_plus_one_threshold:
+                logger.warning('N+1 probable sur %s %s (%s): %s executee %s fois',
+                               request.method, request.path, request.endpoint, shape, count)
+        return response
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Enregistre les requetes SQL executees dans le bloc.
+
+    Exemple (test):
+        with count_queries(db.engine) as queries:
+            client.get('/api/gallery')
+        assert len(queries) <= 2, queries
+
+    Yields:
+        list: Textes des requetes, dans l'ordre d'execution
+    """
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine, 'after_cursor_execute', record)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'after_cursor_execute', record)
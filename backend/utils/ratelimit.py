@@ -0,0 +1,222 @@
+"""
+Limitation de debit par seau a jetons (token bucket).
+
+Chaque route limitee a deux seaux : un par client (adresse IP) et un global.
+Un seau contient au plus `capacite` jetons et se remplit a raison de
+`capacite / periode` jetons par seconde ; chaque requete consomme un jeton.
+Une requete refusee ne coute qu'une lecture/ecriture de seau, avant tout
+acces a la base de l'application, et repond 429 avec Retry-After.
+
+Deux stockages :
+- memoire (defaut) : LRU borne, les clients les moins recents sont oublies
+  (un seau oublie est un seau plein). Propre a chaque processus.
+- fichier SQLite dedie (RATELIMIT_STORAGE_URL=sqlite:///chemin) : partage
+  entre les workers, sans concurrencer l'ecrivain de la base principale.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(rate):
+    """
+    Lit une limite de la forme '5/minute'.
+
+    Returns:
+        tuple: (capacite, jetons par seconde)
+
+    Raises:
+        ValueError: Si la limite est mal formee
+    """
+    try:
+        count, period = rate.split('/')
+        count = int(count)
+        seconds = PERIODS[period.strip()]
+    except (AttributeError, KeyError, ValueError):
+        raise ValueError(f'Limite invalide: {rate!r} (attendu ex: 5/minute)')
+    if count < 1:
+        raise ValueError(f'Limite invalide: {rate!r}')
+    return count, count / seconds
+
+
+def consume(state, capacity, refill_rate, now):
+    """
+    Retire un jeton d'un seau.
+
+    Args:
+        state (tuple): (jetons, date de mise a jour) ou None pour un seau plein
+        capacity (int): Nombre maximum de jetons
+        refill_rate (float): Jetons ajoutes par seconde
+        now (float): Date courante en secondes
+
+    Returns:
+        tuple: (accepte, jetons restants, secondes avant le prochain jeton)
+    """
+    if state is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, state[0] + (now - state[1]) * refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / refill_rate
+
+
+class MemoryStorage:
+    """Seaux en memoire, dans un LRU de taille bornee."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            allowed, tokens, retry_after = consume(self._buckets.get(key), capacity, refill_rate, now)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteStorage:
+    """
+    Seaux dans un fichier SQLite partage entre processus.
+
+    Une transaction IMMEDIATE par requete limitee ; les seaux redevenus
+    pleins sont purges regulierement, ce qui borne la taille de la table.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated_at REAL NOT NULL, full_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_buckets_full_at ON buckets (full_at)')
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, refill_rate):
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state = connection.execute(
+                'SELECT tokens, updated_at FROM buckets WHERE key = ?', (key,)
+            ).fetchone()
+            allowed, tokens, retry_after = consume(state, capacity, refill_rate, now)
+            connection.execute(
+                'INSERT INTO buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated_at = excluded.updated_at, full_at = excluded.full_at',
+                (key, tokens, now, now + (capacity - tokens) / refill_rate),
+            )
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                connection.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+def create_storage(url, max_entries):
+    """
+    Cree le stockage des seaux a partir de RATELIMIT_STORAGE_URL.
+
+    Args:
+        url (str): 'memory://' ou 'sqlite:///chemin/du/fichier.db'
+        max_entries (int): Nombre maximum de clients suivis en memoire
+    """
+    if url.startswith('sqlite:///'):
+        return SQLiteStorage(url[len('sqlite:///'):])
+    if url == 'memory://':
+        return MemoryStorage(max_entries)
+    raise ValueError(f'Stockage de limitation inconnu: {url}')
+
+
+class RateLimiter:
+    """Limites par route, lues dans Config.RATELIMITS."""
+
+    def __init__(self):
+        self.enabled = True
+        self.storage = MemoryStorage()
+        self._limits = {}
+
+    def init_app(self, app):
+        """Lit la configuration et cree le stockage des seaux."""
+        self.enabled = app.config['RATELIMIT_ENABLED']
+        self.storage = create_storage(
+            app.config['RATELIMIT_STORAGE_URL'], app.config['RATELIMIT_MAX_CLIENTS']
+        )
+        self._limits = {
+            name: {scope: parse_rate(rate) for scope, rate in limits.items() if rate}
+            for name, limits in app.config['RATELIMITS'].items()
+        }
+        app.extensions['rate_limiter'] = self
+
+    def check(self, name, client):
+        """
+        Consomme un jeton des seaux client puis global d'une route.
+
+        Returns:
+            float: 0 si la requete est acceptee, sinon secondes a attendre
+        """
+        limits = self._limits.get(name, {})
+        for scope, key in (('client', f'{name}:{client}'), ('global', name)):
+            if scope in limits:
+                allowed, retry_after = self.storage.take(key, *limits[scope])
+                if not allowed:
+                    return retry_after
+        return 0
+
+    def limit(self, name):
+        """
+        Decorateur limitant une vue selon Config.RATELIMITS[name].
+
+        Args:
+            name (str): Nom de la limite (ex: 'contact')
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled:
+                    retry_after = self.check(name, request.remote_addr or 'unknown')
+                    if retry_after:
+                        logger.debug('Limite %s atteinte pour %s', name, request.remote_addr)
+                        response = jsonify({'error': 'Trop de requetes, reessayez plus tard'})
+                        response.headers['Retry-After'] = str(math.ceil(retry_after))
+                        return response, 429
+                return view(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
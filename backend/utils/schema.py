@@ -0,0 +1,107 @@
+"""
+Mise a niveau legere du schema SQLite.
+
+db.create_all() ne cree que les tables absentes : les colonnes et index
+ajoutes aux modeles apres coup n'apparaissent pas dans une base existante.
+Ce module complete le schema de facon idempotente (colonnes nullables,
+index et passage en AUTOINCREMENT, sans perte de donnees).
+"""
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.schema import CreateTable
+
+# Tables dont les ids sont conserves par une autre table (archive) : la
+# sequence AUTOINCREMENT repart au-dela des ids des deux tables
+ID_KEEPERS = {'contacts': ('contacts_archive',)}
+
+
+def upgrade_schema(db):
+    """
+    Ajoute les colonnes et index manquants aux tables existantes, et
+    recree en AUTOINCREMENT les tables SQLite qui doivent l'etre.
+
+    A appeler dans un contexte d'application, apres db.create_all().
+
+    Args:
+        db: Instance SQLAlchemy de l'application
+
+    Returns:
+        list: Descriptions des modifications appliquees
+    """
+    engine = db.engine
+    changes = []
+
+    with engine.begin() as conn:
+        # Inspection sur la meme connexion : la transaction de mise a niveau
+        # n'est pas annulee par le retour au pool d'une autre connexion
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+                columns.add(column.name)
+                changes.append(f'{table.name}.{column.name}')
+
+            if engine.dialect.name == 'sqlite' and needs_autoincrement(conn, table):
+                # Index recrees avec la table
+                rebuild_with_autoincrement(conn, table, columns)
+                changes.append(f'{table.name} AUTOINCREMENT')
+                continue
+
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    changes.append(index.name)
+
+    return changes
+
+
+def needs_autoincrement(conn, table):
+    """True si le modele demande AUTOINCREMENT et que la table SQLite ne l'a pas."""
+    if not table.dialect_options['sqlite']['autoincrement']:
+        return False
+    sql = conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+    ).scalar()
+    return 'AUTOINCREMENT' not in sql.upper()
+
+
+def rebuild_with_autoincrement(conn, table, columns):
+    """
+    Recree une table SQLite en AUTOINCREMENT, avec ses lignes et ses index.
+
+    SQLite ne modifie pas une cle primaire existante : nouvelle table, copie,
+    suppression de l'ancienne puis renommage. Les triggers disparaissent
+    avec l'ancienne table (ceux de contacts sont recrees par
+    ensure_contact_search, appele ensuite par init_db).
+
+    Args:
+        conn: Connexion de la transaction de mise a niveau
+        table (Table): Table du modele
+        columns (set): Colonnes presentes dans la table existante
+    """
+    rebuilt = table.to_metadata(MetaData(), name=f'{table.name}_rebuild')
+    conn.execute(CreateTable(rebuilt))
+    copied = ', '.join(f'"{column.name}"' for column in table.columns if column.name in columns)
+    conn.exec_driver_sql(f'INSERT INTO "{rebuilt.name}" ({copied}) SELECT {copied} FROM "{table.name}"')
+    conn.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{rebuilt.name}" RENAME TO "{table.name}"')
+    for index in table.indexes:
+        index.create(conn)
+
+    # Premier id attribue : au-dela de tous ceux deja utilises, archives compris
+    last_id = max(
+        conn.exec_driver_sql(f'SELECT COALESCE(MAX(id), 0) FROM "{name}"').scalar()
+        for name in (table.name,) + ID_KEEPERS.get(table.name, ())
+    )
+    conn.exec_driver_sql('DELETE FROM sqlite_sequence WHERE name = ?', (table.name,))
+    conn.exec_driver_sql('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table.name, last_id))
@@ -0,0 +1,142 @@
+"""
+Recherche plein texte dans les messages de contact (SQLite FTS5).
+
+L'index contacts_fts est une table FTS5 a contenu externe : il ne stocke
+que l'index inverse, le texte reste dans contacts. Des triggers le tiennent
+a jour a chaque INSERT, UPDATE (nom, email, message) et DELETE, y compris
+pour les operations groupees faites sans l'ORM.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import Float, Integer, column, table, text, tuple_
+
+from extensions import db
+from models.contact import Contact
+from utils.pagination import decode_cursor, encode_cursor
+
+contacts_fts = table('contacts_fts', column('rowid', Integer), column('rank', Float))
+
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        name, email, message,
+        content='contacts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, name, email, message)
+        VALUES (new.id, new.name, new.email, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, message)
+        VALUES ('delete', old.id, old.name, old.email, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE OF name, email, message ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, message)
+        VALUES ('delete', old.id, old.name, old.email, old.message);
+        INSERT INTO contacts_fts(rowid, name, email, message)
+        VALUES (new.id, new.name, new.email, new.message);
+    END
+    """,
+]
+
+
+def ensure_contact_search():
+    """
+    Cree l'index FTS5 et ses triggers s'ils n'existent pas (SQLite uniquement).
+
+    A la creation, l'index est construit a partir des messages existants.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'"
+        )).first()
+        for statement in FTS_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')"))
+
+
+@contextmanager
+def bulk_contact_load():
+    """
+    Suspend l'indexation ligne a ligne pendant un chargement massif.
+
+    Le trigger d'insertion est retire pendant le bloc, puis l'index est
+    reconstruit en une passe : bien plus rapide que des millions de
+    declenchements. Les suppressions et mises a jour restent indexees.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        yield
+        return
+
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP TRIGGER IF EXISTS contacts_fts_ai'))
+    try:
+        yield
+    finally:
+        ensure_contact_search()
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')"))
+
+
+def match_expression(q):
+    """
+    Transforme une saisie libre en requete FTS5 sure.
+
+    Chaque mot devient un prefixe entre guillemets ("mar"*), tous les mots
+    sont requis : la syntaxe FTS5 (NEAR, OR, guillemets...) n'est pas exposee.
+
+    Raises:
+        ValueError: Si la saisie ne contient aucun mot
+    """
+    words = re.findall(r'\w+', q)
+    if not words:
+        raise ValueError('La recherche doit contenir au moins un mot')
+    return ' '.join(f'"{word}"*' for word in words[:16])
+
+
+def search_contacts(query, q, limit, cursor=None):
+    """
+    Recherche des messages, du plus pertinent au moins pertinent (bm25).
+
+    Args:
+        query: Requete Contact de base (filtre de statut eventuel)
+        q (str): Texte recherche
+        limit (int): Nombre maximum de resultats
+        cursor (str): Curseur de la page precedente, ou None
+
+    Returns:
+        tuple: (messages, curseur suivant ou None)
+
+    Raises:
+        ValueError: Si la recherche ou le curseur est invalide
+    """
+    key = [contacts_fts.c.rank, Contact.id]
+    query = query.add_columns(contacts_fts.c.rank) \
+        .join(contacts_fts, contacts_fts.c.rowid == Contact.id) \
+        .filter(text('contacts_fts MATCH :match')) \
+        .params(match=match_expression(q))
+
+    if cursor:
+        query = query.filter(tuple_(*key) > tuple(decode_cursor(cursor, key)))
+
+    rows = query.order_by(*key).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        contact, rank = rows[-1]
+        next_cursor = encode_cursor([rank, contact.id])
+
+    return [contact for contact, _ in rows], next_cursor
@@ -0,0 +1,199 @@
+"""
+Donnees de demonstration et jeux de donnees synthetiques reproductibles.
+
+seed_demo() insere le petit catalogue de demonstration (5 prestations,
+8 images). seed_synthetic() genere des volumes arbitraires (ex. 100k
+prestations, 1M images, 5M messages) a partir d'une graine : deux appels
+avec la meme graine sur une base vide produisent exactement les memes
+lignes, ce qui rend les mesures de benchmark comparables.
+
+Les lignes sont inserees par lots (executemany, un commit par lot), puis les
+compteurs de statistiques sont recalcules. Chaque lot du catalogue incremente
+la version partagee de sa table : les workers en service ne gardent pas un
+catalogue perime. L'index plein texte des messages
+est reconstruit une seule fois apres le chargement.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from extensions import catalog_cache, db
+from models.contact import Contact
+from models.gallery import Gallery
+from models.service import Service
+from utils.fingerprint import contact_fingerprint
+from utils.search import bulk_contact_load
+from utils.stats import rebuild_counters
+
+DEMO_SERVICES = [
+    ('Manucure classique', 'Limage, cuticules et pose de vernis traditionnel', 25.0, 45),
+    ('Pose de gel', 'Vernis gel semi-permanent, tenue 3 semaines', 35.0, 60),
+    ('French manucure', 'French classique ou revisitee', 30.0, 50),
+    ('Extensions en gel', 'Allongement au chablon et finition au choix', 55.0, 90),
+    ('Soin des mains', 'Gommage, masque hydratant et massage', 20.0, 30),
+]
+
+DEMO_GALLERY = [
+    ('Nail art floral', 'nail-art', True),
+    ('French blanche', 'french', True),
+    ('Gel rouge', 'gel', True),
+    ('Extensions nude', 'extension', False),
+    ('Baby boomer', 'french', False),
+    ('Degrade pastel', 'nail-art', False),
+    ('Gel paillete', 'gel', False),
+    ('Soin paraffine', 'soin', False),
+]
+
+# Vocabulaire des textes synthetiques (accents compris, pour la recherche)
+WORDS = ('ongle vernis gel french manucure pose soin main rendez-vous tarif couleur nude rouge '
+         'paillettes degrade extension capsule limage cuticules semaine disponible samedi '
+         'matin apres-midi mariage cadeau bon prix durée réservation été hiver').split()
+FIRST_NAMES = ('Marie', 'Julie', 'Camille', 'Lea', 'Sarah', 'Chloe', 'Emma', 'Ines', 'Manon', 'Zoe')
+LAST_NAMES = ('Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand')
+
+# Horodatages synthetiques : deux ans a partir de cette date
+EPOCH = datetime(2024, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+# Tables servies par le cache de lecture (version partagee a incrementer)
+CACHED_TABLES = ('services', 'gallery')
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _timestamp(rng):
+    return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+
+def service_rows(rng, count):
+    """Prestations synthetiques."""
+    for i in range(count):
+        created_at = _timestamp(rng)
+        yield {
+            'name': f'{_sentence(rng, 1, 3).capitalize()} {i}',
+            'description': _sentence(rng, 5, 20),
+            'price': round(rng.uniform(10, 120), 2),
+            'duration': rng.choice((15, 30, 45, 60, 90, 120)),
+            'image_url': f'/uploads/services/service-{i}.jpg',
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def gallery_rows(rng, count):
+    """Images synthetiques."""
+    for i in range(count):
+        created_at = _timestamp(rng)
+        yield {
+            'title': f'{_sentence(rng, 1, 3).capitalize()} {i}',
+            'image_url': f'/uploads/gallery/image-{i}.jpg',
+            'category': rng.choice(Gallery.CATEGORIES + [None]),
+            'is_featured': rng.random() < 0.05,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def contact_rows(rng, count):
+    """Messages de contact synthetiques (avec empreinte, comme via l'API)."""
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f'{first.lower()}.{last.lower()}{i}@example.com'
+        message = _sentence(rng, 8, 60)
+        yield {
+            'name': f'{first} {last}',
+            'email': email,
+            'phone': f'06{rng.randrange(10 ** 8):08d}' if rng.random() < 0.6 else None,
+            'message': message,
+            'status': rng.choices(Contact.STATUSES, weights=(6, 3, 1))[0],
+            'created_at': _timestamp(rng),
+            'fingerprint': contact_fingerprint(email, message),
+        }
+
+
+def _insert(model, rows, batch_size, progress=None):
+    """Insere des lignes par lots ; retourne le nombre de lignes inserees."""
+    # INSERT Core sur la table : l'insert ORM regroupe les lignes selon leurs
+    # valeurs NULL et multiplie les requetes
+    statement = insert(model.__table__)
+    table = model.__tablename__
+    total = 0
+    batch = []
+
+    def flush():
+        db.session.execute(statement, batch)
+        if table in CACHED_TABLES:
+            catalog_cache.bump(table)
+        db.session.commit()
+        if progress:
+            progress(table, total + len(batch))
+        return len(batch)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += flush()
+            batch = []
+    if batch:
+        total += flush()
+    return total
+
+
+def seed_demo():
+    """
+    Insere le catalogue de demonstration (contexte d'application requis).
+
+    Returns:
+        dict: Nombre de lignes inserees par table
+    """
+    db.session.add_all(
+        Service(name=name, description=description, price=price, duration=duration)
+        for name, description, price, duration in DEMO_SERVICES
+    )
+    db.session.add_all(
+        Gallery(title=title, category=category, is_featured=is_featured,
+                image_url=f"/uploads/gallery/{title.lower().replace(' ', '-')}.jpg")
+        for title, category, is_featured in DEMO_GALLERY
+    )
+    db.session.flush()
+    rebuild_counters()
+    for table in CACHED_TABLES:
+        catalog_cache.bump(table)
+    db.session.commit()
+    return {'services': len(DEMO_SERVICES), 'gallery': len(DEMO_GALLERY), 'contacts': 0}
+
+
+def seed_synthetic(services=0, gallery=0, contacts=0, seed=42, batch_size=5000, progress=None):
+    """
+    Genere un jeu de donnees synthetique reproductible.
+
+    Args:
+        services (int): Nombre de prestations
+        gallery (int): Nombre d'images
+        contacts (int): Nombre de messages
+        seed (int): Graine du generateur (memes donnees pour une meme graine)
+        batch_size (int): Lignes par INSERT / commit
+        progress (callable): Appele avec (table, lignes inserees) apres chaque lot
+
+    Returns:
+        dict: Nombre de lignes inserees par table
+    """
+    # Un generateur par table : ajouter des images ne change pas les messages
+    counts = {
+        'services': _insert(Service, service_rows(random.Random(f'{seed}-services'), services),
+                            batch_size, progress),
+        'gallery': _insert(Gallery, gallery_rows(random.Random(f'{seed}-gallery'), gallery),
+                           batch_size, progress),
+    }
+    if contacts:
+        with bulk_contact_load():
+            counts['contacts'] = _insert(Contact, contact_rows(random.Random(f'{seed}-contacts'), contacts),
+                                         batch_size, progress)
+    else:
+        counts['contacts'] = 0
+    rebuild_counters()
+    db.session.commit()
+    return counts
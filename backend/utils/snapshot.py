@@ -0,0 +1,48 @@
+"""
+Snapshots JSON pre-encodes pour les listes du catalogue.
+
+Le cache de lecture stocke directement les octets JSON de la reponse :
+ils sont encodes une seule fois par version de table, puis transmis tels
+quels a chaque requete, sans to_dict() ni nouvel encodage. Leurs variantes
+compressees (utils.compression) sont gardees avec eux et disparaissent avec
+l'entree du cache.
+"""
+from flask import Response, current_app
+
+
+class Snapshot(bytes):
+    """Corps JSON encode, avec ses variantes compressees ({encodage: octets})."""
+
+    def __init__(self, *args):
+        self.variants = {}
+
+
+def encode_json(data):
+    """
+    Encode des donnees en JSON, avec les memes reglages que jsonify.
+
+    Args:
+        data: Donnees serialisables (liste de dicts, dict...)
+
+    Returns:
+        Snapshot: Corps JSON immuable, partageable entre requetes
+    """
+    return Snapshot((current_app.json.dumps(data) + '\n').encode('utf-8'))
+
+
+def json_response(body, status=200):
+    """
+    Construit une reponse a partir d'un corps JSON deja encode.
+
+    Args:
+        body (bytes): Corps produit par encode_json
+        status (int): Code HTTP
+
+    Returns:
+        Response: Reponse Flask application/json
+    """
+    response = Response(body, status=status, mimetype='application/json')
+    if isinstance(body, Snapshot):
+        # Reutilise par la compression pour servir les variantes deja calculees
+        response.snapshot = body
+    return response
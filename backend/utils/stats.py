@@ -0,0 +1,192 @@
+"""
+Compteurs de statistiques maintenus de facon incrementale.
+
+Chaque ecriture sur contacts, gallery ou services ajuste les compteurs
+concernes dans la table stat_counters, dans la meme transaction. La lecture
+des statistiques ne parcourt donc jamais les tables : son cout ne depend
+que du nombre de compteurs.
+"""
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.archive import ArchivedContact
+from models.contact import Contact
+from models.counter import StatCounter
+from models.gallery import Gallery
+from models.service import Service
+
+# Table -> (modele, colonnes ventilees)
+COUNTED = {
+    'contacts': (Contact, ('status',)),
+    'contacts_archive': (ArchivedContact, ('status',)),
+    'gallery': (Gallery, ('category', 'is_featured')),
+    'services': (Service, ()),
+}
+
+
+def _label(value):
+    """Representation d'une valeur dans le nom d'un compteur."""
+    if value is None:
+        return 'none'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def counter_names(table, values):
+    """
+    Noms des compteurs auxquels contribue une ligne.
+
+    Args:
+        table (str): Nom de la table
+        values (dict): Valeurs des colonnes ventilees
+
+    Returns:
+        list: ex. ['contacts.total', 'contacts.status.new']
+    """
+    names = [f'{table}.total']
+    for column in COUNTED[table][1]:
+        names.append(f'{table}.{column}.{_label(values.get(column))}')
+    return names
+
+
+def row_values(table, row):
+    """Extrait les colonnes ventilees d'un objet ou d'une ligne."""
+    return {column: getattr(row, column) for column in COUNTED[table][1]}
+
+
+def increment(deltas):
+    """
+    Ajoute des deltas aux compteurs (upsert groupe, sans commit).
+
+    Args:
+        deltas (dict): {nom du compteur: delta}
+    """
+    rows = [{'name': name, 'value': delta} for name, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    statement = insert(StatCounter)
+    statement = statement.on_conflict_do_update(
+        index_elements=[StatCounter.name],
+        set_={'value': StatCounter.value + statement.excluded.value},
+    )
+    db.session.execute(statement, rows)
+
+
+def record_change(table, old=None, new=None):
+    """
+    Enregistre la creation, la modification ou la suppression d'une ligne.
+
+    Args:
+        table (str): Nom de la table
+        old (dict): Valeurs avant l'ecriture (None pour une creation)
+        new (dict): Valeurs apres l'ecriture (None pour une suppression)
+    """
+    deltas = Counter()
+    if old is not None:
+        deltas.subtract(counter_names(table, old))
+    if new is not None:
+        deltas.update(counter_names(table, new))
+    increment(deltas)
+
+
+def record_batch(table, creates, updates, deletes):
+    """
+    Enregistre un lot (voir utils.batch) avant son application.
+
+    Lit les valeurs actuelles des lignes modifiees ou supprimees (colonnes
+    ventilees uniquement) pour calculer les deltas. Les mises a jour sont
+    appliquees dans l'ordre a un etat courant, puis les suppressions : une
+    meme ligne ciblee plusieurs fois n'est comptee qu'avec son dernier etat.
+
+    Args:
+        table (str): Nom de la table
+        creates (list): Colonnes des lignes a creer
+        updates (list): Colonnes a modifier, avec la cle 'id'
+        deletes (list): Ids a supprimer
+    """
+    model, columns = COUNTED[table]
+    deleted = set(deletes)
+
+    current = {}
+    ids = deleted | {values['id'] for values in updates}
+    if ids:
+        statement = select(model.id, *[getattr(model, column) for column in columns])
+        for row in db.session.execute(statement.where(model.id.in_(ids))):
+            current[row.id] = row_values(table, row)
+
+    deltas = Counter()
+    for values in creates:
+        deltas.update(counter_names(table, values))
+    for values in updates:
+        old = current[values['id']]
+        new = dict(old, **{column: values[column] for column in columns if column in values})
+        deltas.subtract(counter_names(table, old))
+        deltas.update(counter_names(table, new))
+        current[values['id']] = new
+    for id in deleted:
+        deltas.subtract(counter_names(table, current[id]))
+    increment(deltas)
+
+
+def rebuild_counters():
+    """
+    Recalcule tous les compteurs a partir des tables (COUNT / GROUP BY).
+
+    A utiliser a l'initialisation ou apres un chargement hors API.
+    Sans commit.
+    """
+    deltas = Counter()
+    for table, (model, columns) in COUNTED.items():
+        deltas[f'{table}.total'] = db.session.scalar(select(func.count(model.id)))
+        for column in columns:
+            attribute = getattr(model, column)
+            for value, count in db.session.execute(
+                select(attribute, func.count(model.id)).group_by(attribute)
+            ):
+                deltas[f'{table}.{column}.{_label(value)}'] = count
+
+    db.session.query(StatCounter).delete()
+    increment(deltas)
+
+
+def ensure_counters():
+    """Initialise les compteurs s'ils n'ont jamais ete calcules."""
+    if db.session.scalar(select(func.count()).select_from(StatCounter)) == 0:
+        rebuild_counters()
+        db.session.commit()
+
+
+def get_stats():
+    """
+    Retourne les statistiques sous forme imbriquee.
+
+    Returns:
+        dict: ex. {'contacts': {'total': 12, 'status': {'new': 3, ...}}, ...}
+    """
+    stats = {
+        'contacts': {'total': 0, 'status': {status: 0 for status in Contact.STATUSES}},
+        'contacts_archive': {'total': 0, 'status': {status: 0 for status in Contact.STATUSES}},
+        'gallery': {
+            'total': 0,
+            'category': dict({category: 0 for category in Gallery.CATEGORIES}, none=0),
+            'is_featured': {'true': 0, 'false': 0},
+        },
+        'services': {'total': 0},
+    }
+
+    for name, value in db.session.execute(select(StatCounter.name, StatCounter.value)):
+        parts = name.split('.', 2)
+        if len(parts) == 2:
+            stats.setdefault(parts[0], {})[parts[1]] = value
+        else:
+            stats.setdefault(parts[0], {}).setdefault(parts[1], {})[parts[2]] = value
+    return stats
@@ -0,0 +1,339 @@
+"""
+Index de prefixes en memoire pour l'autocompletion du catalogue.
+
+Les termes (mots du nom d'un service ou du titre d'une image, nom complet,
+mots de la description d'un service) sont normalises sans accents ni
+majuscules et conserves dans une liste triee. Une recherche par prefixe est
+une recherche dichotomique suivie d'un parcours de la plage correspondante :
+aucune requete SQL n'est faite a la frappe.
+
+Les prefixes courts correspondent a beaucoup de termes : les resultats sont
+memorises par (prefixe, limite) jusqu'a la prochaine ecriture, si bien que les
+saisies frequentes ne parcourent la plage qu'une fois.
+
+L'index est propre a chaque processus et construit a la premiere recherche
+(jamais au demarrage : ni les commandes `flask` ni les workers qui ne servent
+pas l'autocompletion ne lisent le catalogue). Il est tenu a jour par les vues
+d'ecriture du processus et retient les versions partagees des tables
+(utils.versions) qu'il reflete : les ecritures d'un autre worker ou d'une
+commande `flask` sont rattrapees a la recherche suivante en relisant les
+seules lignes modifiees, d'apres le journal des versions. Quand le journal
+ne couvre pas l'ecart (chargement en masse, ecart trop ancien), l'index est
+reconstruit dans un thread et les recherches continuent sur l'index courant.
+"""
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Table -> (champ affiche, champ de mots-cles ou None)
+SOURCES = {
+    'services': ('name', 'description'),
+    'gallery': ('title', None),
+}
+
+# Poids des termes : un mot du nom passe avant un mot de la description
+LABEL, KEYWORD = 0, 1
+
+# Nombre maximum de resultats memorises
+MAX_MEMOIZED = 4096
+
+# Au-dela de ce nombre de lignes a rattraper, l'index est reconstruit
+MAX_CATCH_UP = 5000
+
+# En dessous, les termes sont inseres un a un ; au-dela, la liste est retriee
+MAX_INSORT = 16
+
+
+def normalize(text):
+    """Minuscules, sans accents : 'Épilation' -> 'epilation'."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def words(text):
+    """Mots normalises d'un texte."""
+    return re.findall(r'\w+', normalize(text))
+
+
+def document_terms(label, keywords=None):
+    """
+    Termes indexes pour un element.
+
+    Args:
+        label (str): Nom affiche
+        keywords (str): Texte libre dont les mots sont aussi indexes
+
+    Returns:
+        dict: {terme: poids}
+    """
+    label_words = words(label)
+    terms = {word: LABEL for word in label_words}
+    # Le nom complet permet de completer une saisie de plusieurs mots
+    terms[' '.join(label_words)] = LABEL
+    for word in words(keywords):
+        if len(word) >= 3:
+            terms.setdefault(word, KEYWORD)
+    terms.pop('', None)
+    return terms
+
+
+class SuggestIndex:
+    """Index de prefixes trie, mis a jour element par element."""
+
+    def __init__(self):
+        self._terms = []  # (terme, table, id, poids), trie
+        self._documents = {}  # (table, id) -> (nom affiche, {terme: poids})
+        self._results = {}  # (prefixe, limite) -> suggestions
+        self._versions = None  # {table: version} refletees, None avant construction
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # une seule mise a jour depuis la base a la fois
+        self._rebuilder = None  # thread de reconstruction en cours
+
+    def init_app(self, app):
+        """
+        Enregistre l'index dans l'application, sans lire la base.
+
+        L'index est construit a la premiere recherche (voir refresh).
+        """
+        app.extensions['suggest_index'] = self
+        with self._lock:
+            self._terms, self._documents, self._results, self._versions = [], {}, {}, None
+
+    def refresh(self):
+        """
+        Met l'index a jour d'apres les versions partagees des tables.
+
+        La premiere fois, construit l'index. Ensuite, applique les lignes
+        modifiees par les autres processus depuis les versions refletees, ou
+        lance une reconstruction en arriere-plan si le journal des versions
+        ne suffit pas (contexte d'application requis).
+
+        Returns:
+            bool: True si l'index a ete modifie
+        """
+        versions = self._shared_versions()
+        if self._versions is not None and not self._stale(versions):
+            return False
+        if self._rebuilder is not None and self._rebuilder.is_alive():
+            return False
+
+        with self._build_lock:
+            if self._versions is None:
+                self._build()
+                return True
+            changed = False
+            for table in SOURCES:
+                if self._versions[table] == versions[table]:
+                    continue
+                caught_up = self._catch_up(table)
+                if caught_up is None:
+                    self._rebuild_in_background(current_app._get_current_object())
+                    return changed
+                changed = changed or caught_up
+        return changed
+
+    def put(self, table, data, version=None):
+        """
+        Ajoute ou remplace un element apres une ecriture.
+
+        L'element n'est applique que si l'index reflete la version precedant
+        l'ecriture (ou deja celle-ci) : sinon une autre ecriture est
+        intervenue et la recherche suivante la rattrapera.
+
+        Args:
+            table (str): 'services' ou 'gallery'
+            data (dict): Element serialise (to_dict)
+            version (int): Version de la table creee par l'ecriture
+                (retour de catalog_cache.bump)
+        """
+        label, keywords = SOURCES[table]
+        with self._lock:
+            if not self._advance(table, version):
+                return
+            self._remove(table, data['id'])
+            self._put(table, data['id'], data[label], data.get(keywords) if keywords else None, sort=True)
+
+    def remove(self, table, id, version=None):
+        """Retire un element de l'index (memes conditions que put)."""
+        with self._lock:
+            if self._advance(table, version):
+                self._remove(table, id)
+
+    def suggest(self, prefix, limit=10):
+        """
+        Retourne les meilleurs elements dont un terme commence par prefix.
+
+        Tri : mots du nom avant mots de la description, puis terme exact
+        avant terme plus long, puis nom le plus court.
+
+        Args:
+            prefix (str): Saisie de l'utilisateur
+            limit (int): Nombre maximum de suggestions
+
+        Returns:
+            list: [{'type': table, 'id': ..., 'label': ...}, ...]
+        """
+        prefix = ' '.join(words(prefix))
+        if not prefix:
+            return []
+        self.refresh()
+
+        best = {}
+        with self._lock:
+            results = self._results.get((prefix, limit))
+            if results is not None:
+                return results
+            for index in range(bisect_left(self._terms, (prefix,)), len(self._terms)):
+                term, table, id, weight = self._terms[index]
+                if not term.startswith(prefix):
+                    break
+                label = self._documents[(table, id)][0]
+                score = (weight, len(term) - len(prefix), len(label), label)
+                key = (table, id)
+                if key not in best or score < best[key]:
+                    best[key] = score
+
+            top = heapq.nsmallest(limit, best.items(), key=lambda item: item[1])
+            results = [{'type': table, 'id': id, 'label': score[3]} for (table, id), score in top]
+            if len(self._results) >= MAX_MEMOIZED:
+                self._results.clear()
+            self._results[(prefix, limit)] = results
+        return results
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _catch_up(self, table):
+        """
+        Applique les lignes modifiees depuis la version refletee d'une table.
+
+        Returns:
+            bool: True si l'index a ete modifie, None si le journal ne couvre
+            pas l'ecart (reconstruction necessaire)
+        """
+        from utils.versions import table_changes
+
+        since = self._versions[table]
+        changes = table_changes(table, since)
+        if not changes or list(changes) != list(range(since + 1, since + 1 + len(changes))):
+            return None
+        if any(ids is None for ids in changes.values()):
+            return None
+        ids = set().union(*changes.values())
+        if len(ids) > MAX_CATCH_UP:
+            return None
+
+        rows = self._rows(table, ids) if ids else []
+        with self._lock:
+            self._apply(table, ids, rows)
+            self._versions[table] = max(self._versions[table], max(changes))
+        return bool(ids)
+
+    def _rebuild_in_background(self, app):
+        # Appele sous self._build_lock
+        def run():
+            with app.app_context():
+                try:
+                    self._build()
+                except SQLAlchemyError:
+                    logger.exception("Reconstruction de l'index d'autocompletion")
+
+        self._rebuilder = threading.Thread(target=run, name='suggest-rebuild', daemon=True)
+        self._rebuilder.start()
+
+    @staticmethod
+    def _rows(table, ids=None):
+        """Colonnes indexees des lignes d'une table : (id, nom, mots-cles)."""
+        from models.gallery import Gallery
+        from models.service import Service
+
+        model = {'services': Service, 'gallery': Gallery}[table]
+        label, keywords = SOURCES[table]
+        columns = [model.id, getattr(model, label)]
+        if keywords:
+            columns.append(getattr(model, keywords))
+        query = model.query.with_entities(*columns)
+        if ids is not None:
+            query = query.filter(model.id.in_(ids))
+        return [(row[0], row[1], row[2] if keywords else None) for row in query]
+
+    def _apply(self, table, ids, rows):
+        # Appele sous self._lock
+        if len(ids) <= MAX_INSORT:
+            for id in ids:
+                self._remove(table, id)
+            for row in rows:
+                self._put(table, *row, sort=True)
+            return
+
+        keys = {(table, id) for id in ids}
+        for key in keys:
+            self._documents.pop(key, None)
+        self._terms = [entry for entry in self._terms if (entry[1], entry[2]) not in keys]
+        for row in rows:
+            self._put(table, *row)
+        self._terms.sort()
+        self._results.clear()
+
+    def _build(self):
+        # Versions lues avant les lignes : l'index construit est au moins
+        # aussi recent qu'elles, jamais plus ancien
+        versions = self._shared_versions()
+        index = SuggestIndex()
+        for table in SOURCES:
+            for row in self._rows(table):
+                index._put(table, *row)
+        index._terms.sort()
+
+        with self._lock:
+            self._terms = index._terms
+            self._documents = index._documents
+            self._results = {}
+            self._versions = versions
+
+    @staticmethod
+    def _shared_versions():
+        from utils.versions import table_version
+
+        return {table: table_version(table)[0] for table in SOURCES}
+
+    def _stale(self, versions):
+        return any(self._versions[table] != version for table, version in versions.items())
+
+    def _advance(self, table, version):
+        # Appele sous self._lock
+        if self._versions is None or version is None:
+            return False
+        if self._versions[table] == version - 1:
+            self._versions[table] = version
+        return self._versions[table] == version
+
+    def _put(self, table, id, label, keywords, sort=False):
+        self._results.clear()
+        terms = document_terms(label, keywords)
+        self._documents[(table, id)] = (label, terms)
+        for term, weight in terms.items():
+            entry = (term, table, id, weight)
+            if sort:
+                insort(self._terms, entry)
+            else:
+                self._terms.append(entry)
+
+    def _remove(self, table, id):
+        document = self._documents.pop((table, id), None)
+        if document is None:
+            return
+        self._results.clear()
+        for term, weight in document[1].items():
+            entry = (term, table, id, weight)
+            index = bisect_left(self._terms, entry)
+            if index < len(self._terms) and self._terms[index] == entry:
+                del self._terms[index]
@@ -0,0 +1,213 @@
+"""
+Export et import en flux des messages de contact (NDJSON et CSV).
+
+L'export lit la table par tranches cote serveur (yield_per) et produit le
+fichier tranche par tranche : la memoire reste constante quel que soit le
+nombre de messages. L'import lit le fichier ligne a ligne et insere par lots
+(executemany, un commit par lot), en ajustant les compteurs de statistiques
+dans la meme transaction que chaque lot.
+
+En CSV, une cellule commencant par =, +, -, @ est prefixee d'une apostrophe
+pour qu'un tableur ne l'interprete pas comme une formule ; l'import retire
+ce prefixe.
+"""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+from extensions import db
+from models.contact import Contact
+from utils.fingerprint import contact_fingerprint
+from utils.stats import counter_names, increment
+
+EXPORT_COLUMNS = ('id', 'name', 'email', 'phone', 'message', 'status', 'created_at')
+
+# Format -> type MIME, sans parametre : Flask ajoute lui-meme
+# '; charset=utf-8' aux types text/* passes en mimetype=
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+MAX_REPORTED_ERRORS = 100
+
+
+def check_format(fmt):
+    """
+    Raises:
+        ValueError: Si le format n'est pas gere
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Format invalide. Valeurs acceptees: {list(FORMATS)}')
+    return fmt
+
+
+def _export_values(row):
+    """Valeurs d'une ligne exportee, created_at en ISO 8601 (comme to_dict)."""
+    *values, created_at = row
+    return values + [created_at.isoformat() if created_at else None]
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_value(value):
+    if value.startswith("'") and value[1:2] and value[1:2] in FORMULA_PREFIXES:
+        return value[1:]
+    return value or None
+
+
+def export_contacts(fmt, status=None, chunk_size=1000):
+    """
+    Produit l'export des messages, par ordre d'id, morceau par morceau.
+
+    Contexte d'application requis pendant toute l'iteration (utiliser
+    stream_with_context dans une vue).
+
+    Args:
+        fmt (str): 'ndjson' ou 'csv'
+        status (str): Ne garder que ce statut
+        chunk_size (int): Lignes lues par tranche (et par morceau produit)
+
+    Yields:
+        str: Morceau du fichier (une tranche de lignes)
+    """
+    check_format(fmt)
+    statement = select(*(getattr(Contact, column) for column in EXPORT_COLUMNS)).order_by(Contact.id)
+    if status:
+        statement = statement.where(Contact.status == status)
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+
+    if fmt == 'ndjson':
+        dumps = current_app.json.dumps
+        for rows in result.partitions():
+            yield ''.join(dumps(dict(zip(EXPORT_COLUMNS, _export_values(row)))) + '\n' for row in rows)
+        return
+
+    buffer = io.StringIO()
+    # Fin de ligne \n : le fichier peut etre ecrit en mode texte sur tout systeme
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in result.partitions():
+        writer.writerows([_csv_cell(value) for value in _export_values(row)] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # en-tete seul : aucun message
+        yield buffer.getvalue()
+
+
+def read_records(text, fmt):
+    """
+    Lit un fichier d'import enregistrement par enregistrement.
+
+    Args:
+        text: Flux texte ligne a ligne
+        fmt (str): 'ndjson' ou 'csv' (avec ligne d'en-tete)
+
+    Yields:
+        tuple: (numero de ligne, enregistrement dict ou None, erreur ou None)
+    """
+    check_format(fmt)
+    if fmt == 'ndjson':
+        for number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield number, None, 'JSON invalide'
+                continue
+            if not isinstance(record, dict):
+                yield number, None, 'Objet JSON attendu'
+                continue
+            yield number, record, None
+        return
+
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, {key: _csv_value(value) for key, value in row.items()
+                                if key is not None and isinstance(value, str)}, None
+
+
+def _created_at(value):
+    """Date de reception d'un message importe (UTC naive, comme created_at)."""
+    if value is None:
+        return datetime.utcnow()
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError("Date 'created_at' invalide (format ISO 8601 attendu)")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def import_contacts(text, fmt, schema, chunk_size=1000):
+    """
+    Importe des messages depuis un flux NDJSON ou CSV.
+
+    Les enregistrements invalides sont ignores et signales ; les autres sont
+    inseres par lots (les ids du fichier ne sont pas repris). Chaque lot est
+    valide par un commit : une erreur de lecture arrete l'import sans annuler
+    les lots deja inseres.
+
+    Args:
+        text: Flux texte ligne a ligne
+        fmt (str): 'ndjson' ou 'csv'
+        schema: Schema de validation d'un message importe
+        chunk_size (int): Messages par lot
+
+    Returns:
+        dict: {'imported', 'skipped', 'errors': [{'line', 'error'}]} et
+        'error' si la lecture a ete interrompue
+    """
+    statement = insert(Contact.__table__)
+    result = {'imported': 0, 'skipped': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        deltas = Counter()
+        for values in batch:
+            deltas.update(counter_names('contacts', values))
+        db.session.execute(statement, batch)
+        increment(deltas)
+        db.session.commit()
+        result['imported'] += len(batch)
+        batch.clear()
+
+    try:
+        for number, record, error in read_records(text, fmt):
+            if error is None:
+                try:
+                    values = schema.validate(record)
+                    values['created_at'] = _created_at(values['created_at'])
+                    values['fingerprint'] = contact_fingerprint(values['email'], values['message'])
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                result['skipped'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'line': number, 'error': error})
+                continue
+
+            batch.append(values)
+            if len(batch) >= chunk_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        result['error'] = f'Fichier illisible: {e}'
+    flush()
+    return result
@@ -0,0 +1,250 @@
+"""
+Validation declarative des corps de requete.
+
+Chaque endpoint decrit son corps une seule fois avec un Schema (champs,
+types, contraintes, messages d'erreur). A la construction, le schema est
+compile en une liste de fonctions de controle par champ (expressions
+regulieres compilees, enumerations en frozenset) : valider une requete ne
+fait plus que parcourir cette liste.
+
+Le meme schema alimente la documentation : swagger_definitions() produit les
+definitions referencees par les docstrings ($ref: '#/definitions/<nom>').
+"""
+import math
+import re
+
+# Schemas declares, par nom (definitions Swagger)
+SCHEMAS = {}
+
+TYPE_LABELS = {
+    'string': 'une chaine de caracteres',
+    'number': 'un nombre',
+    'integer': 'un entier',
+    'boolean': 'un booleen',
+}
+
+TRUE_STRINGS = frozenset({'1', 'true', 'yes', 'on'})
+
+
+def _to_string(value):
+    if not isinstance(value, str):
+        raise TypeError
+    return value
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        raise TypeError
+    value = float(value)  # accepte aussi '25.5' venant d'un formulaire
+    if not math.isfinite(value):
+        raise ValueError
+    return value
+
+
+def _to_integer(value):
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise TypeError
+    return int(value)
+
+
+def _to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_STRINGS
+
+
+CONVERTERS = {
+    'string': _to_string,
+    'number': _to_number,
+    'integer': _to_integer,
+    'boolean': _to_boolean,
+}
+
+
+class Field:
+    """
+    Description d'un champ.
+
+    Args:
+        type (str): 'string', 'number', 'integer' ou 'boolean'
+        required (bool): Champ obligatoire (ni absent, ni null, ni vide)
+        strip (bool): Retirer les espaces en debut et fin de chaine
+        blank_as_none (bool): Une chaine vide devient None
+        default: Valeur retenue a la creation si le champ est absent ou null
+        max_length (int): Longueur maximale d'une chaine
+        minimum (float): Valeur minimale d'un nombre
+        enum (list): Valeurs acceptees
+        pattern (str): Expression reguliere a respecter
+        normalize (callable): Transformation appliquee avant le controle du
+            pattern (la valeur enregistree n'est pas modifiee)
+        messages (dict): Messages d'erreur par controle ('required', 'type',
+            'max_length', 'minimum', 'enum', 'pattern')
+        description (str): Description pour la documentation
+        example: Exemple pour la documentation
+    """
+
+    def __init__(self, type, required=False, default=None, strip=False, blank_as_none=False,
+                 max_length=None, minimum=None, enum=None, pattern=None,
+                 normalize=None, messages=None, description=None, example=None):
+        if type not in CONVERTERS:
+            raise ValueError(f'Type de champ inconnu: {type}')
+        self.type = type
+        self.required = required
+        self.default = default
+        self.strip = strip
+        self.blank_as_none = blank_as_none
+        self.max_length = max_length
+        self.minimum = minimum
+        self.enum = list(enum) if enum is not None else None
+        self.pattern = pattern
+        self.normalize = normalize
+        self.messages = messages or {}
+        self.description = description
+        self.example = example
+
+    def message(self, name, check):
+        """Message d'erreur d'un controle, personnalise ou par defaut."""
+        if check in self.messages:
+            return self.messages[check]
+        return {
+            'required': f'Le champ {name} est requis',
+            'type': f'Le champ {name} doit etre {TYPE_LABELS[self.type]}',
+            'max_length': f'Le champ {name} depasse {self.max_length} caracteres',
+            'minimum': f'Le champ {name} doit etre superieur ou egal a {self.minimum}',
+            'enum': f'Valeur invalide pour {name}. Valeurs acceptees: {self.enum}',
+            'pattern': f'Format invalide pour {name}',
+        }[check]
+
+    def compile(self, name, partial):
+        """
+        Compile le champ en une fonction check(data, values).
+
+        La fonction lit data[name], le controle, et ecrit la valeur retenue
+        dans values (ou leve ValueError).
+        """
+        convert = CONVERTERS[self.type]
+        required = self.required
+        default = self.default
+        strip = self.strip
+        blank_as_none = self.blank_as_none
+        max_length = self.max_length
+        minimum = self.minimum
+        choices = frozenset(self.enum) if self.enum is not None else None
+        matcher = re.compile(self.pattern).match if self.pattern else None
+        normalize = self.normalize
+        errors = {check: self.message(name, check) for check in
+                  ('required', 'type', 'max_length', 'minimum', 'enum', 'pattern')}
+
+        def check(data, values):
+            value = data.get(name)
+            if value is None:
+                if partial:
+                    return
+                if required:
+                    raise ValueError(errors['required'])
+                values[name] = default
+                return
+
+            if strip and isinstance(value, str):
+                value = value.strip()
+            if value == '':
+                if required:
+                    raise ValueError(errors['required'])
+                if blank_as_none:
+                    values[name] = None
+                    return
+
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                raise ValueError(errors['type'])
+
+            if max_length is not None and len(value) > max_length:
+                raise ValueError(errors['max_length'])
+            if minimum is not None and value < minimum:
+                raise ValueError(errors['minimum'])
+            if choices is not None and value not in choices:
+                raise ValueError(errors['enum'])
+            if matcher is not None and not matcher(normalize(value) if normalize else value):
+                raise ValueError(errors['pattern'])
+
+            values[name] = value
+
+        return check
+
+    def to_swagger(self):
+        """Propriete Swagger 2.0 du champ."""
+        prop = {'type': self.type}
+        for key, value in (('description', self.description), ('default', self.default),
+                           ('example', self.example),
+                           ('enum', self.enum), ('maxLength', self.max_length),
+                           ('minimum', self.minimum), ('pattern', self.pattern)):
+            if value is not None:
+                prop[key] = value
+        return prop
+
+
+class Schema:
+    """
+    Corps de requete d'un endpoint, compile a la construction.
+
+    Args:
+        name (str): Nom de la definition Swagger (ex: 'Service')
+        fields (dict): {nom du champ: Field}, dans l'ordre de controle
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self._checks = {
+            partial: tuple(field.compile(key, partial) for key, field in fields.items())
+            for partial in (False, True)
+        }
+        SCHEMAS[name] = self
+
+    def validate(self, data, partial=False):
+        """
+        Valide un corps de requete et retourne les colonnes a ecrire.
+
+        Args:
+            data (dict): Corps JSON recu
+            partial (bool): Mise a jour : les champs absents ou null sont
+                ignores au lieu d'etre requis ou mis a None
+
+        Returns:
+            dict: Valeurs controlees et converties
+
+        Raises:
+            ValueError: Au premier champ invalide
+        """
+        if not isinstance(data, dict) or not data:
+            raise ValueError('Donnees manquantes')
+        values = {}
+        for check in self._checks[partial]:
+            check(data, values)
+        return values
+
+    def to_swagger(self, partial=False):
+        """Definition Swagger 2.0 du schema."""
+        definition = {
+            'type': 'object',
+            'properties': {key: field.to_swagger() for key, field in self.fields.items()},
+        }
+        required = [key for key, field in self.fields.items() if field.required]
+        if required and not partial:
+            definition['required'] = required
+        return definition
+
+
+def swagger_definitions():
+    """
+    Definitions Swagger de tous les schemas declares.
+
+    Chaque schema donne deux definitions : '<nom>' (creation) et
+    '<nom>Update' (mise a jour partielle, sans champ requis).
+    """
+    definitions = {}
+    for name, schema in SCHEMAS.items():
+        definitions[name] = schema.to_swagger()
+        definitions[f'{name}Update'] = schema.to_swagger(partial=True)
+    return definitions
@@ -0,0 +1,120 @@
+"""
+Versions des tables, partagees par tous les processus (table table_versions).
+
+Chaque ecriture sur une table du catalogue incremente sa version dans la
+meme transaction que les donnees. Le cache de lecture (utils.cache) et les
+validateurs HTTP (utils.conditional) en derivent leur etat : une ecriture
+traitee par un worker est vue par tous les autres des leur requete suivante.
+
+Chaque version enregistre aussi les ids des lignes qu'elle a modifiees
+(table table_changes, bornee aux CHANGE_LOG_SIZE dernieres versions par
+table) : l'index d'autocompletion (utils.suggest) rattrape les ecritures des
+autres processus ligne par ligne au lieu de relire toute la table.
+"""
+import json
+from datetime import datetime
+
+from flask import has_request_context, request
+
+from extensions import db
+from models.version import TableChange, TableVersion
+
+# Memorisees dans l'environnement WSGI : une lecture par requete HTTP
+ENVIRON_KEY = 'manucure.table_versions'
+
+# Versions conservees par table dans le journal des lignes modifiees
+CHANGE_LOG_SIZE = 1000
+
+
+def table_versions():
+    """
+    Retourne les versions de toutes les tables.
+
+    Lues une seule fois par requete HTTP (une requete SQL sur une table de
+    quelques lignes), a chaque appel hors requete.
+
+    Returns:
+        dict: {table: (version, date UTC de la derniere ecriture)}
+    """
+    if has_request_context() and ENVIRON_KEY in request.environ:
+        return request.environ[ENVIRON_KEY]
+
+    versions = {
+        name: (version, modified_at)
+        for name, version, modified_at in db.session.execute(
+            db.select(TableVersion.name, TableVersion.version, TableVersion.modified_at)
+        )
+    }
+    if has_request_context():
+        request.environ[ENVIRON_KEY] = versions
+    return versions
+
+
+def table_version(table):
+    """
+    Retourne la version d'une table.
+
+    Returns:
+        tuple: (version, date UTC de la derniere ecriture), (0, None) pour
+        une table jamais modifiee depuis la creation de table_versions
+    """
+    return table_versions().get(table, (0, None))
+
+
+def table_changes(table, since):
+    """
+    Retourne les ids modifies par les versions d'une table posterieures a since.
+
+    Args:
+        table (str): Nom de la table
+        since (int): Derniere version deja connue
+
+    Returns:
+        dict: {version: set d'ids, ou None si inconnus}, dans l'ordre des
+        versions ; les versions sorties du journal sont absentes
+    """
+    rows = db.session.execute(
+        db.select(TableChange.version, TableChange.ids)
+        .where(TableChange.name == table, TableChange.version > since)
+        .order_by(TableChange.version)
+    )
+    return {version: None if ids is None else set(json.loads(ids)) for version, ids in rows}
+
+
+def bump_version(table, ids=None):
+    """
+    Incremente la version d'une table (upsert, sans commit).
+
+    A appeler avant le commit de chaque ecriture sur la table : la nouvelle
+    version et les ids modifies sont enregistres dans la meme transaction
+    que les donnees (et annules avec elles en cas de rollback).
+
+    Args:
+        table (str): Nom de la table (ex: 'services')
+        ids (iterable): Ids des lignes creees, modifiees ou supprimees ;
+            None si inconnus (chargement en masse)
+
+    Returns:
+        int: Nouvelle version de la table
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    now = datetime.utcnow()
+    statement = insert(TableVersion).values(name=table, version=1, modified_at=now)
+    version = db.session.scalar(statement.on_conflict_do_update(
+        index_elements=[TableVersion.name],
+        set_={'version': TableVersion.version + 1, 'modified_at': now},
+    ).returning(TableVersion.version))
+
+    db.session.add(TableChange(
+        name=table, version=version, ids=None if ids is None else json.dumps(sorted(set(ids))),
+    ))
+    db.session.execute(db.delete(TableChange).where(
+        TableChange.name == table, TableChange.version <= version - CHANGE_LOG_SIZE,
+    ))
+    if has_request_context():
+        request.environ.pop(ENVIRON_KEY, None)
+    return version
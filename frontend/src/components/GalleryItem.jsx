@@ -1,14 +1,25 @@
+import { useState } from 'react';
+
 export default function GalleryItem({ image, onClick }) {
+  // Declinaison introuvable (generation en echec, fichier supprime) : retour a l'original
+  const [renditionFailed, setRenditionFailed] = useState(false);
+  const medium = !renditionFailed && image.renditions?.medium;
+
   return (
     <div
       className="relative group cursor-pointer overflow-hidden rounded-lg"
       onClick={() => onClick && onClick(image)}
     >
-      <img
-        src={image.image_url}
-        alt={image.title}
-        className="w-full h-64 object-cover transition-transform duration-300 group-hover:scale-110"
-      />
+      <picture>
+        {medium && <source srcSet={medium.webp} type="image/webp" />}
+        <img
+          src={medium ? medium.jpeg : image.image_url}
+          alt={image.title}
+          loading="lazy"
+          onError={() => medium && setRenditionFailed(true)}
+          className="w-full h-64 object-cover transition-transform duration-300 group-hover:scale-110"
+        />
+      </picture>
       <div className="absolute inset-0 bg-gradient-to-t from-black/70 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300">
         <div className="absolute bottom-0 left-0 right-0 p-4">
           <h3 className="text-white font-semibold">{image.title}</h3>
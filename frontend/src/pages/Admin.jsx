@@ -1,25 +1,34 @@
 import { useState, useEffect } from 'react';
-import { getServices, getContacts, getGallery } from '../services/api';
+import { getServices, getContacts, getGallery, getStats, nextCursor } from '../services/api';
+
+const GALLERY_FIELDS = 'id,title,image_url';
 
 export default function Admin() {
   const [activeTab, setActiveTab] = useState('services');
   const [services, setServices] = useState([]);
   const [contacts, setContacts] = useState([]);
   const [gallery, setGallery] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  // Jetons des pages suivantes (listes paginees par 50), null en fin de liste
+  const [cursors, setCursors] = useState({ contacts: null, gallery: null });
+  const [loadingMore, setLoadingMore] = useState(null);
 
   useEffect(() => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        const [servicesRes, contactsRes, galleryRes] = await Promise.all([
-          getServices(),
+        const [servicesRes, contactsRes, galleryRes, statsRes] = await Promise.all([
+          getServices('id,name,price,duration'),
           getContacts(),
-          getGallery(),
+          getGallery(null, GALLERY_FIELDS),
+          getStats(),
         ]);
         setServices(servicesRes.data);
         setContacts(contactsRes.data);
         setGallery(galleryRes.data);
+        setCursors({ contacts: nextCursor(contactsRes), gallery: nextCursor(galleryRes) });
+        setStats(statsRes.data);
       } catch (error) {
         console.error('Erreur lors du chargement des donnees:', error);
       } finally {
@@ -30,10 +39,29 @@ export default function Admin() {
     fetchData();
   }, []);
 
+  // Page suivante d'une liste, ajoutee a la suite
+  const pages = {
+    contacts: { fetch: (cursor) => getContacts(null, null, cursor), append: setContacts },
+    gallery: { fetch: (cursor) => getGallery(null, GALLERY_FIELDS, cursor), append: setGallery },
+  };
+
+  const loadMore = async (list) => {
+    setLoadingMore(list);
+    try {
+      const response = await pages[list].fetch(cursors[list]);
+      pages[list].append((current) => [...current, ...response.data]);
+      setCursors((current) => ({ ...current, [list]: nextCursor(response) }));
+    } catch (error) {
+      console.error('Erreur lors du chargement des donnees:', error);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
   const tabs = [
-    { id: 'services', label: 'Services', count: services.length },
-    { id: 'gallery', label: 'Galerie', count: gallery.length },
-    { id: 'contacts', label: 'Messages', count: contacts.filter(c => c.status === 'new').length },
+    { id: 'services', label: 'Services', count: stats ? stats.services.total : services.length },
+    { id: 'gallery', label: 'Galerie', count: stats ? stats.gallery.total : gallery.length },
+    { id: 'contacts', label: 'Messages', count: stats ? stats.contacts.status.new : contacts.filter(c => c.status === 'new').length },
   ];
 
   return (
@@ -144,6 +172,9 @@ export default function Admin() {
                 {gallery.length === 0 && (
                   <div className="text-center py-8 text-gray-500">Aucune image</div>
                 )}
+                {cursors.gallery && (
+                  <LoadMoreButton onClick={() => loadMore('gallery')} loading={loadingMore === 'gallery'} />
+                )}
               </div>
             )}
 
@@ -181,6 +212,9 @@ export default function Admin() {
                 {contacts.length === 0 && (
                   <div className="text-center py-8 text-gray-500">Aucun message</div>
                 )}
+                {cursors.contacts && (
+                  <LoadMoreButton onClick={() => loadMore('contacts')} loading={loadingMore === 'contacts'} />
+                )}
               </div>
             )}
           </>
@@ -189,3 +223,17 @@ export default function Admin() {
     </div>
   );
 }
+
+function LoadMoreButton({ onClick, loading }) {
+  return (
+    <div className="px-6 py-4 border-t text-center">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="text-pink-600 hover:text-pink-900 text-sm font-medium disabled:opacity-50"
+      >
+        {loading ? 'Chargement...' : 'Charger plus'}
+      </button>
+    </div>
+  );
+}
@@ -1,12 +1,15 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import GalleryItem from '../components/GalleryItem';
-import { getGallery } from '../services/api';
+import { getGallery, nextCursor, GALLERY_CARD_FIELDS } from '../services/api';
 
 export default function Gallery() {
   const [images, setImages] = useState([]);
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState(null);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedImage, setSelectedImage] = useState(null);
+  const filterRef = useRef(filter);
 
   const categories = [
     { value: null, label: 'Tous' },
@@ -18,21 +21,44 @@ export default function Gallery() {
   ];
 
   useEffect(() => {
+    filterRef.current = filter;
+    let cancelled = false;
     const fetchGallery = async () => {
       setLoading(true);
       try {
-        const response = await getGallery(filter);
+        const response = await getGallery(filter, GALLERY_CARD_FIELDS);
+        if (cancelled) return;
         setImages(response.data);
+        setCursor(nextCursor(response));
       } catch (error) {
         console.error('Erreur lors du chargement de la galerie:', error);
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchGallery();
+    return () => {
+      cancelled = true;
+    };
   }, [filter]);
 
+  // Page suivante, ajoutee a la grille (ignoree si le filtre a change entre-temps)
+  const loadMore = async () => {
+    const requested = filter;
+    setLoadingMore(true);
+    try {
+      const response = await getGallery(requested, GALLERY_CARD_FIELDS, cursor);
+      if (filterRef.current !== requested) return;
+      setImages((current) => [...current, ...response.data]);
+      setCursor(nextCursor(response));
+    } catch (error) {
+      console.error('Erreur lors du chargement de la galerie:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleImageClick = (image) => {
     setSelectedImage(image);
   };
@@ -83,11 +109,24 @@ export default function Gallery() {
               <p className="text-gray-500 mt-4">Chargement de la galerie...</p>
             </div>
           ) : images.length > 0 ? (
-            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
-              {images.map((image) => (
-                <GalleryItem key={image.id} image={image} onClick={handleImageClick} />
-              ))}
-            </div>
+            <>
+              <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
+                {images.map((image) => (
+                  <GalleryItem key={image.id} image={image} onClick={handleImageClick} />
+                ))}
+              </div>
+              {cursor && (
+                <div className="text-center mt-8">
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    className="inline-block border-2 border-pink-500 text-pink-500 hover:bg-pink-500 hover:text-white px-8 py-3 rounded-lg font-semibold transition disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Chargement...' : 'Voir plus'}
+                  </button>
+                </div>
+              )}
+            </>
           ) : (
             <div className="text-center py-12">
               <p className="text-gray-500">Aucune image dans cette categorie</p>
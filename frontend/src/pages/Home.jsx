@@ -3,7 +3,7 @@ import { Link } from 'react-router-dom';
 import Hero from '../components/Hero';
 import ServiceCard from '../components/ServiceCard';
 import GalleryItem from '../components/GalleryItem';
-import { getServices, getFeaturedGallery } from '../services/api';
+import { getServices, getFeaturedGallery, GALLERY_CARD_FIELDS } from '../services/api';
 
 export default function Home() {
   const [services, setServices] = useState([]);
@@ -15,10 +15,11 @@ export default function Home() {
       try {
         const [servicesRes, galleryRes] = await Promise.all([
           getServices(),
-          getFeaturedGallery(),
+          // Apercu : seules les 6 images affichees sont demandees
+          getFeaturedGallery(GALLERY_CARD_FIELDS, 6),
         ]);
         setServices(servicesRes.data.slice(0, 3));
-        setGallery(galleryRes.data.slice(0, 6));
+        setGallery(galleryRes.data);
       } catch (error) {
         console.error('Erreur lors du chargement des donnees:', error);
       } finally {
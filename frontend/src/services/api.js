@@ -9,29 +9,64 @@ const api = axios.create({
   },
 });
 
+// Selection de champs des listes (?fields=) : seules ces colonnes sont lues et renvoyees
+export const GALLERY_CARD_FIELDS = 'id,title,image_url,renditions,category';
+
+// Listes paginees (50 elements par defaut) : jeton de la page suivante,
+// a repasser en ?cursor=, ou null sur la derniere page
+export const nextCursor = (response) => response.headers['x-next-cursor'] || null;
+
 // Services
-export const getServices = () => api.get('/api/services');
+export const getServices = (fields = null) =>
+  api.get('/api/services', { params: fields ? { fields } : {} });
 export const getService = (id) => api.get(`/api/services/${id}`);
 export const createService = (data) => api.post('/api/services', data);
 export const updateService = (id, data) => api.put(`/api/services/${id}`, data);
 export const deleteService = (id) => api.delete(`/api/services/${id}`);
 
 // Gallery
-export const getGallery = (category = null) => {
-  const params = category ? { category } : {};
+export const getGallery = (category = null, fields = null, cursor = null) => {
+  const params = {};
+  if (category) params.category = category;
+  if (fields) params.fields = fields;
+  if (cursor) params.cursor = cursor;
   return api.get('/api/gallery', { params });
 };
 export const getGalleryItem = (id) => api.get(`/api/gallery/${id}`);
-export const getFeaturedGallery = () => api.get('/api/gallery/featured');
+export const getFeaturedGallery = (fields = null, limit = null) => {
+  const params = {};
+  if (fields) params.fields = fields;
+  if (limit) params.limit = limit;
+  return api.get('/api/gallery/featured', { params });
+};
 export const createGalleryItem = (data) => api.post('/api/gallery', data);
 export const deleteGalleryItem = (id) => api.delete(`/api/gallery/${id}`);
 
+// Uploads (kind: 'gallery' ou 'services')
+export const uploadImage = (kind, file) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  return api.post(`/api/uploads/${kind}`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  });
+};
+
 // Contact
 export const sendContact = (data) => api.post('/api/contact', data);
-export const getContacts = (status = null) => {
-  const params = status ? { status } : {};
+export const getContacts = (status = null, fields = null, cursor = null) => {
+  const params = {};
+  if (status) params.status = status;
+  if (fields) params.fields = fields;
+  if (cursor) params.cursor = cursor;
   return api.get('/api/contacts', { params });
 };
 export const updateContactStatus = (id, status) => api.put(`/api/contacts/${id}`, { status });
 
+// Stats (admin)
+export const getStats = () => api.get('/api/stats');
+
+// Recherche (autocompletion du catalogue)
+export const getSuggestions = (prefix, limit = 10) =>
+  api.get('/api/search/suggest', { params: { prefix, limit } });
+
 export default api;